@@ -0,0 +1,32 @@
+"""基准脚本的模块加载辅助
+
+插件包的 ``__init__`` 会导入 AstrBot 运行时，基准脚本只需要其中不依赖
+AstrBot 的纯计算模块，因此这里以不执行 ``__init__`` 的方式注册包路径。
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_NAME = "douyu_live_bench"
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _register(name: str, path: Path) -> None:
+    if name in sys.modules:
+        return
+    module = types.ModuleType(name)
+    module.__path__ = [str(path)]  # type: ignore[attr-defined]
+    sys.modules[name] = module
+
+
+def load(module: str) -> types.ModuleType:
+    """加载插件内的子模块，例如 ``load("core.stt")``"""
+    _register(PACKAGE_NAME, ROOT)
+    parts = module.split(".")
+    for i in range(1, len(parts)):
+        _register(f"{PACKAGE_NAME}.{'.'.join(parts[:i])}", ROOT.joinpath(*parts[:i]))
+    return importlib.import_module(f"{PACKAGE_NAME}.{module}")
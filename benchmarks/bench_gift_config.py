@@ -0,0 +1,139 @@
+"""礼物配置解析基准
+
+对 prop_gift_config 负载分别进行：
+
+- legacy: 名称、高价值集合、价值三次遍历后再合并为 GiftInfo 查找表（原先的做法）
+- single: ``_parse_global_payload`` 单次遍历生成原始礼物表，再合并为 GiftInfo 查找表
+
+输出每次解析耗时与 tracemalloc 统计的峰值内存（不含 JSON 解码）。
+
+用法::
+
+    python benchmarks/bench_gift_config.py [--payload prop_gift_config.json] [--gifts 4000]
+
+未指定 ``--payload`` 时按抓取到的负载结构生成同等规模的数据。
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from _loader import load
+
+gift_config = load("utils.gift_config")
+
+# 抓取的 prop_gift_config 中单个礼物条目的字段（数值已替换）
+GIFT_TEMPLATE = {
+    "name": "礼物",
+    "himg": "https://gfs-op.douyucdn.cn/dygift/1606/e15a9cd0c4e9b0fd9ea5e7c9b0f0c1a6.png",
+    "mimg": "https://gfs-op.douyucdn.cn/dygift/1606/e15a9cd0c4e9b0fd9ea5e7c9b0f0c1a6.gif",
+    "pc": "100",
+    "devote": "100.0",
+    "exp": "100",
+    "type": "2",
+    "pimg": "",
+    "cimg": "",
+    "desc": "赠送后主播获得鱼翅",
+    "intro": "",
+}
+
+
+def build_payload(gifts: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    data = {}
+    for i in range(gifts):
+        entry = dict(GIFT_TEMPLATE)
+        entry["name"] = f"礼物{i}"
+        entry["devote"] = f"{rng.choice([1, 10, 100, 600, 1000, 10000, 50000])}.0"
+        data[str(20000 + i)] = entry
+    return {"error": 0, "data": data}
+
+
+def legacy_parse(data: dict) -> tuple:
+    threshold = gift_config.HIGH_VALUE_DEVOTE_THRESHOLD
+    mapping = {}
+    for gift_id, info in data.get("data", {}).items():
+        if isinstance(info, dict) and info.get("name"):
+            mapping[str(gift_id)] = str(info["name"])
+    high_value = set()
+    for gift_id, info in data.get("data", {}).items():
+        if not isinstance(info, dict):
+            continue
+        try:
+            devote = int(float(info.get("devote"))) if info.get("devote") is not None else 0
+        except (TypeError, ValueError):
+            continue
+        if devote >= threshold:
+            high_value.add(str(gift_id))
+    values = {}
+    for gift_id, info in data.get("data", {}).items():
+        if not isinstance(info, dict):
+            continue
+        try:
+            devote = int(float(info.get("devote"))) if info.get("devote") is not None else 0
+        except (TypeError, ValueError):
+            continue
+        values[str(gift_id)] = devote
+
+    table = {}
+    for gift_key, name in mapping.items():
+        try:
+            gift_id = int(gift_key)
+        except ValueError:
+            continue
+        table[gift_id] = gift_config._make_info(
+            name, values.get(gift_key), gift_key in high_value
+        )
+    return table, len(mapping)
+
+
+def single_parse(data: dict) -> tuple:
+    gifts, named = gift_config._parse_global_payload(data)
+    table = {}
+    gift_config._merge_table(table, gifts)
+    return table, named
+
+
+def measure(name: str, func, data: dict, rounds: int) -> None:
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(data)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    gc.collect()
+    tracemalloc.start()
+    result = func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f"{name:<7} {elapsed * 1e3:>8.2f} ms/parse  {peak / 1024:>8.1f} KiB peak")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload", help="抓取的 prop_gift_config.json（可为 JSONP）")
+    parser.add_argument("--gifts", type=int, default=4000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as f:
+            data = json.loads(gift_config._strip_jsonp(f.read()))
+    else:
+        data = build_payload(args.gifts)
+
+    assert legacy_parse(data) == single_parse(data)
+    print(f"{len(data.get('data', {}))} gifts")
+    measure("legacy", legacy_parse, data, args.rounds)
+    measure("single", single_parse, data, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""礼物播报路由基准
+
+单个房间 1000 个订阅者（约一半开启礼物播报，阈值、合并窗口随机分布），
+分别统计每条礼物消息计算接收者的耗时：
+
+- scan:  复制订阅字典并逐个检查配置（原先 ``_get_gift_recipients`` 的做法）
+- route: 预编译的 GiftRoute，每个合并窗口组一次二分查找
+
+用法::
+
+    python benchmarks/bench_gift_routing.py [--subscribers 1000] [--gifts 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from _loader import load
+
+gift_router = load("core.gift_router")
+subscription = load("models.subscription")
+
+# 礼物价值分布：大部分是低价值礼物
+GIFT_VALUES = [10, 10, 10, 100, 100, 600, 1000, 10000, 50000, 100000]
+THRESHOLDS = [None, 100, 1000, 10000, 10000, 50000]
+WINDOWS = [0.0, 3.0, 3.0, 5.0]
+
+
+def build_configs(count: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    configs = {}
+    for i in range(count):
+        configs[f"aiocqhttp:GroupMessage:{100000 + i}"] = subscription.SubscriptionConfig(
+            gift_notify=rng.random() < 0.5,
+            high_value_threshold=rng.choice(THRESHOLDS),
+            gift_combo_window=rng.choice(WINDOWS),
+        )
+    return configs
+
+
+def scan(configs: dict, value_of, gift_id: str) -> dict:
+    sub_configs = configs.copy()
+    gift_value = None
+    recipients: dict = {}
+    for umo, config in sub_configs.items():
+        if not config.gift_notify:
+            continue
+        if config.high_value_threshold is not None:
+            if gift_value is None:
+                gift_value = value_of(gift_id) or 0
+            if gift_value < config.high_value_threshold:
+                continue
+        recipients.setdefault(config.gift_combo_window, {})[umo] = False
+    return recipients
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--gifts", type=int, default=20_000)
+    args = parser.parse_args()
+
+    configs = build_configs(args.subscribers)
+    values = {str(i): v for i, v in enumerate(GIFT_VALUES)}
+    value_of = values.get
+    rng = random.Random(2)
+    gifts = [rng.choice(list(values)) for _ in range(args.gifts)]
+
+    route = gift_router.GiftRoute(configs)
+    for gift_id in set(gifts):
+        assert route.match(value_of(gift_id)) == scan(configs, value_of, gift_id)
+
+    start = time.perf_counter()
+    for gift_id in gifts:
+        scan(configs, value_of, gift_id)
+    scan_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for gift_id in gifts:
+        route.match(value_of(gift_id) if route.needs_value else None)
+    route_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        gift_router.GiftRoute(configs)
+    build_elapsed = (time.perf_counter() - start) / 100
+
+    print(f"{args.subscribers} subscribers, {args.gifts} gifts")
+    print(f"scan   {scan_elapsed / args.gifts * 1e6:>8.1f} us/gift")
+    print(f"route  {route_elapsed / args.gifts * 1e6:>8.1f} us/gift  "
+          f"({scan_elapsed / route_elapsed:.1f}x)")
+    print(f"build  {build_elapsed * 1e3:>8.2f} ms/rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""STT 解码基准
+
+对录制的 rss / dgb / chatmsg 消息构造的 TCP 数据流分别进行：
+
+- eager: 逐帧复制正文并完整解析为字典（与 pydouyu 相同的做法）
+- lazy:  使用 SttDecoder 零复制切帧，只按需读取处理器关心的字段
+- gated: 在 lazy 基础上只解码 rss / dgb，其余类型在帧头即被跳过
+
+输出每秒帧数与每帧内存分配（tracemalloc 统计的分配块数与峰值字节数）。
+
+用法::
+
+    python benchmarks/bench_stt.py [--frames 200000] [--chunk 4096]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from _loader import load
+
+stt = load("core.stt")
+
+# 录制自真实直播间的消息正文（用户信息已脱敏）
+RSS_BODY = (
+    "type@=rss/rid@=12725169/ss@=1/code@=0/rt@=0/notify@=0/endtime@=0/ivl@=0/"
+)
+DGB_BODY = (
+    "type@=dgb/rid@=12725169/gfid@=20000/gs@=0/uid@=12345678/nn@=土豪用户/"
+    "ic@=avatar_v3@S202312@S0123456789abcdef/eid@=0/eic@=0/level@=35/dw@=0/"
+    "gfcnt@=1/hits@=12/bcnt@=1/bst@=0/ct@=2/el@=/cm@=0/bnn@=粉丝牌/bl@=18/"
+    "brid@=12725169/hc@=0123456789abcdef/sahf@=0/fc@=0/bnid@=1/bnl@=1/"
+)
+CHATMSG_BODY = (
+    "type@=chatmsg/rid@=12725169/ct@=2/uid@=87654321/nn@=观众A/txt@=主播好厉害666/"
+    "cid@=1a2b3c4d5e6f00000000000000000000/ic@=avatar@Sdefault@S03/level@=12/"
+    "sahf@=0/cst@=1700000000000/bnn@=粉丝牌/bl@=9/brid@=12725169/"
+    "hc@=0123456789abcdef/el@=eid@AA=1500000005@ASetp@AA=1@ASsc@AA=1@AS@S/"
+    "lk@=/pdg@=59/pdk@=86/ext@=/"
+)
+
+
+def build_stream(frames: int) -> bytes:
+    """按 chat 95% / dgb 4% / rss 1% 的比例拼接数据流"""
+    chat = stt.pack(CHATMSG_BODY, stt.SERVER_MSG_TYPE)
+    dgb = stt.pack(DGB_BODY, stt.SERVER_MSG_TYPE)
+    rss = stt.pack(RSS_BODY, stt.SERVER_MSG_TYPE)
+    parts = []
+    for i in range(frames):
+        if i % 100 == 0:
+            parts.append(rss)
+        elif i % 25 == 0:
+            parts.append(dgb)
+        else:
+            parts.append(chat)
+    return b"".join(parts)
+
+
+def split_chunks(stream: bytes, chunk: int) -> list[bytes]:
+    return [stream[i : i + chunk] for i in range(0, len(stream), chunk)]
+
+
+def run_eager(chunks: list[bytes], keep: list | None = None) -> int:
+    pending = b""
+    frames = 0
+    for data in chunks:
+        pending += data
+        pos = 0
+        while len(pending) - pos >= 4:
+            length = int.from_bytes(pending[pos : pos + 4], "little")
+            if len(pending) - pos - 4 < length:
+                break
+            body = pending[pos + 12 : pos + 4 + length].rstrip(b"\0")
+            msg = stt.parse_message(body.decode("utf-8", "ignore"))
+            msg_type = msg.get("type")
+            if msg_type == "dgb":
+                _ = (msg.get("gfid"), msg.get("nn"), msg.get("gfcnt"), msg.get("hits"))
+            elif msg_type == "rss":
+                _ = (msg.get("ss"), msg.get("ivl"))
+            if keep is not None:
+                keep.append(msg)
+            frames += 1
+            pos += 4 + length
+        pending = pending[pos:]
+    return frames
+
+
+def run_lazy(
+    chunks: list[bytes], keep: list | None = None, wanted_types=None
+) -> int:
+    decoder = stt.SttDecoder(wanted_types=wanted_types)
+    for data in chunks:
+        for msg in decoder.feed(data):
+            msg_type = msg.msg_type
+            if msg_type == "dgb":
+                _ = (msg.get("gfid"), msg.get("nn"), msg.get("gfcnt"), msg.get("hits"))
+            elif msg_type == "rss":
+                _ = (msg.get("ss"), msg.get("ivl"))
+            if keep is not None:
+                keep.append(msg)
+    return decoder.frames
+
+
+def run_gated(chunks: list[bytes], keep: list | None = None) -> int:
+    return run_lazy(chunks, keep, wanted_types=("rss", "dgb"))
+
+
+def measure(name: str, func, chunks: list[bytes]) -> None:
+    gc.collect()
+    start = time.perf_counter()
+    frames = func(chunks)
+    elapsed = time.perf_counter() - start
+
+    # 保留所有消息对象，统计每帧新增的分配块数；峰值字节反映解码期间的临时分配
+    keep: list = []
+    gc.collect()
+    tracemalloc.start()
+    base_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    func(chunks, keep)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename")) - base_blocks
+    del keep
+
+    print(
+        f"{name:<6} {frames / elapsed:>12,.0f} frames/s  "
+        f"{blocks / frames:>6.2f} allocs/frame  "
+        f"{peak / frames:>8.1f} peak B/frame"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--chunk", type=int, default=4096, help="模拟单次 recv 的字节数")
+    args = parser.parse_args()
+
+    chunks = split_chunks(build_stream(args.frames), args.chunk)
+    print(f"{args.frames} frames, {len(chunks)} chunks of {args.chunk} bytes")
+    measure("eager", run_eager, chunks)
+    measure("lazy", run_lazy, chunks)
+    measure("gated", run_gated, chunks)
+
+
+if __name__ == "__main__":
+    main()
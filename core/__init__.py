@@ -1,8 +1,31 @@
 # Core module - 核心业务逻辑
+from .admission import ConnectionAdmission
 from .api import DouyuAPI
-from .monitor import DouyuMonitor
+from .async_monitor import AsyncDouyuMonitor, DanmakuEngine
+from .gift_combo import GiftCombo, GiftComboCoalescer
+from .gift_loader import GiftConfigLoader
+from .gift_refresher import GiftConfigRefresher
+from .gift_router import GiftRoute, GiftRouter
+from .monitor import BaseMonitor, DouyuMonitor
+from .monitor_pool import MonitorPool, PooledMonitor
 from .notifier import Notifier
+from .retry_scheduler import RetryScheduler
 
-__all__ = ["DouyuMonitor", "DouyuAPI", "Notifier"]
-
-
+__all__ = [
+    "AsyncDouyuMonitor",
+    "BaseMonitor",
+    "ConnectionAdmission",
+    "DanmakuEngine",
+    "DouyuMonitor",
+    "DouyuAPI",
+    "GiftCombo",
+    "GiftComboCoalescer",
+    "GiftConfigLoader",
+    "GiftConfigRefresher",
+    "GiftRoute",
+    "GiftRouter",
+    "MonitorPool",
+    "Notifier",
+    "PooledMonitor",
+    "RetryScheduler",
+]
@@ -0,0 +1,208 @@
+"""监控连接准入控制模块"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from astrbot.api import logger
+
+# 准入优先级，数值越小越先连接
+ADMIT_LIVE = 0  # 正在直播（或管理员手动操作）
+ADMIT_SUBSCRIBED = 1  # 有订阅者
+ADMIT_IDLE = 2  # 其他房间
+
+# 同时进行的连接握手数上限
+CONNECT_MAX_CONCURRENT = 10
+# 每秒新建的连接数
+CONNECT_RATE = 5.0
+# 未收到连接成功信号时，握手名额的最长占用时间（秒）
+HANDSHAKE_TIMEOUT = 10.0
+
+
+@dataclass(order=True)
+class _Admission:
+    priority: int
+    seq: int
+    room_id: int = field(compare=False)
+    start: Callable[[], bool] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class ConnectionAdmission:
+    """监控连接准入控制器
+
+    所有监控启动都先在这里排队：按优先级（直播中 > 有订阅者 > 其他）依次准入，
+    新连接以固定速率逐个建立，同时握手中的连接数不超过上限。
+    监控器连接成功后通过 connected() 归还握手名额，
+    不支持该信号的引擎在 handshake_timeout 秒后自动归还。
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = CONNECT_MAX_CONCURRENT,
+        rate: float = CONNECT_RATE,
+        handshake_timeout: float = HANDSHAKE_TIMEOUT,
+    ):
+        """初始化控制器
+
+        Args:
+            max_concurrent: 同时握手的连接数上限
+            rate: 每秒新建的连接数，不大于 0 时不限速
+            handshake_timeout: 握手名额的最长占用时间（秒）
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate = rate
+        self.handshake_timeout = handshake_timeout
+        self._heap: list[_Admission] = []
+        self._pending: dict[int, _Admission] = {}
+        self._handshaking: dict[int, asyncio.TimerHandle] = {}
+        self._seq = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._next_at = 0.0
+        # 统计
+        self.total_admitted = 0
+
+    @property
+    def pending(self) -> int:
+        """排队等待准入的房间数"""
+        return len(self._pending)
+
+    @property
+    def handshaking(self) -> int:
+        """正在握手的连接数"""
+        return len(self._handshaking)
+
+    def is_pending(self, room_id: int) -> bool:
+        """房间是否在排队等待准入"""
+        return room_id in self._pending
+
+    def submit(
+        self,
+        room_id: int,
+        start: Callable[[], bool],
+        priority: int = ADMIT_IDLE,
+        replace: bool = False,
+    ) -> asyncio.Future[bool]:
+        """提交一次监控启动（必须在事件循环线程中调用）
+
+        同一房间已在排队时不重复提交，返回已有的结果；
+        新的优先级更高时提前该房间的准入顺序。
+        replace 为 True 时（如重启）以新的 start 替换排队中的条目，两者共用同一结果。
+
+        Args:
+            room_id: 房间号
+            start: 启动监控的函数，返回是否成功启动
+            priority: 准入优先级
+            replace: 是否替换排队中的启动函数
+
+        Returns:
+            准入并执行 start 后得到结果的 Future，被取消时结果为 False
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+
+        existing = self._pending.get(room_id)
+        if existing is not None:
+            if not replace and priority >= existing.priority:
+                return existing.future
+            # 以新的启动函数或更高的优先级重新排队，原条目作废
+            existing.cancelled = True
+            priority = min(priority, existing.priority)
+            future = existing.future
+        else:
+            future = loop.create_future()
+
+        entry = _Admission(priority, next(self._seq), room_id, start, future)
+        heapq.heappush(self._heap, entry)
+        self._pending[room_id] = entry
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        assert self._wakeup is not None
+        self._wakeup.set()
+        return future
+
+    def cancel(self, room_id: int) -> None:
+        """取消排队中的启动并归还握手名额（如监控被删除或停止）"""
+        entry = self._pending.pop(room_id, None)
+        if entry is not None:
+            entry.cancelled = True
+            if not entry.future.done():
+                entry.future.set_result(False)
+        self._release(room_id)
+
+    def connected(self, room_id: int) -> None:
+        """监控器连接成功的信号（线程安全）"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._release, room_id)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def _release(self, room_id: int) -> None:
+        handle = self._handshaking.pop(room_id, None)
+        if handle is None:
+            return
+        handle.cancel()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._loop is not None and self._wakeup is not None
+        loop, wakeup = self._loop, self._wakeup
+        while True:
+            # 等待排队的房间与空闲的握手名额
+            while not self._heap or len(self._handshaking) >= self.max_concurrent:
+                wakeup.clear()
+                await wakeup.wait()
+
+            # 按速率逐个建立连接；等待期间可能有更高优先级的房间加入，醒来后重新取队首
+            delay = self._next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            entry = heapq.heappop(self._heap)
+            if entry.cancelled:
+                continue
+            del self._pending[entry.room_id]
+            self._next_at = loop.time() + (1.0 / self.rate if self.rate > 0 else 0.0)
+
+            try:
+                ok = entry.start()
+            except Exception as e:
+                logger.error(f"启动直播间 {entry.room_id} 监控出错: {e}")
+                ok = False
+            if ok:
+                self.total_admitted += 1
+                self._handshaking[entry.room_id] = loop.call_later(
+                    self.handshake_timeout, self._release, entry.room_id
+                )
+            if not entry.future.done():
+                entry.future.set_result(ok)
+
+    async def close(self) -> None:
+        """停止准入，排队中的启动结果为 False"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for entry in self._pending.values():
+            if not entry.future.done():
+                entry.future.set_result(False)
+        self._pending.clear()
+        self._heap = []
+        for handle in self._handshaking.values():
+            handle.cancel()
+        self._handshaking.clear()
@@ -1,5 +1,6 @@
 """斗鱼 API 调用模块"""
 
+import time
 from typing import TypedDict
 
 import httpx
@@ -19,37 +20,108 @@ class DouyuAPI:
 
     提供获取直播间信息等功能。
     使用公开的 betard 接口，无需鉴权。
+
+    所有请求共用一个进程级的连接池（keep-alive），查询结果在内存中缓存：
+    成功结果缓存 CACHE_TTL 秒，不存在的房间缓存 NEGATIVE_CACHE_TTL 秒，
+    网络错误不缓存；缓存条目超过 MAX_CACHE_SIZE 时先清理过期条目，仍超出则淘汰最早写入的条目。
     """
 
     BASE_URL = "https://www.douyu.com/betard"
     TIMEOUT = 10.0
+    # 连接池大小
+    MAX_CONNECTIONS = 10
+    # 房间信息缓存时间（秒）
+    CACHE_TTL = 300.0
+    # 不存在的房间的缓存时间（秒）
+    NEGATIVE_CACHE_TTL = 60.0
+    # 缓存的房间数上限
+    MAX_CACHE_SIZE = 1024
+
+    _client: httpx.AsyncClient | None = None
+    # {room_id -> (过期时间 monotonic, 房间信息或 None)}
+    _cache: dict[int, tuple[float, RoomInfo | None]] = {}
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                timeout=cls.TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=cls.MAX_CONNECTIONS,
+                    max_keepalive_connections=cls.MAX_CONNECTIONS,
+                ),
+            )
+        return cls._client
+
+    @classmethod
+    def _store(cls, room_id: int, ttl: float, info: RoomInfo | None) -> None:
+        """写入缓存，超出上限时清理过期条目与最早写入的条目"""
+        cache = cls._cache
+        # 重新插入到末尾，使字典顺序保持为写入顺序
+        cache.pop(room_id, None)
+        if len(cache) >= cls.MAX_CACHE_SIZE:
+            now = time.monotonic()
+            for key in [key for key, (expires, _) in cache.items() if expires <= now]:
+                del cache[key]
+            while len(cache) >= cls.MAX_CACHE_SIZE:
+                del cache[next(iter(cache))]
+        cache[room_id] = (time.monotonic() + ttl, info)
 
     @classmethod
-    async def fetch_room_info(cls, room_id: int) -> RoomInfo | None:
+    async def fetch_room_info(cls, room_id: int, use_cache: bool = True) -> RoomInfo | None:
         """从斗鱼获取直播间信息
 
         Args:
             room_id: 斗鱼直播间房间号
+            use_cache: 是否使用缓存的结果
 
         Returns:
-            包含 owner_name, nickname, room_name 的字典，获取失败返回 None
+            包含 owner_name, nickname, room_name 的字典，获取失败或房间不存在返回 None
         """
+        if use_cache:
+            cached = cls._cache.get(room_id)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+
         url = f"{cls.BASE_URL}/{room_id}"
         try:
-            async with httpx.AsyncClient(timeout=cls.TIMEOUT) as client:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    data = response.json()
-                    room = data.get("room", {})
-                    return RoomInfo(
-                        owner_name=room.get("owner_name", ""),
-                        nickname=room.get("nickname", ""),
-                        room_name=room.get("room_name", ""),
-                    )
+            response = await cls._get_client().get(url)
+            if response.status_code == 200:
+                data = response.json()
+                room = data.get("room")
+                if not room:
+                    # 房间不存在
+                    cls._store(room_id, cls.NEGATIVE_CACHE_TTL, None)
+                    return None
+                info = RoomInfo(
+                    owner_name=room.get("owner_name", ""),
+                    nickname=room.get("nickname", ""),
+                    room_name=room.get("room_name", ""),
+                )
+                cls._store(room_id, cls.CACHE_TTL, info)
+                return info
+            if response.status_code == 404:
+                cls._store(room_id, cls.NEGATIVE_CACHE_TTL, None)
         except Exception as e:
             logger.warning(f"获取斗鱼直播间 {room_id} 信息失败: {e}")
         return None
 
+    @classmethod
+    def invalidate(cls, room_id: int | None = None) -> None:
+        """清除缓存的房间信息，room_id 为 None 时清除全部"""
+        if room_id is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(room_id, None)
+
+    @classmethod
+    async def close(cls) -> None:
+        """关闭连接池并清除缓存"""
+        cls._cache.clear()
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
     @classmethod
     async def get_streamer_name(cls, room_id: int) -> str:
         """获取主播名称
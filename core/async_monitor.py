@@ -0,0 +1,249 @@
+"""基于 asyncio 的斗鱼弹幕监控引擎
+
+所有直播间的弹幕连接以协程形式运行在少量固定的事件循环线程上，
+避免 pydouyu 每个房间占用多个系统线程的开销。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+from collections.abc import Callable, Coroutine
+from threading import Lock, Thread
+from typing import Any
+
+from astrbot.api import logger
+
+from . import stt
+from .monitor import BaseMonitor
+
+DANMAKU_HOST = "danmuproxy.douyu.com"
+DANMAKU_PORT = 8601
+CONNECT_TIMEOUT = 10.0
+# 心跳间隔（秒）
+HEARTBEAT_INTERVAL = 45.0
+# 读超时（秒），超过该时间未收到任何数据视为连接失效
+READ_TIMEOUT = HEARTBEAT_INTERVAL * 3
+# 断线重连间隔（秒）
+RECONNECT_DELAY = 10.0
+# 单次读取的最大字节数
+RECV_BUFFER_SIZE = 64 * 1024
+
+
+class DanmakuEngine:
+    """弹幕连接事件循环池
+
+    维护固定数量的后台事件循环线程，房间按房间号分配到其中一个循环上。
+    """
+
+    def __init__(self, loop_count: int = 1):
+        """初始化引擎
+
+        Args:
+            loop_count: 事件循环（线程）数量
+        """
+        self.loop_count = max(1, loop_count)
+        self._loops: list[asyncio.AbstractEventLoop] = []
+        self._threads: list[Thread] = []
+        self._lock = Lock()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._loops)
+
+    def start(self) -> None:
+        """启动所有事件循环线程（重复调用无副作用）"""
+        with self._lock:
+            if self._loops:
+                return
+            for index in range(self.loop_count):
+                loop = asyncio.new_event_loop()
+                thread = Thread(
+                    target=self._run_loop,
+                    args=(loop,),
+                    name=f"douyu-danmaku-{index}",
+                    daemon=True,
+                )
+                self._loops.append(loop)
+                self._threads.append(thread)
+                thread.start()
+        logger.info(f"斗鱼弹幕引擎已启动，事件循环数: {self.loop_count}")
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+
+    def get_loop(self, room_id: int) -> asyncio.AbstractEventLoop:
+        """获取房间所属的事件循环"""
+        self.start()
+        return self._loops[room_id % len(self._loops)]
+
+    def submit(
+        self, room_id: int, coro: Coroutine[Any, Any, Any]
+    ) -> concurrent.futures.Future:
+        """在房间所属的事件循环上运行协程"""
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop(room_id))
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """取消所有连接任务并停止事件循环"""
+        with self._lock:
+            loops, threads = self._loops, self._threads
+            self._loops, self._threads = [], []
+
+        for loop in loops:
+            if loop.is_closed():
+                continue
+            try:
+                asyncio.run_coroutine_threadsafe(_cancel_all_tasks(), loop).result(timeout)
+            except Exception as e:
+                logger.debug(f"取消弹幕连接任务时出错: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+
+        for thread in threads:
+            thread.join(timeout=timeout)
+        if loops:
+            logger.info("斗鱼弹幕引擎已停止")
+
+
+async def _cancel_all_tasks() -> None:
+    current = asyncio.current_task()
+    tasks = [t for t in asyncio.all_tasks() if t is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class AsyncDouyuMonitor(BaseMonitor):
+    """基于 asyncio 的斗鱼直播监控器
+
+    直接使用 asyncio 流实现 STT 协议，在 DanmakuEngine 的事件循环中运行，
+    回调约定与 DouyuMonitor 保持一致（在引擎线程中同步调用）。
+    """
+
+    def __init__(
+        self,
+        room_id: int,
+        engine: DanmakuEngine,
+        live_callback: Callable[[int, dict], None] | None = None,
+        gift_callback: Callable[[int, dict], None] | None = None,
+        offline_callback: Callable[[int, float], None] | None = None,
+    ):
+        """初始化监控器
+
+        Args:
+            room_id: 斗鱼直播间房间号
+            engine: 运行连接协程的弹幕引擎
+            live_callback: 开播回调函数，参数为 (room_id, msg)
+            gift_callback: 礼物回调函数，参数为 (room_id, msg)
+            offline_callback: 下播回调函数，参数为 (room_id, duration_seconds)
+        """
+        super().__init__(room_id, live_callback, gift_callback, offline_callback)
+        self.engine = engine
+        self._future: concurrent.futures.Future | None = None
+        self._stop_flag = False
+        self._handlers: dict[str, Callable[[dict], None]] = {
+            "rss": self._rss_handler,
+            "dgb": self._dgb_handler,
+        }
+        # 只完整解码有处理器的消息类型，弹幕、进房等广播在帧头即被跳过
+        self._decoder = stt.SttDecoder(wanted_types=self._handlers.keys())
+
+    def get_decode_stats(self) -> dict[str, int] | None:
+        decoder = self._decoder
+        return {
+            "frames": decoder.frames,
+            "bytes": decoder.bytes,
+            "skipped_frames": decoder.skipped_frames,
+            "skipped_bytes": decoder.skipped_bytes,
+        }
+
+    async def _heartbeat(self, writer: asyncio.StreamWriter) -> None:
+        """定时发送心跳包"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            writer.write(stt.heartbeat_packet())
+            await writer.drain()
+
+    async def _session(self) -> None:
+        """建立一次弹幕连接并持续读取消息，连接断开时返回或抛出异常"""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(DANMAKU_HOST, DANMAKU_PORT),
+            timeout=CONNECT_TIMEOUT,
+        )
+        heartbeat: asyncio.Task | None = None
+        try:
+            writer.write(stt.login_packet(self.room_id))
+            writer.write(stt.join_group_packet(self.room_id))
+            await writer.drain()
+            logger.info(f"斗鱼监控器 {self.room_id} 已连接")
+            self._notify_connected()
+
+            heartbeat = asyncio.create_task(self._heartbeat(writer))
+            decoder = self._decoder
+            decoder.reset()
+            handlers = self._handlers
+            while not self._stop_flag:
+                data = await asyncio.wait_for(reader.read(RECV_BUFFER_SIZE), READ_TIMEOUT)
+                if not data:
+                    raise ConnectionError("服务器关闭了连接")
+                for msg in decoder.feed(data):
+                    handler = handlers.get(msg.msg_type)
+                    if handler:
+                        handler(msg)
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+            writer.close()
+
+    async def _run(self) -> None:
+        """连接主循环，断线后自动重连"""
+        self.running = True
+        try:
+            while not self._stop_flag:
+                try:
+                    await self._session()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(
+                        f"斗鱼监控器 {self.room_id} 连接断开: {e!r}，"
+                        f"{RECONNECT_DELAY:.0f} 秒后重连"
+                    )
+                if not self._stop_flag:
+                    await asyncio.sleep(RECONNECT_DELAY)
+        finally:
+            self.running = False
+
+    def start(self) -> bool:
+        """启动监控
+
+        Returns:
+            是否成功启动
+        """
+        if self._future and not self._future.done():
+            return True
+
+        self._stop_flag = False
+        try:
+            self._future = self.engine.submit(self.room_id, self._run())
+        except Exception as e:
+            logger.error(f"斗鱼监控器 {self.room_id} 启动失败: {e}")
+            return False
+        self.running = True
+        return True
+
+    def stop(self) -> None:
+        """停止监控"""
+        self._stop_flag = True
+        self.running = False
+        if self._future:
+            self._future.cancel()
+            self._future = None
+        logger.info(f"斗鱼直播间 {self.room_id} 监控已停止")
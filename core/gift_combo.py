@@ -0,0 +1,134 @@
+"""礼物连击合并模块"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+# 单次连击的最长合并时间（秒），超过后立即播报，避免超长连击一直不出消息
+GIFT_COMBO_MAX_DURATION = 60.0
+
+
+@dataclass
+class GiftCombo:
+    """一次进行中的礼物连击
+
+    Attributes:
+        room_id: 房间号
+        window: 合并窗口（秒）
+        uid: 送礼用户 ID
+        gift_id: 礼物 ID
+        user_name: 送礼用户昵称
+        gift_count: 累计礼物数量
+        hits: 最近一次 dgb 消息中的连击数
+        started_at: 连击开始时间戳
+    """
+
+    room_id: int
+    window: float
+    uid: str
+    gift_id: str
+    user_name: str
+    gift_count: int = 0
+    hits: int | None = None
+    started_at: float = field(default_factory=time.time)
+    _handle: asyncio.TimerHandle | None = field(default=None, repr=False)
+
+
+class GiftComboCoalescer:
+    """礼物连击合并器
+
+    按 (房间, 窗口, 用户, 礼物) 聚合 dgb 消息，窗口期内没有新的连击或
+    ``hits`` 重新计数时视为连击结束，通过 on_flush 回调输出一次聚合结果。
+    所有方法都必须在事件循环线程中调用。
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_flush: Callable[[GiftCombo], None],
+        max_duration: float = GIFT_COMBO_MAX_DURATION,
+    ):
+        """初始化合并器
+
+        Args:
+            loop: 运行合并定时器的事件循环
+            on_flush: 连击结束时的回调
+            max_duration: 单次连击的最长合并时间（秒）
+        """
+        self.loop = loop
+        self.on_flush = on_flush
+        self.max_duration = max_duration
+        self._combos: dict[tuple[int, float, str, str], GiftCombo] = {}
+
+    @property
+    def pending_count(self) -> int:
+        """进行中的连击数量"""
+        return len(self._combos)
+
+    def add(
+        self,
+        room_id: int,
+        window: float,
+        uid: str,
+        gift_id: str,
+        user_name: str,
+        gift_count: int,
+        hits: int | None,
+    ) -> None:
+        """加入一条礼物消息
+
+        Args:
+            room_id: 房间号
+            window: 合并窗口（秒）
+            uid: 送礼用户 ID
+            gift_id: 礼物 ID
+            user_name: 送礼用户昵称
+            gift_count: 本条消息的礼物数量（gfcnt）
+            hits: 本条消息的连击数，没有该字段时为 None
+        """
+        key = (room_id, window, uid, gift_id)
+        combo = self._combos.get(key)
+
+        # hits 没有递增说明上一轮连击已结束，新的连击开始
+        if combo and hits is not None and combo.hits is not None and hits <= combo.hits:
+            self._flush(key)
+            combo = None
+
+        if combo is None:
+            combo = GiftCombo(
+                room_id=room_id,
+                window=window,
+                uid=uid,
+                gift_id=gift_id,
+                user_name=user_name,
+            )
+            self._combos[key] = combo
+
+        combo.gift_count += gift_count
+        combo.hits = hits
+        combo.user_name = user_name
+
+        if time.time() - combo.started_at >= self.max_duration:
+            self._flush(key)
+            return
+
+        if combo._handle:
+            combo._handle.cancel()
+        combo._handle = self.loop.call_later(window, self._flush, key)
+
+    def _flush(self, key: tuple[int, float, str, str]) -> None:
+        combo = self._combos.pop(key, None)
+        if combo is None:
+            return
+        if combo._handle:
+            combo._handle.cancel()
+            combo._handle = None
+        self.on_flush(combo)
+
+    def flush_all(self) -> None:
+        """立即输出所有进行中的连击"""
+        for key in list(self._combos):
+            self._flush(key)
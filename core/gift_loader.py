@@ -0,0 +1,304 @@
+"""礼物配置异步加载模块"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Iterable
+
+import httpx
+
+from astrbot.api import logger
+
+from ..storage.gift_cache import GLOBAL_GIFT_KEY, GiftConfigCache
+from ..utils.gift_config import (
+    GIFT_CONFIG_URL,
+    ROOM_GIFT_CONFIG_URL,
+    decode_gift_config,
+    decode_room_gift_config,
+    get_gift_snapshot,
+    gift_table_from_rows,
+    gift_table_to_rows,
+    parse_gift_config,
+    parse_room_gift_config,
+    publish_gift_table,
+    publish_room_gift_tables,
+)
+
+# 单个请求超时（秒）
+REQUEST_TIMEOUT = 10.0
+# 按需加载房间配置后，同一房间再次遇到未知礼物时重新拉取的最短间隔（秒）
+ROOM_MISS_COOLDOWN = 600.0
+
+
+class GiftConfigLoader:
+    """礼物配置异步加载器
+
+    所有请求共用一个带连接池的 httpx.AsyncClient，房间配置在并发上限内并行拉取，
+    整批加载受总时限约束，超时未完成的房间继续使用已有缓存。
+    配置了磁盘缓存时，请求携带 If-None-Match / If-Modified-Since，
+    内容未变化（304）时直接沿用缓存，不再下载与解析。
+
+    房间配置按需加载：房间首次出现未知礼物时发起一次拉取，
+    同一房间并发的未命中共用这一次正在进行的请求。
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        deadline: float = 60.0,
+        cache: GiftConfigCache | None = None,
+    ):
+        """初始化加载器
+
+        Args:
+            concurrency: 同时进行的请求数
+            deadline: warmup 整批加载的总时限（秒）
+            cache: 礼物配置磁盘缓存，None 表示不缓存
+        """
+        self.concurrency = max(1, concurrency)
+        self.deadline = deadline
+        self.cache = cache
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # 正在进行的按需房间加载 {room_id -> task}，只在事件循环线程中修改
+        self._room_loads: dict[int, asyncio.Task] = {}
+        # 最近一次按需加载房间配置的时间 {room_id -> monotonic}
+        self._room_attempts: dict[int, float] = {}
+        # 各配置最近一次成功获取或校验的时间戳 {room_id -> time}，全局配置的键为 GLOBAL_GIFT_KEY
+        self.refreshed_at: dict[int, float] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                ),
+            )
+        return self._client
+
+    def restore(self) -> tuple[bool, int]:
+        """从磁盘缓存发布礼物表（不发起网络请求）
+
+        Returns:
+            (是否恢复了全局配置, 恢复的房间数)
+        """
+        if self.cache is None:
+            return False, 0
+        try:
+            entries = self.cache.load_all()
+        except Exception as exc:
+            logger.warning(f"读取礼物配置缓存失败: {exc}")
+            return False, 0
+
+        for key, entry in entries.items():
+            self.refreshed_at[key] = entry.fetched_at
+        global_entry = entries.pop(GLOBAL_GIFT_KEY, None)
+        # 先发布房间表，全局表发布时会把房间礼物合并进去
+        publish_room_gift_tables(
+            {room_id: gift_table_from_rows(entry.rows) for room_id, entry in entries.items()}
+        )
+        if global_entry is not None:
+            publish_gift_table(
+                gift_table_from_rows(global_entry.rows),
+                global_entry.named,
+                global_entry.fetched_at,
+            )
+        return global_entry is not None, len(entries)
+
+    async def _get(self, url: str, key: int) -> tuple[httpx.Response, int | None]:
+        """发起（条件）请求
+
+        Returns:
+            (响应, 缓存中的礼物数量)，没有缓存时礼物数量为 None
+        """
+        headers: dict[str, str] = {}
+        cached_named = None
+        # 只有当前快照中确实有这份礼物表时才发条件请求，否则 304 会让表一直缺失
+        snapshot = get_gift_snapshot()
+        if key == GLOBAL_GIFT_KEY:
+            published = snapshot.loaded_at is not None
+        else:
+            published = key in snapshot.room_gifts
+        if self.cache is not None and published:
+            validators = await asyncio.to_thread(self.cache.validators, key)
+            if validators is not None:
+                etag, last_modified, cached_named = validators
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+        async with self._semaphore:
+            response = await self.client.get(url, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response, cached_named
+
+    def _store(self, key: int, response: httpx.Response, table: dict, named: int) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(
+                key,
+                gift_table_to_rows(table),
+                named,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        except Exception as exc:
+            logger.warning(f"写入礼物配置缓存失败: {exc}")
+
+    async def load_global(self) -> int:
+        """拉取并发布全局礼物配置
+
+        Returns:
+            加载到的礼物数量（失败时抛异常）
+        """
+        response, cached_named = await self._get(GIFT_CONFIG_URL, GLOBAL_GIFT_KEY)
+        if response.status_code == 304 and cached_named is not None:
+            await asyncio.to_thread(self.cache.touch, GLOBAL_GIFT_KEY)
+            self.refreshed_at[GLOBAL_GIFT_KEY] = time.time()
+            return cached_named
+
+        # 全局配置体积较大，解码、解析与写缓存放到线程中进行
+        def apply() -> int:
+            gifts, named = parse_gift_config(decode_gift_config(response.text))
+            publish_gift_table(gifts, named)
+            self._store(GLOBAL_GIFT_KEY, response, gifts, named)
+            return named
+
+        named = await asyncio.to_thread(apply)
+        self.refreshed_at[GLOBAL_GIFT_KEY] = time.time()
+        return named
+
+    async def load_room(self, room_id: int) -> int:
+        """拉取并发布房间礼物配置
+
+        Returns:
+            加载到的房间礼物数量（失败时抛异常）
+        """
+        response, cached_named = await self._get(
+            ROOM_GIFT_CONFIG_URL.format(room_id=room_id), room_id
+        )
+        if response.status_code == 304 and cached_named is not None:
+            await asyncio.to_thread(self.cache.touch, room_id)
+            self.refreshed_at[room_id] = time.time()
+            return cached_named
+
+        # 发布时需要复制并合并全局表，与写缓存一起放到线程中进行
+        def apply() -> int:
+            room_table, named = parse_room_gift_config(decode_room_gift_config(response.text))
+            publish_room_gift_tables({room_id: room_table})
+            self._store(room_id, response, room_table, named)
+            return named
+
+        named = await asyncio.to_thread(apply)
+        self.refreshed_at[room_id] = time.time()
+        return named
+
+    def should_load_room(self, room_id: int) -> bool:
+        """房间出现未知礼物时是否需要等待房间配置（可在任意线程调用）"""
+        if room_id in self._room_loads:
+            return True
+        last = self._room_attempts.get(room_id)
+        return last is None or time.monotonic() - last >= ROOM_MISS_COOLDOWN
+
+    async def wait_room(self, room_id: int, timeout: float) -> bool:
+        """按需加载房间配置，最多等待 timeout 秒
+
+        同一房间同时只有一次拉取，并发调用共用同一个任务；
+        等待超时不会取消拉取，完成后的配置仍会发布供后续礼物使用。
+
+        Returns:
+            房间配置是否在时限内加载成功
+        """
+        task = self._room_loads.get(room_id)
+        if task is None:
+            self._room_attempts[room_id] = time.monotonic()
+            task = asyncio.create_task(self._load_room_logged(room_id))
+            self._room_loads[room_id] = task
+            task.add_done_callback(lambda _: self._room_loads.pop(room_id, None))
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        return bool(done) and not task.cancelled() and task.result() is True
+
+    async def discard_room(self, room_id: int) -> None:
+        """删除房间的磁盘缓存"""
+        self._room_attempts.pop(room_id, None)
+        self.refreshed_at.pop(room_id, None)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.delete, room_id)
+
+    async def _load_room_logged(self, room_id: int) -> bool:
+        try:
+            count = await self.load_room(room_id)
+            logger.debug(f"房间 {room_id} 礼物配置已加载，共 {count} 个礼物")
+            return True
+        except Exception as exc:
+            logger.warning(f"房间 {room_id} 礼物配置加载失败，继续使用缓存: {exc}")
+            return False
+
+    async def warmup(
+        self, room_ids: Iterable[int], include_global: bool = True
+    ) -> tuple[int, int]:
+        """并行加载全局与所有房间的礼物配置
+
+        Args:
+            room_ids: 需要加载的房间号
+            include_global: 是否同时加载全局礼物配置
+
+        Returns:
+            (成功加载的房间数, 房间总数)
+        """
+        started = time.monotonic()
+        room_ids = list(room_ids)
+
+        async def load_global_logged() -> None:
+            try:
+                count = await self.load_global()
+                logger.info(f"礼物配置已加载，共 {count} 个礼物")
+            except Exception as exc:
+                logger.warning(f"礼物配置加载失败，继续使用本地配置: {exc}")
+
+        tasks = [asyncio.create_task(load_global_logged())] if include_global else []
+        room_tasks = [asyncio.create_task(self._load_room_logged(rid)) for rid in room_ids]
+        tasks.extend(room_tasks)
+
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                f"礼物配置加载超过 {self.deadline:.0f} 秒，已放弃 {len(pending)} 个未完成的请求"
+            )
+
+        loaded = sum(
+            1 for task in room_tasks if not task.cancelled() and task.result() is True
+        )
+        if room_ids:
+            logger.info(
+                f"房间礼物配置加载完成: {loaded}/{len(room_ids)}，"
+                f"耗时 {time.monotonic() - started:.1f}s"
+            )
+        return loaded, len(room_ids)
+
+    async def close(self) -> None:
+        """关闭连接池与磁盘缓存"""
+        tasks = list(self._room_loads.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
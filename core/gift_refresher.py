@@ -0,0 +1,160 @@
+"""礼物配置定时刷新模块"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Callable, Iterable
+
+from astrbot.api import logger
+
+from ..storage.gift_cache import GLOBAL_GIFT_KEY
+from ..utils.gift_config import get_gift_snapshot
+from .gift_loader import GiftConfigLoader
+
+# 默认刷新周期（秒）
+GIFT_REFRESH_TTL = 6 * 3600.0
+# 刷新时间随机抖动比例（相对于相邻两次刷新的间隔）
+GIFT_REFRESH_JITTER = 0.3
+
+
+class GiftConfigRefresher:
+    """礼物配置后台刷新器
+
+    全局配置与每个已加载的房间配置都有一个 TTL。每个周期内把需要刷新的条目
+    均匀分布在整个 TTL 上（叠加随机抖动），正在直播的房间排在最前；
+    距离上次刷新不到半个 TTL 的条目（如刚按需加载过的房间）跳过本周期。
+    手动刷新同样在后台进行，命令无需等待。
+    """
+
+    def __init__(
+        self,
+        loader: GiftConfigLoader,
+        get_room_ids: Callable[[], Iterable[int]],
+        is_live: Callable[[int], bool],
+        ttl: float = GIFT_REFRESH_TTL,
+        jitter: float = GIFT_REFRESH_JITTER,
+    ):
+        """初始化刷新器
+
+        Args:
+            loader: 礼物配置加载器
+            get_room_ids: 获取当前监控房间号的函数
+            is_live: 判断房间是否正在直播的函数
+            ttl: 刷新周期（秒），不大于 0 时不启用定时刷新
+            jitter: 刷新时间随机抖动比例
+        """
+        self.loader = loader
+        self.get_room_ids = get_room_ids
+        self.is_live = is_live
+        self.ttl = ttl
+        self.jitter = jitter
+        self._task: asyncio.Task | None = None
+        self._manual_task: asyncio.Task | None = None
+        # 当前定时刷新周期的进度
+        self.cycle_done = 0
+        self.cycle_total = 0
+        # 当前手动刷新的进度
+        self.manual_done = 0
+        self.manual_total = 0
+
+    @property
+    def manual_running(self) -> bool:
+        """是否有正在进行的手动刷新"""
+        return self._manual_task is not None and not self._manual_task.done()
+
+    def start(self) -> None:
+        """启动定时刷新（必须在事件循环中调用）"""
+        if self.ttl > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def age(self, key: int) -> float | None:
+        """距离上次成功刷新的秒数，未加载时为 None
+
+        Args:
+            key: 房间号，全局配置为 GLOBAL_GIFT_KEY
+        """
+        refreshed_at = self.loader.refreshed_at.get(key)
+        return None if refreshed_at is None else max(0.0, time.time() - refreshed_at)
+
+    def _plan(self) -> list[int]:
+        """本周期需要刷新的条目：全局配置在前，其次直播中的房间，最后其他房间"""
+        loaded = get_gift_snapshot().room_gifts
+        rooms = [room_id for room_id in self.get_room_ids() if room_id in loaded]
+        rooms.sort(key=lambda room_id: not self.is_live(room_id))
+        return [GLOBAL_GIFT_KEY, *rooms]
+
+    async def _refresh(self, key: int) -> bool:
+        try:
+            if key == GLOBAL_GIFT_KEY:
+                count = await self.loader.load_global()
+                logger.debug(f"礼物配置已刷新，共 {count} 个礼物")
+            else:
+                count = await self.loader.load_room(key)
+                logger.debug(f"房间 {key} 礼物配置已刷新，共 {count} 个礼物")
+            return True
+        except Exception as exc:
+            target = "全局" if key == GLOBAL_GIFT_KEY else f"房间 {key} "
+            logger.warning(f"{target}礼物配置刷新失败，继续使用缓存: {exc}")
+            return False
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                plan = self._plan()
+                self.cycle_done, self.cycle_total = 0, len(plan)
+                slot = self.ttl / len(plan)
+                started = time.monotonic()
+                for index, key in enumerate(plan):
+                    due = started + slot * (index + random.uniform(0, self.jitter))
+                    await asyncio.sleep(max(0.0, due - time.monotonic()))
+                    age = self.age(key)
+                    if age is None or age >= self.ttl / 2:
+                        await self._refresh(key)
+                    self.cycle_done += 1
+                # 周期不足 TTL 时（如条目在周期内被移除）补足剩余时间
+                await asyncio.sleep(max(0.0, started + self.ttl - time.monotonic()))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"礼物配置定时刷新出错: {e}")
+                await asyncio.sleep(60)
+
+    def refresh_now(self, room_ids: Iterable[int]) -> bool:
+        """在后台立即刷新全局配置与指定房间的配置
+
+        Returns:
+            是否启动了新的刷新（已有手动刷新在进行时返回 False）
+        """
+        if self.manual_running:
+            return False
+        keys = [GLOBAL_GIFT_KEY, *room_ids]
+        self.manual_done, self.manual_total = 0, len(keys)
+        self._manual_task = asyncio.create_task(self._refresh_many(keys))
+        return True
+
+    async def _refresh_many(self, keys: list[int]) -> None:
+        started = time.monotonic()
+        succeeded = 0
+
+        async def refresh_one(key: int) -> None:
+            nonlocal succeeded
+            if await self._refresh(key):
+                succeeded += 1
+            self.manual_done += 1
+
+        # 并发上限由加载器的信号量控制
+        await asyncio.gather(*(refresh_one(key) for key in keys))
+        logger.info(
+            f"礼物配置手动刷新完成: {succeeded}/{len(keys)}，"
+            f"耗时 {time.monotonic() - started:.1f}s"
+        )
+
+    async def close(self) -> None:
+        """停止定时刷新与手动刷新"""
+        tasks = [task for task in (self._task, self._manual_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = self._manual_task = None
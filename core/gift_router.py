@@ -0,0 +1,102 @@
+"""礼物播报路由模块
+
+为每个房间预编译一张路由表：开启礼物播报的订阅者按连击合并窗口分组，
+组内按高价值阈值升序排列。价值为 V 的礼物只需每组一次二分查找，
+即可得到阈值不超过 V 的全部订阅者，不再逐个遍历订阅配置。
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..models.subscription import SubscriptionConfig
+
+# 未开启高价值过滤的订阅者排在最前，任何价值的礼物都会匹配
+_NO_THRESHOLD = float("-inf")
+
+
+class GiftRoute:
+    """单个房间的礼物播报路由表（构建后只读）"""
+
+    __slots__ = ("_groups", "needs_value")
+
+    def __init__(self, sub_configs: Mapping[str, SubscriptionConfig]):
+        """根据订阅配置构建路由表
+
+        Args:
+            sub_configs: {umo -> SubscriptionConfig}
+        """
+        entries: dict[float, list[tuple[float, str]]] = {}
+        needs_value = False
+        for umo, config in sub_configs.items():
+            if not config.gift_notify:
+                continue
+            if config.high_value_threshold is None:
+                threshold = _NO_THRESHOLD
+            else:
+                threshold = float(config.high_value_threshold)
+                needs_value = True
+            entries.setdefault(config.gift_combo_window, []).append((threshold, umo))
+
+        # {window -> (升序阈值列表, 对应的 umo 列表)}
+        self._groups: dict[float, tuple[list[float], list[str]]] = {}
+        for window, items in entries.items():
+            items.sort()
+            self._groups[window] = ([t for t, _ in items], [u for _, u in items])
+        # 是否有订阅者开启了高价值过滤（否则无需查询礼物价值）
+        self.needs_value = needs_value
+
+    def __bool__(self) -> bool:
+        return bool(self._groups)
+
+    def match(self, gift_value: int | None) -> dict[float, dict[str, bool]]:
+        """获取应收到该礼物播报的订阅者
+
+        Args:
+            gift_value: 礼物价值，未知时按 0 处理
+
+        Returns:
+            {gift_combo_window -> {umo -> at_all}}，礼物通知不 @全体
+        """
+        value = gift_value or 0
+        recipients: dict[float, dict[str, bool]] = {}
+        for window, (thresholds, umos) in self._groups.items():
+            count = bisect_right(thresholds, value)
+            if count:
+                recipients[window] = dict.fromkeys(umos[:count], False)
+        return recipients
+
+
+class GiftRouter:
+    """按房间缓存礼物播报路由表
+
+    订阅配置以只读快照的形式提供，订阅或阈值变化时会发布新的快照对象；
+    路由表与构建它的快照一起缓存，快照被替换后在下一次礼物到达时重建一次。
+    """
+
+    def __init__(self, get_snapshot: Callable[[int], Mapping[str, SubscriptionConfig]]):
+        """初始化路由器
+
+        Args:
+            get_snapshot: 获取房间订阅配置只读快照的函数
+        """
+        self._get_snapshot = get_snapshot
+        self._routes: dict[int, tuple[Mapping[str, SubscriptionConfig], GiftRoute]] = {}
+
+    def route(self, room_id: int) -> GiftRoute:
+        """获取房间的路由表，必要时重建"""
+        snapshot = self._get_snapshot(room_id)
+        cached = self._routes.get(room_id)
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        # 快照不可变，并发重建只会得到相同的结果
+        route = GiftRoute(snapshot)
+        self._routes[room_id] = (snapshot, route)
+        return route
+
+    def discard(self, room_id: int) -> None:
+        """移除房间的路由表"""
+        self._routes.pop(room_id, None)
@@ -1,6 +1,7 @@
 """斗鱼直播监控器模块"""
 
 import time
+from abc import ABC, abstractmethod
 from collections.abc import Callable
 from threading import Lock, Thread
 
@@ -9,11 +10,11 @@ from astrbot.api import logger
 from pydouyu.client import Client
 
 
-class DouyuMonitor:
-    """斗鱼直播监控器
+class BaseMonitor(ABC):
+    """斗鱼直播监控器基类
 
-    使用 pydouyu 库监控指定直播间的开播状态和礼物消息，
-    当检测到开播或收到礼物时通过回调函数通知上层。
+    封装开播/下播状态判定与回调分发逻辑，
+    具体的弹幕连接方式由子类实现 start()/stop()。
     """
 
     def __init__(
@@ -35,9 +36,7 @@ class DouyuMonitor:
         self.live_callback = live_callback
         self.gift_callback = gift_callback
         self.offline_callback = offline_callback
-        self.client: Client | None = None
         self.running = False
-        self.thread: Thread | None = None
         # 使用 None 表示未知状态，避免首次消息误判
         self.last_live_status: bool | None = None
         self._stop_flag = False  # 停止标志
@@ -46,8 +45,16 @@ class DouyuMonitor:
         # 上次通知时间，防止短时间内重复通知
         self._last_notify_time: float = 0.0
         self._notify_cooldown = 30.0  # 通知冷却时间（秒）
-        # 线程锁，保护 client 和状态变量
-        self._lock = Lock()
+        # 连接建立回调，参数为 room_id（用于归还连接准入的握手名额）
+        self.connected_callback: Callable[[int], None] | None = None
+
+    def _notify_connected(self) -> None:
+        """通知上层弹幕连接已建立"""
+        if self.connected_callback:
+            try:
+                self.connected_callback(self.room_id)
+            except Exception as e:
+                logger.error(f"连接回调出错 ({self.room_id}): {e}")
 
     def _rss_handler(self, msg: dict) -> None:
         """处理直播状态变化
@@ -142,6 +149,48 @@ class DouyuMonitor:
         except Exception as e:
             logger.error(f"处理礼物消息时出错: {e}")
 
+    def get_decode_stats(self) -> dict[str, int] | None:
+        """获取弹幕解码统计
+
+        Returns:
+            包含 frames/bytes/skipped_frames/skipped_bytes 的字典，
+            不支持统计的引擎返回 None
+        """
+        return None
+
+    @abstractmethod
+    def start(self) -> bool:
+        """启动监控
+
+        Returns:
+            是否成功启动
+        """
+
+    @abstractmethod
+    def stop(self) -> None:
+        """停止监控"""
+
+
+class DouyuMonitor(BaseMonitor):
+    """斗鱼直播监控器
+
+    使用 pydouyu 库监控指定直播间的开播状态和礼物消息，
+    当检测到开播或收到礼物时通过回调函数通知上层。
+    """
+
+    def __init__(
+        self,
+        room_id: int,
+        live_callback: Callable[[int, dict], None] | None = None,
+        gift_callback: Callable[[int, dict], None] | None = None,
+        offline_callback: Callable[[int, float], None] | None = None,
+    ):
+        super().__init__(room_id, live_callback, gift_callback, offline_callback)
+        self.client: Client | None = None
+        self.thread: Thread | None = None
+        # 线程锁，保护 client 和状态变量
+        self._lock = Lock()
+
     def _run_client(self) -> None:
         """在线程中运行客户端"""
         client_to_cleanup = None
@@ -160,6 +209,7 @@ class DouyuMonitor:
 
             self.client.start()
             logger.info(f"斗鱼监控器 {self.room_id} 已启动")
+            self._notify_connected()
 
             # 等待内部线程结束或收到停止信号
             # message_worker 是一个 Thread，我们等待它
@@ -0,0 +1,344 @@
+"""多进程分片监控池
+
+将监控的直播间按房间号一致性哈希分配到 N 个工作进程，
+每个工作进程运行自己的 asyncio 弹幕引擎，只把过滤后的开播/下播/礼物事件
+以紧凑元组的形式通过队列发回主进程，使弹幕解码不再与 AstrBot 事件循环争用 GIL。
+
+工作进程的入口在 pool_worker.py 中，以脚本方式运行，不会导入插件包的 __init__。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import queue
+import runpy
+import time
+from bisect import bisect_right
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from threading import Lock, Thread
+from typing import Any
+
+from astrbot.api import logger
+
+from . import pool_worker
+from .monitor import BaseMonitor
+
+# 插件包名与插件目录，传给工作进程以注册包而不执行其 __init__
+PLUGIN_PACKAGE = __name__.rsplit(".", 2)[0]
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 主进程检查工作进程存活的间隔（秒）
+SUPERVISE_INTERVAL = 5.0
+# 重启工作进程前等待旧进程退出的时间（秒）
+REAP_TIMEOUT = 1.0
+
+
+class HashRing:
+    """一致性哈希环
+
+    每个节点在环上放置多个虚拟节点，节点数变化时只有少量房间需要迁移。
+    """
+
+    def __init__(self, nodes: int, replicas: int = 64):
+        points: list[tuple[int, int]] = []
+        for node in range(nodes):
+            for replica in range(replicas):
+                points.append((self._hash(f"{node}:{replica}"), node))
+        points.sort()
+        self._keys = [p[0] for p in points]
+        self._nodes = [p[1] for p in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def get_node(self, room_id: int) -> int:
+        """获取房间所属节点"""
+        index = bisect_right(self._keys, self._hash(str(room_id)))
+        return self._nodes[index % len(self._nodes)]
+
+
+class _Worker:
+    """主进程中对单个工作进程的引用"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.conn: Connection | None = None
+        self.rooms: set[int] = set()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class MonitorPool:
+    """多进程分片监控池
+
+    增删或重启房间只会向该房间所属的工作进程发送命令，其余房间不受影响；
+    工作进程意外退出时会被重新拉起，并只恢复原本属于它的房间。
+    """
+
+    def __init__(self, workers: int = 2):
+        """初始化监控池
+
+        Args:
+            workers: 工作进程数量
+        """
+        self.worker_count = max(1, workers)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._ring = HashRing(self.worker_count)
+        self._workers = [_Worker(i) for i in range(self.worker_count)]
+        self._monitors: dict[int, PooledMonitor] = {}
+        self._stats: dict[int, dict[str, int]] = {}
+        self._event_queue: Any = None
+        self._lock = Lock()
+        self._stop_flag = False
+        self._dispatch_thread: Thread | None = None
+        self._supervise_thread: Thread | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._event_queue is not None
+
+    def start(self) -> None:
+        """启动所有工作进程及事件分发线程（重复调用无副作用）"""
+        with self._lock:
+            if self._event_queue is not None:
+                return
+            self._stop_flag = False
+            self._event_queue = self._ctx.Queue()
+            for worker in self._workers:
+                self._spawn(worker)
+            self._dispatch_thread = Thread(
+                target=self._dispatch_events, name="douyu-pool-dispatch", daemon=True
+            )
+            self._supervise_thread = Thread(
+                target=self._supervise, name="douyu-pool-supervise", daemon=True
+            )
+            self._dispatch_thread.start()
+            self._supervise_thread.start()
+        logger.info(f"斗鱼监控进程池已启动，工作进程数: {self.worker_count}")
+
+    def _reap(self, worker: _Worker) -> None:
+        """关闭旧的命令连接并回收已退出的工作进程，调用者需持有锁"""
+        if worker.conn is not None:
+            worker.conn.close()
+            worker.conn = None
+        process = worker.process
+        if process is not None:
+            process.join(REAP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join(REAP_TIMEOUT)
+            if not process.is_alive():
+                process.close()
+            worker.process = None
+
+    def _spawn(self, worker: _Worker) -> None:
+        """启动（或重新启动）工作进程，调用者需持有锁"""
+        self._reap(worker)
+        parent_conn, child_conn = self._ctx.Pipe()
+        worker_args = {
+            "package": PLUGIN_PACKAGE,
+            "plugin_root": PLUGIN_ROOT,
+            "index": worker.index,
+            "cmd_conn": child_conn,
+            "event_queue": self._event_queue,
+        }
+        process = self._ctx.Process(
+            target=runpy.run_path,
+            args=(pool_worker.__file__,),
+            kwargs={
+                "init_globals": {"WORKER_ARGS": worker_args},
+                "run_name": pool_worker.WORKER_RUN_NAME,
+            },
+            name=f"douyu-monitor-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker.process = process
+        worker.conn = parent_conn
+        for room_id in worker.rooms:
+            parent_conn.send(("start", room_id))
+
+    def _send(self, worker: _Worker, command: str, room_id: int) -> bool:
+        """向工作进程发送命令，调用者需持有锁"""
+        if worker.conn is None:
+            return False
+        try:
+            worker.conn.send((command, room_id))
+            return True
+        except (OSError, EOFError) as e:
+            logger.warning(f"向斗鱼监控工作进程 {worker.index} 发送命令失败: {e}")
+            return False
+
+    def worker_of(self, room_id: int) -> int:
+        """获取房间所属的工作进程编号"""
+        return self._ring.get_node(room_id)
+
+    def attach(self, monitor: PooledMonitor) -> bool:
+        """在所属工作进程中启动（或重启）房间连接"""
+        self.start()
+        worker = self._workers[self.worker_of(monitor.room_id)]
+        with self._lock:
+            self._monitors[monitor.room_id] = monitor
+            worker.rooms.add(monitor.room_id)
+            return self._send(worker, "start", monitor.room_id)
+
+    def detach(self, monitor: PooledMonitor) -> None:
+        """停止房间连接（房间已被新的监控器接管时忽略）"""
+        worker = self._workers[self.worker_of(monitor.room_id)]
+        with self._lock:
+            if self._monitors.get(monitor.room_id) is not monitor:
+                return
+            del self._monitors[monitor.room_id]
+            self._stats.pop(monitor.room_id, None)
+            worker.rooms.discard(monitor.room_id)
+            self._send(worker, "stop", monitor.room_id)
+
+    def is_running(self, room_id: int) -> bool:
+        worker = self._workers[self.worker_of(room_id)]
+        return room_id in worker.rooms and worker.alive
+
+    def get_stats(self, room_id: int) -> dict[str, int] | None:
+        return self._stats.get(room_id)
+
+    def _dispatch_events(self) -> None:
+        """从事件队列读取工作进程上报的事件并调用对应监控器的回调"""
+        while not self._stop_flag:
+            try:
+                kind, room_id, payload = self._event_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (OSError, EOFError, ValueError):
+                break
+            try:
+                if kind == "stats":
+                    self._stats.update(
+                        (rid, s) for rid, s in payload.items() if s is not None
+                    )
+                    continue
+                monitor = self._monitors.get(room_id)
+                if monitor:
+                    monitor.dispatch(kind, payload)
+            except Exception as e:
+                logger.error(f"处理斗鱼监控进程事件时出错: {e}")
+
+    def _supervise(self) -> None:
+        """检查工作进程存活，异常退出时重新拉起"""
+        while not self._stop_flag:
+            time.sleep(SUPERVISE_INTERVAL)
+            self._restart_dead_workers()
+
+    def _restart_dead_workers(self) -> int:
+        """重新拉起已退出的工作进程
+
+        Returns:
+            重启的工作进程数
+        """
+        restarted = 0
+        with self._lock:
+            if self._stop_flag:
+                return 0
+            for worker in self._workers:
+                if not worker.alive:
+                    exitcode = worker.process.exitcode if worker.process else None
+                    logger.warning(
+                        f"斗鱼监控工作进程 {worker.index} 已退出 (exitcode={exitcode})，"
+                        f"正在重启并恢复 {len(worker.rooms)} 个房间"
+                    )
+                    self._spawn(worker)
+                    restarted += 1
+        return restarted
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """停止所有工作进程"""
+        with self._lock:
+            if self._event_queue is None:
+                return
+            self._stop_flag = True
+            for worker in self._workers:
+                self._send(worker, "shutdown", 0)
+
+        for worker in self._workers:
+            if worker.process:
+                worker.process.join(timeout)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+            if worker.conn:
+                worker.conn.close()
+            worker.process = None
+            worker.conn = None
+
+        if self._dispatch_thread:
+            self._dispatch_thread.join(timeout)
+        self._event_queue.close()
+        self._event_queue = None
+        logger.info("斗鱼监控进程池已停止")
+
+
+class PooledMonitor(BaseMonitor):
+    """运行在监控池工作进程中的房间监控器代理
+
+    开播/下播判定在工作进程中完成，这里同步记录直播状态后把事件转交给回调，
+    使 last_live_status 等状态与其他引擎的监控器一致。
+    """
+
+    def __init__(
+        self,
+        room_id: int,
+        pool: MonitorPool,
+        live_callback: Callable[[int, dict], None] | None = None,
+        gift_callback: Callable[[int, dict], None] | None = None,
+        offline_callback: Callable[[int, float], None] | None = None,
+    ):
+        super().__init__(room_id, live_callback, gift_callback, offline_callback)
+        self.pool = pool
+        self._attached = False
+
+    @property  # type: ignore[override]
+    def running(self) -> bool:
+        return self._attached and self.pool.is_running(self.room_id)
+
+    @running.setter
+    def running(self, value: bool) -> None:
+        # 运行状态由监控池决定，忽略基类的赋值
+        pass
+
+    def dispatch(self, kind: str, payload: Any) -> None:
+        """在分发线程中更新直播状态并调用回调（含连接建立信号）"""
+        if kind == "gift":
+            self._dgb_handler(payload)
+        elif kind == "connected":
+            self._notify_connected()
+        elif kind == "live":
+            now = time.time()
+            self.last_live_status = True
+            self.live_start_time = now
+            self._has_announced_live = True
+            self._last_notify_time = now
+            if self.live_callback:
+                self.live_callback(self.room_id, payload)
+        elif kind == "offline":
+            self.last_live_status = False
+            self.live_start_time = None
+            self._has_announced_live = False
+            self._last_notify_time = time.time()
+            if self.offline_callback:
+                self.offline_callback(self.room_id, payload)
+
+    def get_decode_stats(self) -> dict[str, int] | None:
+        return self.pool.get_stats(self.room_id)
+
+    def start(self) -> bool:
+        self._attached = self.pool.attach(self)
+        return self._attached
+
+    def stop(self) -> None:
+        self._attached = False
+        self.pool.detach(self)
+        logger.info(f"斗鱼直播间 {self.room_id} 监控已停止")
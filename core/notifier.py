@@ -1,13 +1,17 @@
 """通知发送模块"""
 
+import asyncio
 import time
+from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from astrbot.api import logger
 from astrbot.api.event import MessageEventResult
 from astrbot.api.message_components import AtAll, Plain
 
-from ..utils.gift_config import get_gift_name, get_gift_value
+from ..utils.gift_config import get_gift_info
+from .rate_limiter import PRIORITY_GIFT, RateLimiter, SendDropped
+from .retry_scheduler import RetryScheduler
 
 if TYPE_CHECKING:
     from astrbot.api import star
@@ -19,13 +23,26 @@ class Notifier:
     负责构建和发送开播通知、礼物通知消息。
     """
 
-    def __init__(self, context: "star.Context"):
+    def __init__(
+        self,
+        context: "star.Context",
+        max_concurrency: int = 10,
+        rate_limiter: RateLimiter | None = None,
+        retry_options: dict[str, float] | None = None,
+    ):
         """初始化通知器
 
         Args:
             context: AstrBot 上下文
+            max_concurrency: 同时发送的最大消息数
+            rate_limiter: 发送限流器，None 表示不限流
+            retry_options: 传给 RetryScheduler 的退避参数（base_delay/max_delay/max_age/jitter）
         """
         self.context = context
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.retries = RetryScheduler(self._resend, **(retry_options or {}))
 
     def build_notification(
         self,
@@ -68,6 +85,7 @@ class Notifier:
         gift_id: str | int,
         gift_count: int,
         timestamp: float | None = None,
+        total_value: int | None = None,
     ) -> str:
         """构建礼物通知消息文本
 
@@ -78,6 +96,7 @@ class Notifier:
             gift_id: 礼物 ID
             gift_count: 礼物数量
             timestamp: 时间戳，默认当前时间
+            total_value: 连击合并后的总价值，提供时替代单个礼物价值显示
 
         Returns:
             格式化的礼物通知消息
@@ -86,9 +105,14 @@ class Notifier:
             timestamp = time.time()
 
         time_str = time.strftime("%H:%M:%S", time.localtime(timestamp))
-        gift_name = get_gift_name(gift_id, room_id=room_id)
-        gift_value = get_gift_value(gift_id, room_id=room_id)
-        gift_value_text = f"（价值: {gift_value}）" if gift_value is not None else ""
+        gift = get_gift_info(gift_id, room_id=room_id)
+        gift_name, gift_value = gift.name, gift.value
+        if total_value is not None:
+            gift_value_text = f"（总价值: {total_value}）"
+        elif gift_value is not None:
+            gift_value_text = f"（价值: {gift_value}）"
+        else:
+            gift_value_text = ""
 
         return (
             f"🎁 斗鱼直播礼物播报\n"
@@ -144,43 +168,90 @@ class Notifier:
             f"感谢观看，下次再见！"
         )
 
+    async def _send_once(
+        self, umo: str, message: str, at_all: bool, priority: int = PRIORITY_GIFT
+    ) -> bool:
+        """在限流与并发限制内发送一次消息
+
+        Returns:
+            是否发送成功
+
+        Raises:
+            SendDropped: 礼物播报被限流器丢弃
+        """
+        # 先排队取得限流令牌，等待令牌期间不占用并发名额
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(umo, priority)
+        async with self._semaphore:
+            try:
+                result = MessageEventResult()
+                if at_all:
+                    result.chain.append(AtAll())
+                    result.chain.append(Plain("\n"))
+                result.chain.append(Plain(message))
+                await self.context.send_message(umo, result)
+                logger.info(f"已发送通知到: {umo} (at_all={at_all})")
+                return True
+            except Exception as e:
+                logger.warning(f"发送通知失败 ({umo}): {e}")
+                return False
+
+    async def _resend(self, umo: str, message: str, priority: int) -> bool:
+        """重试发送，重试时不使用 @全体（避免权限问题）"""
+        return await self._send_once(umo, message, at_all=False, priority=priority)
+
     async def send_to_subscribers(
         self,
         subscriber_settings: dict[str, bool],
         message: str,
         max_retries: int = 3,
-        retry_delay: float = 2.0,
+        retry_delay: float | None = None,
+        priority: int = PRIORITY_GIFT,
+        on_result: Callable[[str, bool], None] | None = None,
     ) -> None:
-        """发送通知给所有订阅者
+        """并发发送通知给所有订阅者
+
+        首次发送在并发限制内同时进行，发送失败的订阅者交给重试调度器
+        按指数退避重试，不会拖慢其他订阅者。
 
         Args:
             subscriber_settings: {umo -> at_all} 每个订阅者的 @全体设置
             message: 通知消息内容
-            max_retries: 最大重试次数
-            retry_delay: 重试间隔（秒）
+            max_retries: 最大尝试次数（含首次发送）
+            retry_delay: 首次重试延迟（秒），之后指数增长，None 表示使用调度器默认值
+            priority: 限流排队优先级，数值越小越优先
+            on_result: 每个订阅者最终投递结果的回调，参数为 (umo, 是否成功)
         """
-        import asyncio
-
-        for umo, at_all in subscriber_settings.items():
-            for attempt in range(max_retries):
-                try:
-                    result = MessageEventResult()
-                    # 第一次尝试时使用 @全体，重试时不用（避免权限问题）
-                    if at_all and attempt == 0:
-                        result.chain.append(AtAll())
-                        result.chain.append(Plain("\n"))
-                    result.chain.append(Plain(message))
-                    await self.context.send_message(umo, result)
-                    logger.info(f"已发送通知到: {umo} (at_all={at_all})")
-                    break  # 发送成功，跳出重试循环
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        logger.warning(
-                            f"发送通知失败 ({umo})，{retry_delay}秒后重试 "
-                            f"({attempt + 1}/{max_retries}): {e}"
-                        )
-                        await asyncio.sleep(retry_delay)
-                    else:
-                        logger.error(
-                            f"发送通知失败 ({umo})，已达最大重试次数: {e}"
-                        )
+        if not subscriber_settings:
+            return
+
+        umos = list(subscriber_settings)
+        results = await asyncio.gather(
+            *(
+                self._send_once(umo, message, subscriber_settings[umo], priority)
+                for umo in umos
+            ),
+            return_exceptions=True,
+        )
+
+        for umo, ok in zip(umos, results):
+            if isinstance(ok, SendDropped):
+                # 排队超限的礼物播报直接放弃，不再重试
+                if on_result:
+                    on_result(umo, False)
+                continue
+            if isinstance(ok, BaseException):
+                raise ok
+            if ok or max_retries <= 1:
+                if on_result:
+                    on_result(umo, ok)
+                continue
+            self.retries.schedule(
+                umo, message, priority, max_retries, on_result, base_delay=retry_delay
+            )
+
+    async def close(self) -> None:
+        """取消所有待重试与排队中的发送"""
+        if self.rate_limiter:
+            self.rate_limiter.close()
+        await self.retries.close()
@@ -0,0 +1,115 @@
+"""监控池工作进程入口
+
+由 MonitorPool 以 ``runpy.run_path`` 在 spawn 出的子进程中直接执行本文件，
+而不是按插件包路径导入：子进程只注册插件包与 core 子包本身（不执行其 ``__init__``），
+再导入 asyncio 弹幕引擎，因此工作进程不会加载 main.py、httpx 与插件的其他模块，
+只需要 astrbot.api 的日志与 pydouyu（BaseMonitor 所在模块的依赖）。
+
+本文件只使用绝对导入，以便作为脚本运行。
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import types
+from multiprocessing.connection import Connection
+from typing import Any
+
+# 以脚本方式运行时使用的 __name__
+WORKER_RUN_NAME = "__douyu_pool_worker__"
+
+# 礼物事件中需要发回主进程的字段
+GIFT_FIELDS = ("nn", "uid", "gfid", "gfcnt", "hits")
+# 开播事件中需要发回主进程的字段
+LIVE_FIELDS = ("ss", "ivl")
+# 工作进程上报解码统计的间隔（秒）
+STATS_INTERVAL = 10.0
+
+
+def _register_package(name: str, path: str) -> None:
+    """注册包本身而不执行其 __init__，子模块仍可按包路径相对导入"""
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [path]
+        sys.modules[name] = package
+
+
+def worker_main(
+    package: str, plugin_root: str, index: int, cmd_conn: Connection, event_queue: Any
+) -> None:
+    """工作进程主函数
+
+    在进程主线程上接收命令，连接协程运行在进程内的弹幕引擎线程上。
+
+    Args:
+        package: 插件包名
+        plugin_root: 插件目录
+        index: 工作进程编号
+        cmd_conn: 接收主进程命令的连接
+        event_queue: 发回事件的队列
+    """
+    _register_package(package, plugin_root)
+    _register_package(f"{package}.core", os.path.join(plugin_root, "core"))
+    async_monitor = importlib.import_module(f"{package}.core.async_monitor")
+
+    from astrbot.api import logger
+
+    engine = async_monitor.DanmakuEngine(1)
+    monitors: dict[int, Any] = {}
+
+    def on_live(room_id: int, msg: dict) -> None:
+        event_queue.put(("live", room_id, {k: msg[k] for k in LIVE_FIELDS if k in msg}))
+
+    def on_gift(room_id: int, msg: dict) -> None:
+        event_queue.put(("gift", room_id, {k: msg[k] for k in GIFT_FIELDS if k in msg}))
+
+    def on_offline(room_id: int, duration: float) -> None:
+        event_queue.put(("offline", room_id, duration))
+
+    def on_connected(room_id: int) -> None:
+        # 主进程据此归还连接准入的握手名额
+        event_queue.put(("connected", room_id, None))
+
+    def stop_room(room_id: int) -> None:
+        monitor = monitors.pop(room_id, None)
+        if monitor:
+            monitor.stop()
+
+    logger.info(f"斗鱼监控工作进程 {index} 已启动")
+    try:
+        while True:
+            if not cmd_conn.poll(STATS_INTERVAL):
+                stats = {rid: m.get_decode_stats() for rid, m in monitors.items()}
+                event_queue.put(("stats", 0, stats))
+                continue
+            command, room_id = cmd_conn.recv()
+            if command == "start":
+                # 已存在则视为重启
+                stop_room(room_id)
+                monitor = async_monitor.AsyncDouyuMonitor(
+                    room_id,
+                    engine,
+                    live_callback=on_live,
+                    gift_callback=on_gift,
+                    offline_callback=on_offline,
+                )
+                monitor.connected_callback = on_connected
+                if monitor.start():
+                    monitors[room_id] = monitor
+            elif command == "stop":
+                stop_room(room_id)
+            elif command == "shutdown":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        for room_id in list(monitors):
+            stop_room(room_id)
+        engine.shutdown()
+        logger.info(f"斗鱼监控工作进程 {index} 已停止")
+
+
+if __name__ == WORKER_RUN_NAME:
+    worker_main(**WORKER_ARGS)  # type: ignore[name-defined]  # noqa: F821
@@ -0,0 +1,283 @@
+"""消息发送限流模块"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from bisect import insort
+from dataclasses import dataclass, field
+
+# 发送优先级，数值越小越优先
+PRIORITY_LIVE = 0
+PRIORITY_OFFLINE = 1
+PRIORITY_GIFT = 2
+
+# 每个会话桶数量超过该值时清理已回满的空闲桶
+_PRUNE_THRESHOLD = 1024
+# 排队等待的礼物播报数量上限
+GIFT_QUEUE_LIMIT = 500
+# 礼物播报的最长排队时间（秒）
+GIFT_MAX_WAIT = 120.0
+
+
+class SendDropped(Exception):
+    """礼物播报排队超过上限或等待超时，被限流器丢弃"""
+
+
+class TokenBucket:
+    """令牌桶
+
+    以 rate 个/秒 的速度补充令牌，最多累积 capacity 个。
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """距离可用一个令牌还需等待的秒数"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    umo: str = field(compare=False)
+    platform: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class RateLimiter:
+    """按平台与会话（umo）双层令牌桶限流
+
+    令牌不足的发送请求按 (优先级, 到达顺序) 排队等待，由单个调度协程
+    在令牌补充后依次放行；高优先级请求被平台桶阻塞时，同平台的低优先级请求不会插队。
+    开播/下播通知不限排队长度；礼物播报超过排队上限或等待超时时抛出 SendDropped。
+    """
+
+    def __init__(
+        self,
+        platform_rate: float = 5.0,
+        platform_burst: float = 10.0,
+        umo_rate: float = 0.5,
+        umo_burst: float = 3.0,
+        gift_queue_limit: int = GIFT_QUEUE_LIMIT,
+        gift_max_wait: float = GIFT_MAX_WAIT,
+    ):
+        """初始化限流器
+
+        Args:
+            platform_rate: 每个平台每秒发送的消息数
+            platform_burst: 每个平台允许的突发消息数
+            umo_rate: 每个会话每秒发送的消息数
+            umo_burst: 每个会话允许的突发消息数
+            gift_queue_limit: 排队等待的礼物播报数量上限，不大于 0 时不限制
+            gift_max_wait: 礼物播报的最长排队时间（秒），不大于 0 时不限制
+        """
+        self.platform_rate = platform_rate
+        self.platform_burst = platform_burst
+        self.umo_rate = umo_rate
+        self.umo_burst = umo_burst
+        self.gift_queue_limit = gift_queue_limit
+        self.gift_max_wait = gift_max_wait
+        self._gift_waiting = 0
+        self._platform_buckets: dict[str, TokenBucket] = {}
+        self._umo_buckets: dict[str, TokenBucket] = {}
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._pump_task: asyncio.Task | None = None
+        # 统计
+        self.total_acquired = 0
+        self.total_waited = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_dropped = 0
+
+    @staticmethod
+    def platform_of(umo: str) -> str:
+        """从 unified_msg_origin 中提取平台标识"""
+        return umo.split(":", 1)[0]
+
+    @property
+    def queue_depth(self) -> int:
+        """正在排队等待令牌的发送数"""
+        return len(self._waiters)
+
+    @property
+    def avg_wait_time(self) -> float:
+        """排队请求的平均等待时间（秒）"""
+        if not self.total_waited:
+            return 0.0
+        return self.total_wait_time / self.total_waited
+
+    def _buckets(self, umo: str, platform: str) -> tuple[TokenBucket, TokenBucket]:
+        platform_bucket = self._platform_buckets.get(platform)
+        if platform_bucket is None:
+            platform_bucket = TokenBucket(self.platform_rate, self.platform_burst)
+            self._platform_buckets[platform] = platform_bucket
+        umo_bucket = self._umo_buckets.get(umo)
+        if umo_bucket is None:
+            if len(self._umo_buckets) >= _PRUNE_THRESHOLD:
+                self._prune()
+            umo_bucket = TokenBucket(self.umo_rate, self.umo_burst)
+            self._umo_buckets[umo] = umo_bucket
+        return platform_bucket, umo_bucket
+
+    def _prune(self) -> None:
+        """移除已回满的会话桶（等价于新建的桶）"""
+        now = time.monotonic()
+        waiting = {w.umo for w in self._waiters}
+        for umo in [
+            u for u, b in self._umo_buckets.items() if u not in waiting and b.is_full(now)
+        ]:
+            del self._umo_buckets[umo]
+
+    async def acquire(self, umo: str, priority: int = PRIORITY_GIFT) -> float:
+        """获取一次发送许可
+
+        Args:
+            umo: 目标会话
+            priority: 发送优先级，数值越小越优先
+
+        Returns:
+            实际等待的秒数
+
+        Raises:
+            SendDropped: 礼物播报排队已满或等待超时
+        """
+        platform = self.platform_of(umo)
+        now = time.monotonic()
+        platform_bucket, umo_bucket = self._buckets(umo, platform)
+
+        # 无人排队且令牌充足时直接放行
+        if (
+            not self._waiters
+            and platform_bucket.wait_time(now) == 0
+            and umo_bucket.wait_time(now) == 0
+        ):
+            platform_bucket.consume(now)
+            umo_bucket.consume(now)
+            self.total_acquired += 1
+            return 0.0
+
+        is_gift = priority >= PRIORITY_GIFT
+        if is_gift and 0 < self.gift_queue_limit <= self._gift_waiting:
+            self.total_dropped += 1
+            raise SendDropped(f"礼物播报排队已满（{self._gift_waiting} 条）")
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            umo=umo,
+            platform=platform,
+            future=loop.create_future(),
+            enqueued_at=now,
+        )
+        insort(self._waiters, waiter)
+        if is_gift:
+            self._gift_waiting += 1
+        self._ensure_pump()
+        try:
+            await waiter.future
+        finally:
+            if not waiter.future.done():
+                waiter.future.cancel()
+
+        waited = time.monotonic() - now
+        self.total_acquired += 1
+        self.total_waited += 1
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+        return waited
+
+    def _ensure_pump(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        """按优先级放行排队的请求，令牌不足时休眠到最近一个令牌补充时间"""
+        assert self._wakeup is not None
+        while self._waiters:
+            self._wakeup.clear()
+            now = time.monotonic()
+            next_wait = float("inf")
+            blocked_platforms: set[str] = set()
+            remaining: list[_Waiter] = []
+
+            for waiter in self._waiters:
+                if waiter.future.done():
+                    continue
+                if waiter.priority >= PRIORITY_GIFT and self.gift_max_wait > 0:
+                    expires_in = waiter.enqueued_at + self.gift_max_wait - now
+                    if expires_in <= 0:
+                        self.total_dropped += 1
+                        waiter.future.set_exception(
+                            SendDropped(f"礼物播报排队超过 {self.gift_max_wait:.0f} 秒")
+                        )
+                        continue
+                    next_wait = min(next_wait, expires_in)
+                if waiter.platform in blocked_platforms:
+                    remaining.append(waiter)
+                    continue
+                platform_bucket, umo_bucket = self._buckets(waiter.umo, waiter.platform)
+                platform_wait = platform_bucket.wait_time(now)
+                umo_wait = umo_bucket.wait_time(now)
+                if platform_wait == 0 and umo_wait == 0:
+                    platform_bucket.consume(now)
+                    umo_bucket.consume(now)
+                    waiter.future.set_result(None)
+                    continue
+                if platform_wait > 0:
+                    # 平台令牌留给更高优先级的请求
+                    blocked_platforms.add(waiter.platform)
+                next_wait = min(next_wait, max(platform_wait, umo_wait))
+                remaining.append(waiter)
+
+            self._waiters = remaining
+            self._gift_waiting = sum(1 for w in remaining if w.priority >= PRIORITY_GIFT)
+            if not remaining:
+                break
+            timeout = None if next_wait == float("inf") else next_wait
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def close(self) -> None:
+        """取消所有排队请求"""
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                waiter.future.cancel()
+        self._waiters = []
+        self._gift_waiting = 0
+        if self._pump_task:
+            self._pump_task.cancel()
+            self._pump_task = None
@@ -0,0 +1,216 @@
+"""发送重试调度模块"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from astrbot.api import logger
+
+from .rate_limiter import SendDropped
+
+# 首次重试延迟（秒）
+RETRY_BASE_DELAY = 2.0
+# 单次重试延迟上限（秒）
+RETRY_MAX_DELAY = 60.0
+# 自首次失败起的最长重试时间（秒），超过后放弃
+RETRY_MAX_AGE = 300.0
+# 延迟随机抖动比例，避免大量失败的发送在同一时刻重试
+RETRY_JITTER = 0.2
+
+
+@dataclass(order=True)
+class _RetryEntry:
+    due: float
+    seq: int
+    umo: str = field(compare=False)
+    message: str = field(compare=False)
+    priority: int = field(compare=False)
+    attempt: int = field(compare=False)
+    max_attempts: int = field(compare=False)
+    base_delay: float = field(compare=False)
+    first_failed_at: float = field(compare=False)
+    on_result: Callable[[str, bool], None] | None = field(compare=False)
+
+
+class RetryScheduler:
+    """集中式发送重试调度器
+
+    失败的 (消息, 会话) 投递以到期时间排列在最小堆中，整个调度器只挂一个
+    ``loop.call_at`` 定时器指向最早到期的条目；等待期间不持有协程或发送名额，
+    到期后才创建一次发送任务。重试延迟按指数退避增长并叠加随机抖动。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str, int], Awaitable[bool]],
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        max_age: float = RETRY_MAX_AGE,
+        jitter: float = RETRY_JITTER,
+    ):
+        """初始化调度器
+
+        Args:
+            send: 发送函数，参数为 (umo, message, priority)，返回是否成功
+            base_delay: 首次重试延迟（秒）
+            max_delay: 单次重试延迟上限（秒）
+            max_age: 自首次失败起的最长重试时间（秒）
+            jitter: 延迟随机抖动比例
+        """
+        self.send = send
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_age = max_age
+        self.jitter = jitter
+        self._heap: list[_RetryEntry] = []
+        self._seq = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_due = 0.0
+        self._in_flight: set[asyncio.Task] = set()
+        # 统计
+        self.total_scheduled = 0
+        self.total_succeeded = 0
+        self.total_dropped = 0
+
+    @property
+    def outstanding(self) -> int:
+        """等待重试及正在重试的发送数量"""
+        return len(self._heap) + len(self._in_flight)
+
+    @property
+    def next_due_in(self) -> float | None:
+        """距离下一次重试的秒数，没有待重试的发送时为 None"""
+        if not self._heap or self._loop is None:
+            return None
+        return max(0.0, self._heap[0].due - self._loop.time())
+
+    def backoff(self, attempt: int, base_delay: float | None = None) -> float:
+        """计算第 attempt 次重试前的等待时间（秒）"""
+        base = self.base_delay if base_delay is None else base_delay
+        delay = min(self.max_delay, base * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return delay
+
+    def schedule(
+        self,
+        umo: str,
+        message: str,
+        priority: int,
+        max_attempts: int,
+        on_result: Callable[[str, bool], None] | None = None,
+        base_delay: float | None = None,
+    ) -> None:
+        """登记一次失败的发送（必须在事件循环线程中调用）
+
+        Args:
+            umo: 目标会话
+            message: 通知消息内容
+            priority: 限流排队优先级
+            max_attempts: 最大尝试次数（含已失败的首次发送）
+            on_result: 最终投递结果的回调，参数为 (umo, 是否成功)
+            base_delay: 首次重试延迟，None 表示使用调度器默认值
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        self.total_scheduled += 1
+        entry = _RetryEntry(
+            due=0.0,
+            seq=next(self._seq),
+            umo=umo,
+            message=message,
+            priority=priority,
+            attempt=1,
+            max_attempts=max_attempts,
+            base_delay=self.base_delay if base_delay is None else base_delay,
+            first_failed_at=time.monotonic(),
+            on_result=on_result,
+        )
+        self._push(entry, self.backoff(1, entry.base_delay))
+
+    def _push(self, entry: _RetryEntry, delay: float) -> None:
+        logger.warning(
+            f"发送通知失败 ({entry.umo})，{delay:.1f}秒后重试 "
+            f"({entry.attempt}/{entry.max_attempts})"
+        )
+        assert self._loop is not None
+        entry.due = self._loop.time() + delay
+        heapq.heappush(self._heap, entry)
+        self._arm()
+
+    def _arm(self) -> None:
+        """将定时器指向最早到期的条目"""
+        if not self._heap:
+            return
+        due = self._heap[0].due
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        assert self._loop is not None
+        self._timer_due = due
+        self._timer = self._loop.call_at(due, self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        assert self._loop is not None
+        now = self._loop.time()
+        while self._heap and self._heap[0].due <= now:
+            entry = heapq.heappop(self._heap)
+            task = self._loop.create_task(self._attempt(entry))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+        self._arm()
+
+    def _finish(self, entry: _RetryEntry, ok: bool) -> None:
+        if ok:
+            self.total_succeeded += 1
+        else:
+            self.total_dropped += 1
+        if entry.on_result:
+            entry.on_result(entry.umo, ok)
+
+    async def _attempt(self, entry: _RetryEntry) -> None:
+        try:
+            ok = await self.send(entry.umo, entry.message, entry.priority)
+        except SendDropped:
+            # 礼物播报排队超限，不再重试
+            self._finish(entry, False)
+            return
+        except Exception as e:
+            logger.warning(f"重试发送通知出错 ({entry.umo}): {e}")
+            ok = False
+
+        if ok:
+            self._finish(entry, True)
+            return
+
+        entry.attempt += 1
+        if entry.attempt >= entry.max_attempts:
+            logger.error(f"发送通知失败 ({entry.umo})，已达最大重试次数")
+            self._finish(entry, False)
+            return
+        delay = self.backoff(entry.attempt, entry.base_delay)
+        if time.monotonic() - entry.first_failed_at + delay > self.max_age:
+            logger.error(f"发送通知失败 ({entry.umo})，重试超过 {self.max_age:.0f} 秒，已放弃")
+            self._finish(entry, False)
+            return
+        self._push(entry, delay)
+
+    async def close(self) -> None:
+        """取消定时器与所有正在进行的重试，未完成的重试不回调结果"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._heap = []
+        tasks = list(self._in_flight)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,329 @@
+"""斗鱼 STT 弹幕协议编解码
+
+斗鱼弹幕服务器使用自定义的 STT 序列化格式（``key@=value/``），
+每个数据包结构如下（整数均为小端序）::
+
+    | 4B 包长 | 4B 包长 | 2B 消息类型 | 1B 加密 | 1B 保留 | 正文 | \\0 |
+
+包长不包含第一个 4 字节长度字段本身。
+正文中的 ``@`` 转义为 ``@A``，``/`` 转义为 ``@S``。
+
+解码器 ``SttDecoder`` 直接在接收到的数据块上定位帧边界，
+``SttMessage`` 仅记录正文在数据块中的偏移，字段在首次访问时才解码与反转义。
+只有跨越两个数据块的帧才会被拼接复制一次。
+指定关心的消息类型后，解码器在帧头直接比对 ``type@=`` 字段，其余类型的帧整体跳过。
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+from collections.abc import Iterable, Iterator, Mapping
+
+# 客户端发送给弹幕服务器的消息类型
+CLIENT_MSG_TYPE = 689
+# 弹幕服务器下发给客户端的消息类型
+SERVER_MSG_TYPE = 690
+# 包头中除第一个长度字段外的长度（第二个长度字段 + 类型 + 加密 + 保留）
+HEADER_SIZE = 8
+# 第一个长度字段 + 包头
+FRAME_PREFIX_SIZE = 4 + HEADER_SIZE
+# 单个数据包的最大长度，防止异常数据导致内存暴涨
+MAX_PACKET_SIZE = 1 << 20
+
+_KV_SEP = b"@="
+_TYPE_PREFIX = b"type@="
+_LENGTH = struct.Struct("<I")
+
+
+def escape(value: str) -> str:
+    """对 STT 值进行转义"""
+    return value.replace("@", "@A").replace("/", "@S")
+
+
+def unescape(value: str) -> str:
+    """对 STT 值进行反转义"""
+    return value.replace("@S", "/").replace("@A", "@")
+
+
+def encode_message(fields: dict[str, str | int]) -> str:
+    """将字典序列化为 STT 文本"""
+    return "".join(f"{escape(str(k))}@={escape(str(v))}/" for k, v in fields.items())
+
+
+def parse_message(body: str) -> dict[str, str]:
+    """将 STT 文本一次性解析为字典
+
+    嵌套结构的值保持原始转义形式，仅对顶层键值做一次反转义。
+    """
+    msg: dict[str, str] = {}
+    for item in body.split("/"):
+        key, sep, value = item.partition("@=")
+        if sep:
+            msg[unescape(key)] = unescape(value)
+    return msg
+
+
+def pack(body: str, msg_type: int = CLIENT_MSG_TYPE) -> bytes:
+    """将 STT 文本打包为数据包"""
+    payload = body.encode("utf-8") + b"\0"
+    length = HEADER_SIZE + len(payload)
+    return (
+        length.to_bytes(4, "little")
+        + length.to_bytes(4, "little")
+        + msg_type.to_bytes(2, "little")
+        + b"\0\0"
+        + payload
+    )
+
+
+def login_packet(room_id: int) -> bytes:
+    """构建登录请求包"""
+    return pack(encode_message({"type": "loginreq", "roomid": room_id}))
+
+
+def join_group_packet(room_id: int) -> bytes:
+    """构建加入弹幕分组请求包（-9999 为海量弹幕分组）"""
+    return pack(encode_message({"type": "joingroup", "rid": room_id, "gid": -9999}))
+
+
+def heartbeat_packet() -> bytes:
+    """构建心跳包"""
+    return pack(encode_message({"type": "mrkl", "tick": int(time.time())}))
+
+
+def _decode_value(buf: bytes, start: int, end: int) -> str:
+    """解码并按需反转义 buf[start:end]"""
+    value = buf[start:end].decode("utf-8", "ignore")
+    if buf.find(b"@", start, end) != -1:
+        value = unescape(value)
+    return value
+
+
+class SttMessage(Mapping[str, str]):
+    """惰性解析的 STT 消息
+
+    只保存正文所在数据块的引用与偏移，按键访问时才查找、解码并反转义对应字段，
+    结果会被缓存。实现 Mapping 接口，可直接当作只读字典使用。
+    """
+
+    __slots__ = ("_buf", "_start", "_end", "_cache", "_keys")
+
+    def __init__(self, buf: bytes, start: int = 0, end: int | None = None):
+        self._buf = buf
+        self._start = start
+        self._end = len(buf) if end is None else end
+        self._cache: dict[str, str] | None = None
+        self._keys: list[str] | None = None
+
+    @classmethod
+    def from_str(cls, body: str) -> SttMessage:
+        """从 STT 文本创建消息（主要用于测试与基准）"""
+        return cls(body.encode("utf-8"))
+
+    @property
+    def raw(self) -> memoryview:
+        """正文的只读视图（不复制）"""
+        return memoryview(self._buf)[self._start : self._end]
+
+    @property
+    def msg_type(self) -> str:
+        """消息类型（type 字段）"""
+        return self.get("type", "")
+
+    def _locate(self, key: str) -> tuple[int, int] | None:
+        """查找顶层字段值的偏移
+
+        转义规则保证嵌套值中不会出现 ``/key@=``，因此直接查找即可。
+        """
+        buf, start, end = self._buf, self._start, self._end
+        needle = key.encode("utf-8") + _KV_SEP
+        if buf.startswith(needle, start, end):
+            value_start = start + len(needle)
+        else:
+            pos = buf.find(b"/" + needle, start, end)
+            if pos == -1:
+                return None
+            value_start = pos + 1 + len(needle)
+        value_end = buf.find(b"/", value_start, end)
+        if value_end == -1:
+            value_end = end
+        return value_start, value_end
+
+    def __getitem__(self, key: str) -> str:
+        cache = self._cache
+        if cache is not None and key in cache:
+            return cache[key]
+        span = self._locate(key)
+        if span is None:
+            raise KeyError(key)
+        value = _decode_value(self._buf, span[0], span[1])
+        if cache is None:
+            self._cache = cache = {}
+        cache[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        if self._cache is not None and key in self._cache:
+            return True
+        return self._locate(key) is not None
+
+    def _scan_keys(self) -> list[str]:
+        if self._keys is None:
+            keys: list[str] = []
+            buf, pos, end = self._buf, self._start, self._end
+            while pos < end:
+                item_end = buf.find(b"/", pos, end)
+                if item_end == -1:
+                    item_end = end
+                sep = buf.find(_KV_SEP, pos, item_end)
+                if sep != -1:
+                    keys.append(_decode_value(buf, pos, sep))
+                pos = item_end + 1
+            self._keys = keys
+        return self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._scan_keys())
+
+    def __len__(self) -> int:
+        return len(self._scan_keys())
+
+    def to_dict(self) -> dict[str, str]:
+        """完整解析为普通字典"""
+        return {key: self[key] for key in self._scan_keys()}
+
+    def __repr__(self) -> str:
+        return f"SttMessage({bytes(self.raw)!r})"
+
+
+class SttDecoder:
+    """STT 流式解码器
+
+    处理 TCP 流中的半包与粘包。完整落在同一数据块内的帧不做任何复制，
+    跨数据块的帧在待拼接缓冲区中组装完成后复制一次。
+
+    传入 wanted_types 时只产出这些类型的消息，其他类型的帧仅凭帧头的
+    ``type@=`` 前缀判定后直接跳过，不创建消息对象也不复制数据。
+    """
+
+    def __init__(
+        self,
+        wanted_types: Iterable[str] | None = None,
+        max_packet_size: int = MAX_PACKET_SIZE,
+    ):
+        """初始化解码器
+
+        Args:
+            wanted_types: 需要解码的消息类型，None 表示全部解码
+            max_packet_size: 单个数据包的最大长度
+        """
+        self.max_packet_size = max_packet_size
+        self._pending = bytearray()
+        # bytes.startswith 接受元组，一次调用即可比对所有类型前缀
+        self._type_prefixes: tuple[bytes, ...] | None = None
+        if wanted_types is not None:
+            self._type_prefixes = tuple(
+                _TYPE_PREFIX + escape(t).encode("utf-8") + b"/" for t in wanted_types
+            )
+        # 统计
+        self.frames = 0
+        self.bytes = 0
+        self.skipped_frames = 0
+        self.skipped_bytes = 0
+
+    def reset(self) -> None:
+        """丢弃未完成的半包（重连时调用），保留统计数据"""
+        self._pending.clear()
+
+    def _is_wanted(self, buf: bytes | bytearray, start: int) -> bool:
+        """根据帧头判断是否需要解码 start 处开始的帧"""
+        prefixes = self._type_prefixes
+        if prefixes is None:
+            return True
+        body_start = start + FRAME_PREFIX_SIZE
+        if buf.startswith(prefixes, body_start):
+            return True
+        # type 字段不在首位时无法廉价判定，交由上层处理
+        return not buf.startswith(_TYPE_PREFIX, body_start)
+
+    @property
+    def pending_size(self) -> int:
+        """待拼接缓冲区中的字节数"""
+        return len(self._pending)
+
+    def _check_length(self, length: int) -> None:
+        if length < HEADER_SIZE or length > self.max_packet_size:
+            raise ValueError(f"非法的 STT 包长: {length}")
+
+    def feed(self, data: bytes | bytearray | memoryview) -> list[SttMessage]:
+        """输入一段接收到的数据，返回其中所有完整的消息
+
+        Raises:
+            ValueError: 包长异常（调用方应断开连接）
+        """
+        if not isinstance(data, bytes):
+            # 可变缓冲区可能被调用方复用，消息需要引用不可变数据
+            data = bytes(data)
+        self.bytes += len(data)
+
+        messages: list[SttMessage] = []
+        pos = 0
+        size = len(data)
+        pending = self._pending
+
+        if pending:
+            # 先补齐长度字段
+            if len(pending) < 4:
+                take = min(4 - len(pending), size)
+                pending += data[:take]
+                pos = take
+                if len(pending) < 4:
+                    return messages
+            length = _LENGTH.unpack_from(pending)[0]
+            self._check_length(length)
+            need = 4 + length - len(pending)
+            if size - pos < need:
+                pending += memoryview(data)[pos:]
+                return messages
+            pending += memoryview(data)[pos : pos + need]
+            pos += need
+            if self._is_wanted(pending, 0):
+                frame = bytes(pending)
+                self._append(messages, frame, 0, len(frame))
+            else:
+                self._skip(len(pending))
+            pending.clear()
+
+        while size - pos >= 4:
+            length = _LENGTH.unpack_from(data, pos)[0]
+            self._check_length(length)
+            frame_end = pos + 4 + length
+            if frame_end > size:
+                break
+            if self._is_wanted(data, pos):
+                self._append(messages, data, pos, frame_end)
+            else:
+                self._skip(frame_end - pos)
+            pos = frame_end
+
+        if pos < size:
+            pending += memoryview(data)[pos:]
+        return messages
+
+    def _append(
+        self, messages: list[SttMessage], buf: bytes, start: int, end: int
+    ) -> None:
+        body_start = start + FRAME_PREFIX_SIZE
+        # 去掉正文末尾的 \0
+        while end > body_start and buf[end - 1] == 0:
+            end -= 1
+        self.frames += 1
+        messages.append(SttMessage(buf, body_start, end))
+
+    def _skip(self, size: int) -> None:
+        self.frames += 1
+        self.skipped_frames += 1
+        self.skipped_bytes += size
@@ -5,23 +5,73 @@
 
 import asyncio
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
-from queue import Empty, Queue
+from functools import partial
+from threading import Lock
 
-from astrbot.api import logger, star
+from astrbot.api import AstrBotConfig, logger, star
 from astrbot.api.event import AstrMessageEvent, filter
 
-from .core import DouyuAPI, DouyuMonitor, Notifier
+from .core import (
+    AsyncDouyuMonitor,
+    BaseMonitor,
+    ConnectionAdmission,
+    DanmakuEngine,
+    DouyuAPI,
+    DouyuMonitor,
+    GiftCombo,
+    GiftComboCoalescer,
+    GiftConfigLoader,
+    GiftConfigRefresher,
+    GiftRouter,
+    MonitorPool,
+    Notifier,
+    PooledMonitor,
+)
+from .core.admission import ADMIT_IDLE, ADMIT_LIVE, ADMIT_SUBSCRIBED
+from .core.gift_combo import GIFT_COMBO_MAX_DURATION
+from .core.rate_limiter import PRIORITY_GIFT, PRIORITY_LIVE, PRIORITY_OFFLINE, RateLimiter
 from .models import RoomInfo
-from .storage import DataManager
+from .storage import DataManager, GiftConfigCache, NotificationOutbox
+from .storage.gift_cache import GLOBAL_GIFT_KEY
 from .utils.gift_config import (
     get_cached_gift_count,
-    get_room_cached_gift_count,
+    get_gift_snapshot,
     get_gift_value,
-    update_gift_config,
-    update_room_gift_config,
+    get_room_cached_gift_count,
+    has_gift_info,
 )
-from .utils.constants import DEFAULT_HIGH_VALUE_THRESHOLD
+from .utils.constants import DEFAULT_HIGH_VALUE_THRESHOLD, GIFT_COMBO_ENABLE_WINDOW
+
+
+# 通知发件箱文件名
+OUTBOX_FILE = "notification_outbox.db"
+# 礼物配置缓存文件名
+GIFT_CACHE_FILE = "gift_cache.db"
+# 投递结果落盘间隔（秒）
+OUTBOX_FLUSH_INTERVAL = 2.0
+# 发件箱压缩间隔（秒）
+OUTBOX_COMPACT_INTERVAL = 600.0
+# 重启补发的最长时效（秒），超过时效的通知标记为失败而不再发送
+OUTBOX_REPLAY_MAX_AGE = {
+    PRIORITY_LIVE: 2 * 3600.0,
+    PRIORITY_OFFLINE: 3600.0,
+    PRIORITY_GIFT: 600.0,
+}
+
+
+def _format_age(seconds: float | None) -> str:
+    """格式化距上次刷新的时间"""
+    if seconds is None:
+        return "未加载"
+    if seconds < 60:
+        return "刚刚"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} 分钟前"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} 小时前"
+    return f"{int(seconds // 86400)} 天前"
 
 
 @dataclass
@@ -29,7 +79,8 @@ class PendingNotification:
     """待发送的通知"""
     subscriber_settings: dict[str, bool]  # {umo -> at_all}
     message: str
-    retry_count: int = 0
+    priority: int = PRIORITY_GIFT
+    message_id: int | None = None  # 发件箱中的消息 ID
 
 
 class Main(star.Star):
@@ -47,24 +98,115 @@ class Main(star.Star):
     - /douyu atall <房间号> [on/off] - 设置@全体（管理员）
     - /douyu gift <房间号> [on/off] - 开启/关闭礼物播报（管理员）
     - /douyu giftfilter <房间号> [阈值/off] - 设置高价值礼物过滤阈值（管理员）
+    - /douyu giftcombo <房间号> [秒数/off] - 设置礼物连击合并窗口（管理员）
     - /douyu giftrefresh [房间号] - 刷新礼物配置缓存（管理员）
     """
 
-    def __init__(self, context: star.Context) -> None:
+    def __init__(self, context: star.Context, config: AstrBotConfig | None = None) -> None:
         super().__init__(context)
         self.context = context
+        self.config = config if config is not None else {}
 
         # 主事件循环引用（用于子线程回调）
         self.loop: asyncio.AbstractEventLoop | None = None
 
         # 初始化模块
-        self.data = DataManager()
-        self.notifier = Notifier(context)
-        self.monitors: dict[int, DouyuMonitor] = {}
+        self.data = DataManager(
+            write_behind=bool(self.config.get("storage_write_behind", True)),
+            flush_delay=float(self.config.get("storage_flush_delay", 1.0)),
+            backend=self.config.get("storage_backend", "json"),
+        )
+        # 礼物播报路由表，订阅快照被替换后惰性重建
+        self.gift_router = GiftRouter(self.data.get_all_subscription_configs)
+        rate_limiter = None
+        if self.config.get("rate_limit_enabled", True):
+            rate_limiter = RateLimiter(
+                platform_rate=float(self.config.get("rate_limit_platform_rate", 5.0)),
+                platform_burst=float(self.config.get("rate_limit_platform_burst", 10.0)),
+                umo_rate=float(self.config.get("rate_limit_umo_rate", 0.5)),
+                umo_burst=float(self.config.get("rate_limit_umo_burst", 3.0)),
+                gift_queue_limit=int(self.config.get("rate_limit_gift_queue", 500)),
+                gift_max_wait=float(self.config.get("rate_limit_gift_max_wait", 120.0)),
+            )
+        self.notifier = Notifier(
+            context,
+            max_concurrency=int(self.config.get("send_concurrency", 10)),
+            rate_limiter=rate_limiter,
+            retry_options={
+                "base_delay": float(self.config.get("retry_base_delay", 2.0)),
+                "max_delay": float(self.config.get("retry_max_delay", 60.0)),
+                "max_age": float(self.config.get("retry_max_age", 300.0)),
+            },
+        )
+        self.monitors: dict[int, BaseMonitor] = {}
+        # 正在直播的房间，由开播/下播回调维护，与监控引擎无关，监控重启后仍保留
+        self._live_rooms: set[int] = set()
+        # 连接准入：所有监控启动按优先级排队，限制并发握手数与建连速率
+        self.admission = ConnectionAdmission(
+            max_concurrent=int(self.config.get("connect_max_concurrent", 10)),
+            rate=float(self.config.get("connect_rate", 5.0)),
+        )
 
-        # 通知队列，用于事件循环不可用时缓存通知
-        self._notification_queue: Queue[PendingNotification] = Queue()
+        # 监控引擎: thread（pydouyu 线程）、asyncio（协程）或 process（多进程分片）
+        self.monitor_engine: str = self.config.get("monitor_engine", "thread")
+        self.engine: DanmakuEngine | None = None
+        self.pool: MonitorPool | None = None
+        if self.monitor_engine == "asyncio":
+            self.engine = DanmakuEngine(int(self.config.get("engine_loops", 1)))
+        elif self.monitor_engine == "process":
+            self.pool = MonitorPool(int(self.config.get("monitor_workers", 2)))
+
+        # 通知分发队列：监控线程通过 call_soon_threadsafe 投递，空闲时分发任务不会被唤醒
+        self._notification_queue: asyncio.Queue[PendingNotification] | None = None
         self._queue_processor_task: asyncio.Task | None = None
+        # 事件循环就绪前产生的通知
+        self._early_notifications: list[PendingNotification] = []
+        self._early_lock = Lock()
+
+        # 礼物连击合并器（依赖事件循环，在 initialize 中创建）
+        self.gift_combos: GiftComboCoalescer | None = None
+
+        # 持久化发件箱，重启后补发未送达的通知
+        self.outbox: NotificationOutbox | None = None
+        self._outbox_replay_until = 0
+        if self.config.get("outbox_enabled", True):
+            try:
+                self.outbox = NotificationOutbox(self.data.data_dir / OUTBOX_FILE)
+                # 本次运行写入的通知 ID 都大于此值，补发只针对上次运行遗留的通知
+                self._outbox_replay_until = self.outbox.last_message_id()
+            except Exception as e:
+                logger.error(f"打开通知发件箱失败，通知将不会持久化: {e}")
+                self.outbox = None
+        self._outbox_task: asyncio.Task | None = None
+        self._background_tasks: set[asyncio.Task] = set()
+
+        # 礼物配置磁盘缓存，重启时直接加载，后台再校验更新
+        gift_cache = None
+        if self.config.get("gift_cache_enabled", True):
+            try:
+                gift_cache = GiftConfigCache(self.data.data_dir / GIFT_CACHE_FILE)
+            except Exception as e:
+                logger.error(f"打开礼物配置缓存失败，礼物配置将不会缓存: {e}")
+
+        # 礼物配置加载器（共用连接池，并发拉取）
+        self.gift_loader = GiftConfigLoader(
+            concurrency=int(self.config.get("gift_config_concurrency", 8)),
+            deadline=float(self.config.get("gift_config_deadline", 60.0)),
+            cache=gift_cache,
+        )
+        # 未知礼物等待房间配置加载的最长时间（秒）
+        self.gift_lazy_wait = float(self.config.get("gift_lazy_wait", 3.0))
+        # 启动后的后台预热任务与各启动阶段耗时（秒）
+        self._warmup_task: asyncio.Task | None = None
+        self._gift_cache_ready: asyncio.Event | None = None
+        self.startup_phases: dict[str, float] = {}
+        # 礼物配置定时刷新（按 TTL 均匀分布，直播中的房间优先）
+        self.gift_refresher = GiftConfigRefresher(
+            self.gift_loader,
+            get_room_ids=lambda: list(self.data.room_info.keys()),
+            is_live=self._is_room_live,
+            ttl=float(self.config.get("gift_refresh_ttl", 21600.0)),
+        )
 
     async def initialize(self) -> None:
         """插件激活时启动所有监控"""
@@ -74,138 +216,359 @@ class Main(star.Star):
         except RuntimeError:
             self.loop = asyncio.get_event_loop()
 
-        try:
-            gift_count = await asyncio.to_thread(update_gift_config)
-            logger.info(f"礼物配置已加载，共 {gift_count} 个礼物")
-        except Exception as exc:
-            cached_count = get_cached_gift_count()
-            logger.warning(
-                f"礼物配置加载失败，继续使用本地配置（已缓存 {cached_count} 个）: {exc}"
-            )
+        started = time.monotonic()
+
+        # 阶段一：通知分发，并移交事件循环就绪前产生的通知
+        phase_started = time.monotonic()
+        self.gift_combos = GiftComboCoalescer(self.loop, self._on_gift_combo_end)
+        queue: asyncio.Queue[PendingNotification] = asyncio.Queue()
+        with self._early_lock:
+            for item in self._early_notifications:
+                queue.put_nowait(item)
+            self._early_notifications = []
+            self._notification_queue = queue
+        self._queue_processor_task = asyncio.create_task(self._process_notification_queue())
+        self._log_startup_phase("通知分发", phase_started)
 
-        for room_id in self.data.room_info.keys():
-            try:
-                room_gift_count = await asyncio.to_thread(update_room_gift_config, room_id)
-                logger.info(f"房间 {room_id} 礼物配置已加载，共 {room_gift_count} 个礼物")
-            except Exception as exc:
-                cached_count = get_room_cached_gift_count(room_id)
-                logger.warning(
-                    f"房间 {room_id} 礼物配置加载失败，继续使用缓存（已缓存 {cached_count} 个）: {exc}"
-                )
+        # 阶段二：立即提交所有已保存房间的监控，由准入控制器逐步建立连接，不等待任何缓存
+        phase_started = time.monotonic()
+        admissions = [self._start_monitor(room_id) for room_id in self.data.room_info.keys()]
+        self._log_startup_phase("提交监控", phase_started)
 
-        # 启动通知队列处理任务
-        self._queue_processor_task = asyncio.create_task(self._process_notification_queue())
+        logger.info(
+            f"斗鱼直播通知插件已启动，{len(admissions)} 个直播间监控按准入顺序连接中，"
+            f"耗时 {time.monotonic() - started:.2f}s"
+        )
+
+        # 阶段三：后台并行建立连接与预热缓存；完成前礼物播报使用内置礼物表
+        self._gift_cache_ready = asyncio.Event()
+        self._warmup_task = asyncio.create_task(self._warm_up(started, admissions))
+
+    def _log_startup_phase(self, name: str, phase_started: float) -> None:
+        """记录启动阶段耗时"""
+        elapsed = time.monotonic() - phase_started
+        self.startup_phases[name] = elapsed
+        logger.info(f"启动阶段 [{name}] 耗时 {elapsed:.2f}s")
 
-        # 启动所有已保存房间的监控
-        for room_id in self.data.room_info.keys():
-            self._start_monitor(room_id)
+    async def _warm_up(self, started: float, admissions: list[asyncio.Future[bool]]) -> None:
+        """后台预热：监控连接、礼物配置缓存与发件箱补发并行进行"""
 
-        logger.info(f"斗鱼直播通知插件已启动，监控 {len(self.monitors)} 个直播间")
+        async def connect_monitors() -> None:
+            phase_started = time.monotonic()
+            results = await asyncio.gather(*admissions)
+            self._log_startup_phase("建立连接", phase_started)
+            if not all(results):
+                logger.warning(f"{results.count(False)} 个直播间监控启动失败")
+
+        async def warm_gift_config() -> None:
+            phase_started = time.monotonic()
+            try:
+                # 先从磁盘缓存恢复礼物表（不联网），再校验全局配置；
+                # 房间配置在出现未知礼物时按需加载
+                restored_global, restored_rooms = await asyncio.to_thread(
+                    self.gift_loader.restore
+                )
+                if restored_global or restored_rooms:
+                    logger.info(
+                        f"已从缓存恢复礼物配置: 全局 {'是' if restored_global else '否'}，"
+                        f"房间 {restored_rooms} 个"
+                    )
+            finally:
+                assert self._gift_cache_ready is not None
+                self._gift_cache_ready.set()
+            self._log_startup_phase("恢复礼物缓存", phase_started)
+
+            phase_started = time.monotonic()
+            await self.gift_loader.warmup([])
+            self.gift_refresher.start()
+            self._log_startup_phase("校验礼物配置", phase_started)
+
+        async def replay_outbox() -> None:
+            if not self.outbox:
+                return
+            phase_started = time.monotonic()
+            # 补发上次运行时未送达的通知
+            await self._replay_outbox()
+            self._outbox_task = asyncio.create_task(self._maintain_outbox())
+            self._log_startup_phase("补发通知", phase_started)
+
+        results = await asyncio.gather(
+            connect_monitors(), warm_gift_config(), replay_outbox(), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"启动预热出错: {result}")
+        logger.info(f"启动预热完成，总耗时 {time.monotonic() - started:.2f}s")
 
     async def terminate(self) -> None:
         """插件禁用时停止所有监控"""
-        # 停止队列处理任务
-        if self._queue_processor_task:
-            self._queue_processor_task.cancel()
+        if self._warmup_task:
+            self._warmup_task.cancel()
             try:
-                await self._queue_processor_task
+                await self._warmup_task
             except asyncio.CancelledError:
                 pass
 
+        # 先停止准入与所有监控，之后不再产生新的通知
+        await self.admission.close()
         for monitor in self.monitors.values():
             monitor.stop()
         self.monitors.clear()
-        self.data.save()
+        if self.engine:
+            await asyncio.to_thread(self.engine.shutdown)
+        if self.pool:
+            await asyncio.to_thread(self.pool.shutdown)
+
+        # 播报尚未结束的礼物连击
+        if self.gift_combos:
+            self.gift_combos.flush_all()
+
+        # 停止队列处理任务，未发送的通知保留在发件箱中，下次启动时补发
+        if self._queue_processor_task:
+            self._queue_processor_task.cancel()
+            try:
+                await self._queue_processor_task
+            except asyncio.CancelledError:
+                pass
+
+        if self._outbox_task:
+            self._outbox_task.cancel()
+            try:
+                await self._outbox_task
+            except asyncio.CancelledError:
+                pass
+
+        await self.gift_refresher.close()
+        await self.gift_loader.close()
+        await DouyuAPI.close()
+
+        # 发送结束后再落盘投递结果并关闭发件箱
+        await self.notifier.close()
+        if self.outbox:
+            self.outbox.close()
+
+        self.data.close()
         logger.info("斗鱼直播通知插件已停止")
 
     # ==================== 监控管理 ====================
 
-    def _start_monitor(self, room_id: int) -> bool:
-        """启动单个房间的监控"""
-        if room_id in self.monitors:
-            return True
-
-        monitor = DouyuMonitor(
+    def _create_monitor(self, room_id: int) -> BaseMonitor:
+        """按配置的监控引擎创建监控器"""
+        if self.pool is not None:
+            return PooledMonitor(
+                room_id,
+                self.pool,
+                live_callback=self._on_live_start,
+                gift_callback=self._on_gift,
+                offline_callback=self._on_live_end,
+            )
+        if self.engine is not None:
+            return AsyncDouyuMonitor(
+                room_id,
+                self.engine,
+                live_callback=self._on_live_start,
+                gift_callback=self._on_gift,
+                offline_callback=self._on_live_end,
+            )
+        return DouyuMonitor(
             room_id,
             live_callback=self._on_live_start,
             gift_callback=self._on_gift,
             offline_callback=self._on_live_end,
         )
-        if monitor.start():
+
+    def _admission_priority(self, room_id: int) -> int:
+        """监控启动的准入优先级：直播中 > 有订阅者 > 其他"""
+        if self._is_room_live(room_id):
+            return ADMIT_LIVE
+        if self.data.get_subscribers(room_id):
+            return ADMIT_SUBSCRIBED
+        return ADMIT_IDLE
+
+    def _start_monitor(
+        self, room_id: int, priority: int | None = None, restart: bool = False
+    ) -> asyncio.Future[bool]:
+        """通过连接准入启动单个房间的监控（必须在事件循环线程中调用）
+
+        Args:
+            room_id: 房间号
+            priority: 准入优先级，默认按房间状态决定
+            restart: 是否重启已有监控（新监控启动成功后再停止旧的，减少通知丢失窗口）
+
+        Returns:
+            准入后得到是否启动成功的 Future
+        """
+        if priority is None:
+            priority = self._admission_priority(room_id)
+
+        def start() -> bool:
+            old_monitor = self.monitors.get(room_id)
+            if old_monitor is not None and not restart:
+                return True
+            monitor = self._create_monitor(room_id)
+            monitor.connected_callback = self.admission.connected
+            if not monitor.start():
+                return False
             self.monitors[room_id] = monitor
+            if old_monitor is not None:
+                # 旧监控的停止可能阻塞（等待线程或连接关闭），不占用准入任务
+                self._spawn(asyncio.to_thread(old_monitor.stop))
             return True
-        return False
+
+        return self.admission.submit(room_id, start, priority, replace=restart)
+
+    def _is_room_live(self, room_id: int) -> bool:
+        """房间是否正在直播（以最近一次开播/下播回调为准）"""
+        return room_id in self._live_rooms
 
     def _stop_monitor(self, room_id: int) -> None:
         """停止单个房间的监控"""
+        self.admission.cancel(room_id)
+        self._live_rooms.discard(room_id)
         if room_id in self.monitors:
             self.monitors[room_id].stop()
             del self.monitors[room_id]
 
     async def _process_notification_queue(self) -> None:
-        """处理通知队列的后台任务"""
-        MAX_RETRIES = 5
+        """通知分发任务：通知到达即开始发送，队列为空时不产生任何唤醒"""
+        assert self._notification_queue is not None
         while True:
             try:
-                # 每秒检查一次队列
-                await asyncio.sleep(1)
-
-                # 处理队列中的所有通知
-                pending_items: list[PendingNotification] = []
-                while True:
-                    try:
-                        item = self._notification_queue.get_nowait()
-                        pending_items.append(item)
-                    except Empty:
-                        break
-
-                for item in pending_items:
-                    try:
-                        await self.notifier.send_to_subscribers(
-                            item.subscriber_settings, item.message
-                        )
-                    except Exception as e:
-                        item.retry_count += 1
-                        if item.retry_count < MAX_RETRIES:
-                            # 放回队列稍后重试
-                            self._notification_queue.put(item)
-                            logger.warning(
-                                f"发送通知失败，将重试 ({item.retry_count}/{MAX_RETRIES}): {e}"
-                            )
-                        else:
-                            logger.error(f"发送通知失败，已达最大重试次数: {e}")
+                item = await self._notification_queue.get()
+                self._spawn(self._send_notification(item))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"通知分发任务出错: {e}")
+
+    def _outbox_callback(
+        self, message_id: int | None
+    ) -> Callable[[str, bool], None] | None:
+        """获取记录投递结果的回调"""
+        if self.outbox is None or message_id is None:
+            return None
+        return partial(self.outbox.mark, message_id)
+
+    async def _send_notification(self, item: PendingNotification) -> None:
+        """发送一条通知，并将每个订阅者的投递结果写回发件箱"""
+        try:
+            await self.notifier.send_to_subscribers(
+                item.subscriber_settings,
+                item.message,
+                priority=item.priority,
+                on_result=self._outbox_callback(item.message_id),
+            )
+        except Exception as e:
+            # 未确认的投递仍保留在发件箱中，下次启动时补发
+            logger.error(f"发送通知失败: {e}")
+
+    def _spawn(self, coro) -> None:
+        """在事件循环中启动后台任务并持有引用"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _replay_outbox(self) -> None:
+        """重新发送上次运行遗留在发件箱中、未确认投递的通知
+
+        只补发监控启动前已存在的消息（ID 不大于启动时记录的最大 ID），
+        本次运行写入的通知已由分发任务发送，不会被重复补发；
+        超过 OUTBOX_REPLAY_MAX_AGE 时效的通知标记为失败，不再发送。
+        """
+        assert self.outbox is not None
+        if not self._outbox_replay_until:
+            return
+        try:
+            expired = await asyncio.to_thread(
+                self.outbox.expire, OUTBOX_REPLAY_MAX_AGE, self._outbox_replay_until
+            )
+            pending = await asyncio.to_thread(
+                self.outbox.pending, self._outbox_replay_until
+            )
+        except Exception as e:
+            logger.error(f"读取通知发件箱失败: {e}")
+            return
+        if expired:
+            logger.info(f"通知发件箱中 {expired} 条通知已过时效，不再补发")
+        for message_id, message, priority, subscriber_settings in pending:
+            self._spawn(
+                self._send_notification(
+                    PendingNotification(
+                        subscriber_settings=subscriber_settings,
+                        message=message,
+                        priority=priority,
+                        message_id=message_id,
+                    )
+                )
+            )
+        if pending:
+            logger.info(f"已从通知发件箱恢复 {len(pending)} 条未送达的通知")
 
+    async def _maintain_outbox(self) -> None:
+        """定期落盘投递结果并压缩发件箱"""
+        assert self.outbox is not None
+        last_compact = time.monotonic()
+        while True:
+            try:
+                await asyncio.sleep(OUTBOX_FLUSH_INTERVAL)
+                await asyncio.to_thread(self.outbox.flush_acks)
+                if time.monotonic() - last_compact >= OUTBOX_COMPACT_INTERVAL:
+                    last_compact = time.monotonic()
+                    await asyncio.to_thread(self.outbox.compact)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"通知队列处理器出错: {e}")
+                logger.error(f"维护通知发件箱时出错: {e}")
 
     def _schedule_notification(
-        self, subscriber_settings: dict[str, bool], message: str
+        self,
+        subscriber_settings: dict[str, bool],
+        message: str,
+        priority: int = PRIORITY_GIFT,
     ) -> None:
         """安全地调度通知发送
 
+        通知先写入发件箱再发送，保证进程重启后仍可补发。
+
         Args:
             subscriber_settings: {umo -> at_all} 每个订阅者的 @全体设置
             message: 通知消息内容
+            priority: 限流排队优先级，数值越小越优先
         """
         if not subscriber_settings:
             return
 
-        if self.loop and self.loop.is_running():
-            asyncio.run_coroutine_threadsafe(
-                self.notifier.send_to_subscribers(subscriber_settings, message),
-                self.loop,
-            )
-        else:
-            # 事件循环不可用，放入队列稍后处理
+        item = PendingNotification(
+            subscriber_settings=subscriber_settings,
+            message=message,
+            priority=priority,
+        )
+        if self.outbox:
+            try:
+                item.message_id = self.outbox.enqueue(subscriber_settings, message, priority)
+            except Exception as e:
+                logger.error(f"写入通知发件箱失败: {e}")
+
+        self._enqueue_notification(item)
+
+    def _enqueue_notification(self, item: PendingNotification) -> None:
+        """将通知交给事件循环中的分发任务（线程安全）"""
+        with self._early_lock:
+            loop, queue = self.loop, self._notification_queue
+            if loop is not None and queue is not None and loop.is_running():
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+                    return
+                except RuntimeError:
+                    # 事件循环已关闭
+                    pass
+            # 事件循环不可用，暂存到初始化时再分发
             logger.warning("事件循环暂时不可用，通知已加入队列")
-            self._notification_queue.put(
-                PendingNotification(subscriber_settings=subscriber_settings, message=message)
-            )
+            self._early_notifications.append(item)
 
     def _on_live_start(self, room_id: int, msg: dict) -> None:
         """开播回调 - 发送通知给所有订阅者"""
+        self._live_rooms.add(room_id)
         # 获取所有订阅者的配置
         sub_configs = self.data.get_all_subscription_configs(room_id)
         if not sub_configs:
@@ -222,40 +585,80 @@ class Main(star.Star):
         }
 
         # 安全地调度通知发送
-        self._schedule_notification(subscriber_settings, notification)
+        self._schedule_notification(subscriber_settings, notification, PRIORITY_LIVE)
+
+    def _get_gift_recipients(
+        self, room_id: int, gift_id: str | int
+    ) -> dict[float, dict[str, bool]]:
+        """获取应收到该礼物播报的订阅者，按连击合并窗口分组
+
+        Returns:
+            {gift_combo_window -> {umo -> at_all}}
+        """
+        route = self.gift_router.route(room_id)
+        if not route:
+            return {}
+        gift_value = get_gift_value(gift_id, room_id=room_id) if route.needs_value else None
+        return route.match(gift_value)
 
     def _on_gift(self, room_id: int, msg: dict) -> None:
         """礼物回调 - 发送礼物播报给开启礼物播报的订阅者
 
+        开启了连击合并的订阅者交给 GiftComboCoalescer 聚合，其余订阅者立即播报。
+        房间出现未知礼物时先按需加载房间礼物配置，同一房间的并发未命中共用一次拉取。
+
         Args:
             room_id: 房间号
             msg: 礼物消息，包含:
                 - nn: 用户昵称
                 - uid: 用户 ID
                 - gfid: 礼物 ID
-                - gfcnt / hits: 礼物数量
+                - gfcnt / hits: 礼物数量 / 连击数
         """
+        if not self.data.has_room(room_id) or not self.gift_router.route(room_id):
+            return
+
+        # 未知礼物：按需加载房间礼物配置，加载完成或超时后再播报
+        gift_id = msg.get("gfid", "0")
+        loop = self.loop
+        if (
+            loop is not None
+            and loop.is_running()
+            and not has_gift_info(gift_id, room_id=room_id)
+            and self.gift_loader.should_load_room(room_id)
+        ):
+            loop.call_soon_threadsafe(self._spawn, self._on_gift_deferred(room_id, msg))
+            return
+
+        self._dispatch_gift(room_id, msg)
+
+    async def _on_gift_deferred(self, room_id: int, msg: dict) -> None:
+        """等待房间礼物配置（单飞加载）后播报礼物"""
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.gift_lazy_wait
+            # 启动预热期间先等待磁盘缓存恢复，缓存中已有的礼物无需联网
+            ready = self._gift_cache_ready
+            if ready is not None and not ready.is_set():
+                try:
+                    await asyncio.wait_for(ready.wait(), self.gift_lazy_wait)
+                except asyncio.TimeoutError:
+                    pass
+            if not has_gift_info(msg.get("gfid", "0"), room_id=room_id):
+                await self.gift_loader.wait_room(room_id, max(0.0, deadline - loop.time()))
+            self._dispatch_gift(room_id, msg)
+        except Exception as e:
+            logger.error(f"处理礼物播报时出错: {e}")
+
+    def _dispatch_gift(self, room_id: int, msg: dict) -> None:
+        """按订阅配置播报礼物（立即播报或交给连击合并器）"""
         room_info = self.data.get_room(room_id)
         if not room_info:
             return
 
-        # 解析礼物 ID
         gift_id = msg.get("gfid", "0")
-
-        # 获取所有订阅者的配置，筛选开启礼物播报的订阅者
-        sub_configs = self.data.get_all_subscription_configs(room_id)
-        gift_subscribers = {}
-        for umo, config in sub_configs.items():
-            if not config.gift_notify:
-                continue
-            # 如果开启了高价值过滤，只播报飞机及以上的礼物
-            if config.high_value_threshold is not None:
-                gift_value = get_gift_value(gift_id, room_id=room_id) or 0
-                if gift_value < config.high_value_threshold:
-                    continue
-            gift_subscribers[umo] = False  # 礼物通知不 @全体
-
-        if not gift_subscribers:
+        recipients = self._get_gift_recipients(room_id, gift_id)
+        if not recipients:
             return
 
         # 解析礼物信息
@@ -268,19 +671,87 @@ class Main(star.Star):
             logger.warning(f"礼物数量解析失败: {msg.get('gfcnt')}/{msg.get('hits')}，默认为 1")
             gift_count = 1
 
-        room_name = room_info.name
+        immediate: dict[str, bool] = {}
+        can_coalesce = (
+            self.gift_combos is not None and self.loop is not None and self.loop.is_running()
+        )
+        for window, subscribers in recipients.items():
+            if window > 0 and can_coalesce:
+                self._add_gift_combo(room_id, window, gift_id, user_name, msg)
+            else:
+                immediate.update(subscribers)
+
+        if not immediate:
+            return
 
         # 构建礼物通知
         notification = self.notifier.build_gift_notification(
             room_id=room_id,
-            room_name=room_name,
+            room_name=room_info.name,
             user_name=user_name,
             gift_id=gift_id,
             gift_count=gift_count,
         )
 
         # 安全地调度通知发送
-        self._schedule_notification(gift_subscribers, notification)
+        self._schedule_notification(immediate, notification)
+
+    def _add_gift_combo(
+        self, room_id: int, window: float, gift_id: str, user_name: str, msg: dict
+    ) -> None:
+        """将礼物消息交给事件循环中的连击合并器"""
+        try:
+            gift_count = int(msg.get("gfcnt") or 1)
+        except (ValueError, TypeError):
+            gift_count = 1
+        try:
+            hits = int(msg["hits"]) if msg.get("hits") else None
+        except (ValueError, TypeError):
+            hits = None
+        uid = str(msg.get("uid") or user_name)
+
+        assert self.loop is not None and self.gift_combos is not None
+        self.loop.call_soon_threadsafe(
+            self.gift_combos.add,
+            room_id,
+            window,
+            uid,
+            str(gift_id),
+            user_name,
+            gift_count,
+            hits,
+        )
+
+    def _on_gift_combo_end(self, combo: GiftCombo) -> None:
+        """连击结束回调 - 发送一条聚合后的礼物播报（在事件循环中调用）"""
+        try:
+            room_info = self.data.get_room(combo.room_id)
+            if not room_info:
+                return
+
+            # 按当前配置重新筛选，连击期间修改的设置同样生效
+            recipients = self._get_gift_recipients(combo.room_id, combo.gift_id)
+            subscribers = recipients.get(combo.window)
+            if not subscribers:
+                return
+
+            total_value = None
+            if combo.gift_count > 1:
+                gift_value = get_gift_value(combo.gift_id, room_id=combo.room_id)
+                if gift_value is not None:
+                    total_value = gift_value * combo.gift_count
+
+            notification = self.notifier.build_gift_notification(
+                room_id=combo.room_id,
+                room_name=room_info.name,
+                user_name=combo.user_name,
+                gift_id=combo.gift_id,
+                gift_count=combo.gift_count,
+                total_value=total_value,
+            )
+            self._schedule_notification(subscribers, notification)
+        except Exception as e:
+            logger.error(f"处理礼物连击播报时出错: {e}")
 
     def _on_live_end(self, room_id: int, duration_seconds: float) -> None:
         """下播回调 - 发送下播通知给所有订阅者
@@ -289,6 +760,7 @@ class Main(star.Star):
             room_id: 房间号
             duration_seconds: 直播时长（秒）
         """
+        self._live_rooms.discard(room_id)
         sub_configs = self.data.get_all_subscription_configs(room_id)
         if not sub_configs:
             return
@@ -304,7 +776,7 @@ class Main(star.Star):
         subscriber_settings = dict.fromkeys(sub_configs.keys(), False)
 
         # 安全地调度通知发送
-        self._schedule_notification(subscriber_settings, notification)
+        self._schedule_notification(subscriber_settings, notification, PRIORITY_OFFLINE)
 
     # ==================== 命令组 ====================
 
@@ -351,8 +823,8 @@ class Main(star.Star):
         )
         self.data.add_room(room_id, info)
 
-        # 启动监控
-        if self._start_monitor(room_id):
+        # 启动监控（管理员手动添加，优先准入）
+        if await self._start_monitor(room_id, priority=ADMIT_LIVE):
             yield event.plain_result(
                 f"✅ 已添加直播间监控\n"
                 f"房间号: {room_id}\n"
@@ -377,6 +849,8 @@ class Main(star.Star):
         # 停止监控并删除数据
         self._stop_monitor(room_id)
         self.data.remove_room(room_id)
+        self.gift_router.discard(room_id)
+        await self.gift_loader.discard_room(room_id)
 
         yield event.plain_result(f"✅ 已删除直播间 {room_name}({room_id}) 的监控")
 
@@ -391,13 +865,22 @@ class Main(star.Star):
         lines = ["📋 斗鱼直播监控列表", "━━━━━━━━━━━━━━"]
         for idx, (room_id, info) in enumerate(rooms.items(), 1):
             sub_count = len(self.data.get_subscribers(room_id))
-            status = "🟢 运行中" if room_id in self.monitors else "🔴 已停止"
-            lines.append(
+            monitor = self.monitors.get(room_id)
+            status = "🟢 运行中" if monitor else "🔴 已停止"
+            line = (
                 f"{idx}. {info.name}\n"
                 f"   房间号: {room_id}\n"
                 f"   订阅数: {sub_count}\n"
-                f"   状态: {status}"
+                f"   状态: {status}\n"
+                f"   礼物配置: {_format_age(self.gift_refresher.age(room_id))}"
             )
+            stats = monitor.get_decode_stats() if monitor else None
+            if stats:
+                line += (
+                    f"\n   已跳过: {stats['skipped_frames']}/{stats['frames']} 帧"
+                    f"（{stats['skipped_bytes'] / 1024:.1f} KB）"
+                )
+            lines.append(line)
 
         yield event.plain_result("\n".join(lines))
 
@@ -467,9 +950,14 @@ class Main(star.Star):
                     filter_text = "全部"
                 else:
                     filter_text = f"≥{sub_config.high_value_threshold}"
+                if sub_config.gift_combo_window > 0:
+                    combo_text = f"{sub_config.gift_combo_window:g}s"
+                else:
+                    combo_text = "关"
                 my_subs.append(
                     f"• {room_name} ({room_id})\n"
                     f"  @全体:{at_all_icon} | 礼物:{gift_icon}({filter_text})"
+                    f" | 连击合并:{combo_text}"
                 )
             else:
                 my_subs.append(f"• {room_name} ({room_id})")
@@ -485,13 +973,79 @@ class Main(star.Star):
         running = sum(1 for m in self.monitors.values() if m.running)
         total_subs = self.data.get_total_subscriptions()
 
-        yield event.plain_result(
-            f"📊 斗鱼直播监控状态\n"
-            f"━━━━━━━━━━━━━━\n"
-            f"📺 监控直播间: {total_rooms}\n"
-            f"🟢 运行中: {running}\n"
-            f"👥 总订阅数: {total_subs}"
-        )
+        lines = [
+            "📊 斗鱼直播监控状态",
+            "━━━━━━━━━━━━━━",
+            f"📺 监控直播间: {total_rooms}",
+            f"🟢 运行中: {running}",
+            f"👥 总订阅数: {total_subs}",
+            f"⚙️ 监控引擎: {self.monitor_engine}",
+        ]
+        if self.pool:
+            lines.append(f"🧩 工作进程: {self.pool.worker_count}")
+        if self.admission.pending or self.admission.handshaking:
+            lines.append(
+                f"🚪 连接准入: 排队 {self.admission.pending}，"
+                f"握手中 {self.admission.handshaking}"
+            )
+
+        if self.outbox:
+            pending = await asyncio.to_thread(self.outbox.pending_count)
+            lines.append(f"📮 待送达通知: {pending}")
+
+        limiter = self.notifier.rate_limiter
+        if limiter:
+            lines.append(
+                f"🚦 发送排队: {limiter.queue_depth} 条"
+                f"（平均等待 {limiter.avg_wait_time:.1f}s，最长 {limiter.max_wait_time:.1f}s）"
+            )
+            if limiter.total_dropped:
+                lines.append(f"🗑️ 排队超限丢弃的礼物播报: {limiter.total_dropped} 条")
+
+        retries = self.notifier.retries
+        if retries.outstanding:
+            next_due = retries.next_due_in
+            next_text = f"，{next_due:.0f}s 后执行下一次" if next_due is not None else ""
+            lines.append(f"🔁 待重试发送: {retries.outstanding}{next_text}")
+
+        gift_snapshot = get_gift_snapshot()
+        if gift_snapshot.loaded_at is not None:
+            loaded_text = time.strftime("%m-%d %H:%M:%S", time.localtime(gift_snapshot.loaded_at))
+            lines.append(
+                f"🎁 礼物配置: v{gift_snapshot.version}"
+                f"（{gift_snapshot.loaded_count} 个礼物，"
+                f"{len(gift_snapshot.room_gifts)} 个房间，加载于 {loaded_text}）"
+            )
+        else:
+            lines.append(f"🎁 礼物配置: v{gift_snapshot.version}（未加载，使用内置礼物表）")
+
+        if self._warmup_task and not self._warmup_task.done():
+            lines.append("🚀 启动预热中（礼物播报暂用内置礼物表）")
+
+        refresher = self.gift_refresher
+        if refresher.manual_running:
+            lines.append(
+                f"🔄 礼物配置刷新中: {refresher.manual_done}/{refresher.manual_total}"
+            )
+        if refresher.cycle_total:
+            lines.append(
+                f"⏲️ 礼物配置定时刷新: 本周期 {refresher.cycle_done}/{refresher.cycle_total}，"
+                f"全局配置更新于 {_format_age(refresher.age(GLOBAL_GIFT_KEY))}"
+            )
+
+        all_stats = [
+            stats for m in self.monitors.values() if (stats := m.get_decode_stats())
+        ]
+        if all_stats:
+            frames = sum(s["frames"] for s in all_stats)
+            skipped_frames = sum(s["skipped_frames"] for s in all_stats)
+            skipped_bytes = sum(s["skipped_bytes"] for s in all_stats)
+            lines.append(
+                f"⏭️ 跳过解码: {skipped_frames}/{frames} 帧"
+                f"（{skipped_bytes / 1024 / 1024:.1f} MB）"
+            )
+
+        yield event.plain_result("\n".join(lines))
 
     @douyu.command("restart")
     @filter.permission_type(filter.PermissionType.ADMIN)
@@ -507,44 +1061,30 @@ class Main(star.Star):
                 return
 
             # 先创建新监控器，成功后再停止旧的，减少通知丢失窗口
-            old_monitor = self.monitors.get(room_id)
-            new_monitor = DouyuMonitor(
-                room_id,
-                live_callback=self._on_live_start,
-                gift_callback=self._on_gift,
-                offline_callback=self._on_live_end,
-            )
-            if new_monitor.start():
-                # 新监控启动成功，停止旧监控
-                if old_monitor:
-                    old_monitor.stop()
-                self.monitors[room_id] = new_monitor
+            if await self._start_monitor(room_id, priority=ADMIT_LIVE, restart=True):
                 yield event.plain_result(f"✅ 直播间 {room_id} 监控已重启")
             else:
                 yield event.plain_result(f"❌ 直播间 {room_id} 监控重启失败")
         else:
-            # 重启所有
-            success = 0
-            for rid in list(self.data.room_info.keys()):
-                old_monitor = self.monitors.get(rid)
-                new_monitor = DouyuMonitor(
-                    rid,
-                    live_callback=self._on_live_start,
-                    gift_callback=self._on_gift,
-                    offline_callback=self._on_live_end,
-                )
-                if new_monitor.start():
-                    if old_monitor:
-                        old_monitor.stop()
-                    self.monitors[rid] = new_monitor
-                    success += 1
-                else:
-                    logger.warning(f"重启直播间 {rid} 监控失败")
-
+            # 重启所有：按准入顺序逐步重连，命令立即返回
+            room_ids = list(self.data.room_info.keys())
+            admissions = [self._start_monitor(rid, restart=True) for rid in room_ids]
+            self._spawn(self._report_restart(room_ids, admissions))
             yield event.plain_result(
-                f"✅ 已重启 {success}/{len(self.data.room_info)} 个直播间监控"
+                f"🔄 已提交 {len(room_ids)} 个直播间监控重启\n"
+                f"正在直播与有订阅的直播间优先，使用 /douyu status 查看进度"
             )
 
+    async def _report_restart(
+        self, room_ids: list[int], admissions: list[asyncio.Future[bool]]
+    ) -> None:
+        """记录批量重启的结果"""
+        results = await asyncio.gather(*admissions)
+        for rid, ok in zip(room_ids, results):
+            if not ok:
+                logger.warning(f"重启直播间 {rid} 监控失败")
+        logger.info(f"已重启 {sum(results)}/{len(room_ids)} 个直播间监控")
+
     @douyu.command("atall")
     @filter.permission_type(filter.PermissionType.ADMIN)
     async def douyu_atall(self, event: AstrMessageEvent, room_id: int, enable: str = ""):
@@ -695,35 +1235,80 @@ class Main(star.Star):
                 f"当前群的 🎁 礼物过滤: 仅播报价值 ≥ {new_threshold} 的礼物"
             )
 
+    @douyu.command("giftcombo")
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    async def douyu_giftcombo(self, event: AstrMessageEvent, room_id: int, window: str = ""):
+        """设置当前群的礼物连击合并窗口（管理员）
+
+        同一用户连续赠送同一礼物时，在窗口期内合并为一条播报，显示最终数量与总价值。
+        此设置只对当前群生效，不影响其他订阅了同一直播间的群。
+
+        Args:
+            room_id: 斗鱼直播间房间号
+            window: 合并窗口秒数/off 或留空切换状态
+        """
+        room_info = self.data.get_room(room_id)
+        if not room_info:
+            yield event.plain_result(f"⚠️ 直播间 {room_id} 不在监控列表中")
+            return
+
+        umo = event.unified_msg_origin
+        sub_config = self.data.get_subscription_config(room_id, umo)
+        if not sub_config:
+            yield event.plain_result(
+                f"⚠️ 当前群还没有订阅直播间 {room_id}\n"
+                f"请先使用 /douyu sub {room_id} 订阅"
+            )
+            return
+
+        if window.lower() == "off":
+            new_window = 0.0
+        elif window:
+            try:
+                new_window = min(GIFT_COMBO_MAX_DURATION, max(0.0, float(window)))
+            except (TypeError, ValueError):
+                yield event.plain_result("⚠️ 合并窗口无效，请输入秒数或 off")
+                return
+        elif sub_config.gift_combo_window > 0:
+            new_window = 0.0
+        else:
+            new_window = GIFT_COMBO_ENABLE_WINDOW
+
+        self.data.update_subscription_config(room_id, umo, gift_combo_window=new_window)
+
+        if new_window > 0:
+            yield event.plain_result(
+                f"✅ 直播间 {room_info.name}({room_id})\n"
+                f"当前群的 🎁 礼物连击合并: {new_window:g} 秒内的连击合并为一条播报"
+            )
+        else:
+            yield event.plain_result(
+                f"✅ 直播间 {room_info.name}({room_id})\n"
+                f"当前群的 🎁 礼物连击合并: 已关闭，逐条播报"
+            )
+
     @douyu.command("giftrefresh")
     @filter.permission_type(filter.PermissionType.ADMIN)
     async def douyu_giftrefresh(self, event: AstrMessageEvent, room_id: int | None = None):
         """刷新礼物配置缓存（管理员）"""
         if room_id is None:
-            try:
-                gift_count = await asyncio.to_thread(update_gift_config)
-                room_updated = 0
-                for rid in self.data.room_info.keys():
-                    try:
-                        await asyncio.to_thread(update_room_gift_config, rid)
-                        room_updated += 1
-                    except Exception as exc:
-                        logger.warning(f"房间 {rid} 礼物配置刷新失败: {exc}")
+            # 全部刷新在后台进行，命令立即返回
+            room_ids = list(self.data.room_info.keys())
+            if self.gift_refresher.refresh_now(room_ids):
                 yield event.plain_result(
-                    f"✅ 礼物配置已刷新\n"
-                    f"📦 当前缓存礼物数量: {gift_count}\n"
-                    f"🏠 已刷新 {room_updated}/{len(self.data.room_info)} 个房间礼物配置"
+                    f"🔄 已在后台刷新礼物配置（全局 + {len(room_ids)} 个房间）\n"
+                    f"📦 当前缓存礼物数量: {get_cached_gift_count()}\n"
+                    f"使用 /douyu status 查看刷新进度"
                 )
-            except Exception as exc:
-                cached_count = get_cached_gift_count()
+            else:
                 yield event.plain_result(
-                    f"⚠️ 礼物配置刷新失败: {exc}\n"
-                    f"📦 当前缓存礼物数量: {cached_count}"
+                    f"⏳ 礼物配置正在刷新: {self.gift_refresher.manual_done}/"
+                    f"{self.gift_refresher.manual_total}"
                 )
             return
 
         try:
-            gift_count = await asyncio.to_thread(update_room_gift_config, room_id)
+            gift_count = await self.gift_loader.load_room(room_id)
             yield event.plain_result(
                 f"✅ 房间 {room_id} 礼物配置已刷新\n"
                 f"📦 当前缓存礼物数量: {gift_count}"
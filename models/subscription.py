@@ -3,25 +3,27 @@
 from dataclasses import asdict, dataclass
 from typing import Any
 
-from ..utils.constants import DEFAULT_HIGH_VALUE_THRESHOLD
+from ..utils.constants import DEFAULT_GIFT_COMBO_WINDOW, DEFAULT_HIGH_VALUE_THRESHOLD
 
-@dataclass
+@dataclass(frozen=True)
 class SubscriptionConfig:
     """订阅配置
 
-    每个群对每个房间的独立配置。
+    每个群对每个房间的独立配置。实例不可变，修改时通过 dataclasses.replace 生成新实例。
 
     Attributes:
         at_all: 是否开启 @全体成员（开播通知）
         gift_notify: 是否开启礼物播报
         high_value_only: 是否只播报高价值礼物（兼容旧字段）
         high_value_threshold: 高价值过滤阈值（基于礼物价值）
+        gift_combo_window: 礼物连击合并窗口（秒），0 表示逐条播报
     """
 
     at_all: bool = False
     gift_notify: bool = False
     high_value_only: bool = True  # 默认只播报高价值礼物（兼容旧字段）
     high_value_threshold: int | None = DEFAULT_HIGH_VALUE_THRESHOLD
+    gift_combo_window: float = DEFAULT_GIFT_COMBO_WINDOW
 
     def to_dict(self) -> dict[str, Any]:
         """转换为字典"""
@@ -46,9 +48,16 @@ class SubscriptionConfig:
         else:
             high_value_only = data.get("high_value_only", True)
 
+        try:
+            combo_window = float(data.get("gift_combo_window", DEFAULT_GIFT_COMBO_WINDOW))
+            combo_window = max(0.0, combo_window)
+        except (TypeError, ValueError):
+            combo_window = DEFAULT_GIFT_COMBO_WINDOW
+
         return cls(
             at_all=data.get("at_all", False),
             gift_notify=data.get("gift_notify", False),
             high_value_only=high_value_only,
             high_value_threshold=parsed_threshold,
+            gift_combo_window=combo_window,
         )
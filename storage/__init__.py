@@ -1,5 +1,7 @@
 # Storage module - 数据存储
 from .data_manager import DataManager
+from .gift_cache import GiftConfigCache
+from .outbox import NotificationOutbox
+from .sqlite_store import SqliteStore
 
-__all__ = ["DataManager"]
-
+__all__ = ["DataManager", "GiftConfigCache", "NotificationOutbox", "SqliteStore"]
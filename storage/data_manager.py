@@ -2,54 +2,190 @@
 
 from __future__ import annotations
 
+import dataclasses
 import json
 import os
+from collections.abc import Mapping
 from pathlib import Path
+from threading import Lock, RLock, Timer
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any
 
 from astrbot.api import logger
 
-from ..utils.constants import DEFAULT_HIGH_VALUE_THRESHOLD
+from ..utils.constants import DEFAULT_HIGH_VALUE_THRESHOLD, DEFAULT_STORAGE_FLUSH_DELAY
 from astrbot.api.star import StarTools
 
+from .sqlite_store import SqliteStore
+
 if TYPE_CHECKING:
     from ..models.room import RoomInfo
     from ..models.subscription import SubscriptionConfig
 
 
+_EMPTY_SNAPSHOT: Mapping[str, Any] = MappingProxyType({})
+
+
 class DataManager:
     """数据管理器
 
     负责插件数据的加载、保存和管理。
-    数据存储在 JSON 文件中。
+    数据存储在 JSON 文件中，先写入临时文件再原子替换，写入中途崩溃不会损坏数据。
+
+    启用延迟写入（write_behind）时，修改操作只标记数据为脏，
+    在 flush_delay 秒后由后台线程合并为一次写入；退出前需调用 close() 落盘。
+
+    使用 SQLite 后端（backend="sqlite"）时，数据存放在 douyu_live_data.db 中，
+    每次修改只在单个事务中更新受影响的行；首次启用时自动从 JSON 文件迁移。
     """
 
-    def __init__(self, plugin_name: str = "astrbot_plugin_douyu_live"):
+    def __init__(
+        self,
+        plugin_name: str = "astrbot_plugin_douyu_live",
+        write_behind: bool = False,
+        flush_delay: float = DEFAULT_STORAGE_FLUSH_DELAY,
+        backend: str = "json",
+    ):
         """初始化数据管理器
 
         Args:
             plugin_name: 插件名称，用于确定数据目录
+            write_behind: 是否延迟合并写入（仅 JSON 后端）
+            flush_delay: 延迟写入的等待时间（秒）
+            backend: 存储后端，json 或 sqlite
         """
         self.data_dir: Path = StarTools.get_data_dir(plugin_name)
         self.data_file: Path = self.data_dir / "douyu_live_data.json"
+        self.db_file: Path = self.data_dir / "douyu_live_data.db"
+        self.backend = backend
+        self._store: SqliteStore | None = (
+            SqliteStore(self.db_file) if backend == "sqlite" else None
+        )
+        self.write_behind = write_behind
+        self.flush_delay = flush_delay
+
+        # _lock 保护内存数据与脏标记，_write_lock 保证快照按顺序落盘
+        self._lock = RLock()
+        self._write_lock = Lock()
+        self._dirty = False
+        self._flush_timer: Timer | None = None
 
         # 数据结构
         # room_id -> {umo -> SubscriptionConfig}
         self.subscriptions: dict[int, dict[str, SubscriptionConfig]] = {}
         self.room_info: dict[int, RoomInfo] = {}  # room_id -> RoomInfo
+        # 反向索引 umo -> {room_id} 与订阅总数，随订阅增删增量维护
+        self._user_rooms: dict[str, set[int]] = {}
+        self._total_subscriptions = 0
+        # 每个房间订阅的只读快照，修改时整体替换，读取方无需加锁或复制
+        self._snapshots: dict[int, Mapping[str, SubscriptionConfig]] = {}
 
         # 加载数据
         self.load()
 
     def load(self) -> None:
-        """从文件加载数据，兼容旧格式"""
+        """加载数据，兼容旧格式"""
+        if self._store is None:
+            self._load_json()
+        elif self._store.is_empty() and os.path.exists(self.data_file):
+            self._migrate_json()
+        else:
+            self._load_sqlite()
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """根据订阅数据重建反向索引与计数"""
+        with self._lock:
+            user_rooms: dict[str, set[int]] = {}
+            for room_id, sub_dict in self.subscriptions.items():
+                for umo in sub_dict:
+                    user_rooms.setdefault(umo, set()).add(room_id)
+            self._user_rooms = user_rooms
+            self._total_subscriptions = sum(len(s) for s in self.subscriptions.values())
+            self._snapshots = {
+                room_id: MappingProxyType(sub_dict)
+                for room_id, sub_dict in self.subscriptions.items()
+            }
+
+    def _publish(self, room_id: int, sub_dict: dict[str, SubscriptionConfig]) -> None:
+        """发布房间订阅的新版本，调用者需持有 _lock
+
+        sub_dict 发布后不再修改，后续修改总是基于副本进行（写时复制）。
+        """
+        self.subscriptions[room_id] = sub_dict
+        self._snapshots[room_id] = MappingProxyType(sub_dict)
+
+    def _index_add(self, room_id: int, umo: str) -> None:
+        """索引中加入一条订阅，调用者需持有 _lock"""
+        self._user_rooms.setdefault(umo, set()).add(room_id)
+        self._total_subscriptions += 1
+
+    def _index_remove(self, room_id: int, umo: str) -> None:
+        """索引中移除一条订阅，调用者需持有 _lock"""
+        rooms = self._user_rooms.get(umo)
+        if rooms is not None:
+            rooms.discard(room_id)
+            if not rooms:
+                del self._user_rooms[umo]
+        self._total_subscriptions -= 1
+
+    def _load_sqlite(self) -> None:
+        """从 SQLite 数据库加载数据"""
         from ..models.room import RoomInfo as RoomInfoClass
         from ..models.subscription import SubscriptionConfig as SubConfigClass
 
-        if not os.path.exists(self.data_file):
+        assert self._store is not None
+        try:
+            rooms, subscriptions = self._store.load()
+            self.room_info = {
+                room_id: RoomInfoClass.from_dict(data) for room_id, data in rooms.items()
+            }
+            self.subscriptions = {
+                room_id: {
+                    umo: SubConfigClass.from_dict(config)
+                    for umo, config in sub_dict.items()
+                }
+                for room_id, sub_dict in subscriptions.items()
+            }
+        except Exception as e:
+            logger.error(f"加载斗鱼直播数据失败: {e}")
             self.subscriptions = {}
             self.room_info = {}
+
+    def _migrate_json(self) -> None:
+        """将 JSON 数据文件一次性迁移到 SQLite，迁移后原文件重命名为 .migrated"""
+        if not self._load_json():
+            logger.warning("JSON 数据文件读取失败，跳过迁移")
             return
+        self._rebuild_index()
+        if not self.save():
+            # 迁移未提交：保留 JSON 文件，本次运行继续使用 JSON 后端，下次启动重新迁移
+            logger.error("迁移到 SQLite 失败，本次运行继续使用 JSON 数据文件")
+            assert self._store is not None
+            self._store.close()
+            self._store = None
+            self.backend = "json"
+            return
+        migrated_file = self.data_file.with_name(self.data_file.name + ".migrated")
+        os.replace(self.data_file, migrated_file)
+        logger.info(
+            f"已将 {len(self.room_info)} 个房间、{self.get_total_subscriptions()} 个订阅"
+            f"迁移到 SQLite，原数据文件已重命名为 {migrated_file.name}"
+        )
+
+    def _load_json(self) -> bool:
+        """从 JSON 文件加载数据，兼容旧格式
+
+        Returns:
+            是否加载成功（文件不存在视为成功）
+        """
+        from ..models.room import RoomInfo as RoomInfoClass
+        from ..models.subscription import SubscriptionConfig as SubConfigClass
+
+        if not os.path.exists(self.data_file):
+            self.subscriptions = {}
+            self.room_info = {}
+            return True
 
         try:
             with open(self.data_file, encoding="utf-8") as f:
@@ -107,26 +243,135 @@ class DataManager:
             logger.error(f"加载斗鱼直播数据失败: {e}")
             self.subscriptions = {}
             self.room_info = {}
+            return False
+        return True
 
-    def save(self) -> None:
-        """保存数据到文件"""
-        try:
-            data = {
-                "subscriptions": {
-                    str(room_id): {
-                        umo: config.to_dict()
-                        for umo, config in sub_dict.items()
+    def _snapshot(self) -> dict[str, Any]:
+        """生成可序列化的数据快照，调用者需持有 _lock"""
+        return {
+            "subscriptions": {
+                str(room_id): {
+                    umo: config.to_dict()
+                    for umo, config in sub_dict.items()
+                }
+                for room_id, sub_dict in self.subscriptions.items()
+            },
+            "room_info": {
+                str(k): v.to_dict() for k, v in self.room_info.items()
+            },
+        }
+
+    def _write(self, data: dict[str, Any]) -> None:
+        """写入临时文件后原子替换数据文件"""
+        tmp_file = self.data_file.with_name(self.data_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+
+    def save(self) -> bool:
+        """立即保存全部数据
+
+        Returns:
+            是否保存成功（SQLite 后端为事务是否提交）
+        """
+        if self._store is not None:
+            try:
+                with self._lock:
+                    rooms = {k: v.to_dict() for k, v in self.room_info.items()}
+                    subscriptions = {
+                        room_id: {umo: config.to_dict() for umo, config in sub_dict.items()}
+                        for room_id, sub_dict in self.subscriptions.items()
                     }
-                    for room_id, sub_dict in self.subscriptions.items()
-                },
-                "room_info": {
-                    str(k): v.to_dict() for k, v in self.room_info.items()
-                },
-            }
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+                self._store.replace_all(rooms, subscriptions)
+            except Exception as e:
+                logger.error(f"保存斗鱼直播数据失败: {e}")
+                return False
+            return True
+        try:
+            with self._write_lock:
+                with self._lock:
+                    if self._flush_timer:
+                        self._flush_timer.cancel()
+                        self._flush_timer = None
+                    self._dirty = False
+                    data = self._snapshot()
+                self._write(data)
         except Exception as e:
             logger.error(f"保存斗鱼直播数据失败: {e}")
+            return False
+        return True
+
+    def _mark_dirty(self) -> None:
+        """数据已修改：立即保存，或在延迟写入模式下安排一次合并写入"""
+        if not self.write_behind:
+            self.save()
+            return
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = Timer(self.flush_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """写入尚未落盘的修改"""
+        with self._lock:
+            if not self._dirty:
+                self._flush_timer = None
+                return
+        self.save()
+
+    def close(self) -> None:
+        """取消延迟写入并落盘"""
+        self.flush()
+        if self._store is not None:
+            self._store.close()
+
+    def _persist_room(self, room_id: int) -> None:
+        """持久化房间信息的修改"""
+        if self._store is None:
+            self._mark_dirty()
+            return
+        try:
+            with self._lock:
+                data = self.room_info[room_id].to_dict()
+            self._store.upsert_room(room_id, data)
+        except Exception as e:
+            logger.error(f"保存房间 {room_id} 数据失败: {e}")
+
+    def _persist_room_removed(self, room_id: int) -> None:
+        """持久化房间删除"""
+        if self._store is None:
+            self._mark_dirty()
+            return
+        try:
+            self._store.delete_room(room_id)
+        except Exception as e:
+            logger.error(f"删除房间 {room_id} 数据失败: {e}")
+
+    def _persist_subscription(self, room_id: int, umo: str) -> None:
+        """持久化订阅的新增或修改"""
+        if self._store is None:
+            self._mark_dirty()
+            return
+        try:
+            with self._lock:
+                config = self.subscriptions[room_id][umo].to_dict()
+            self._store.upsert_subscription(room_id, umo, config)
+        except Exception as e:
+            logger.error(f"保存订阅 {room_id}/{umo} 失败: {e}")
+
+    def _persist_unsubscribe(self, room_id: int, umo: str) -> None:
+        """持久化取消订阅"""
+        if self._store is None:
+            self._mark_dirty()
+            return
+        try:
+            self._store.delete_subscription(room_id, umo)
+        except Exception as e:
+            logger.error(f"删除订阅 {room_id}/{umo} 失败: {e}")
 
     # ==================== 房间管理 ====================
 
@@ -137,10 +382,11 @@ class DataManager:
             room_id: 房间号
             info: 房间信息
         """
-        self.room_info[room_id] = info
-        if room_id not in self.subscriptions:
-            self.subscriptions[room_id] = {}
-        self.save()
+        with self._lock:
+            self.room_info[room_id] = info
+            if room_id not in self.subscriptions:
+                self._publish(room_id, {})
+        self._persist_room(room_id)
 
     def remove_room(self, room_id: int) -> bool:
         """删除房间
@@ -151,12 +397,16 @@ class DataManager:
         Returns:
             是否成功删除
         """
-        if room_id not in self.room_info:
-            return False
-        del self.room_info[room_id]
-        if room_id in self.subscriptions:
-            del self.subscriptions[room_id]
-        self.save()
+        with self._lock:
+            if room_id not in self.room_info:
+                return False
+            del self.room_info[room_id]
+            if room_id in self.subscriptions:
+                for umo in self.subscriptions[room_id]:
+                    self._index_remove(room_id, umo)
+                del self.subscriptions[room_id]
+            self._snapshots.pop(room_id, None)
+        self._persist_room_removed(room_id)
         return True
 
     def get_room(self, room_id: int) -> RoomInfo | None:
@@ -188,12 +438,13 @@ class DataManager:
         Returns:
             是否成功更新
         """
-        if room_id not in self.room_info:
-            return False
-        for key, value in kwargs.items():
-            if hasattr(self.room_info[room_id], key):
-                setattr(self.room_info[room_id], key, value)
-        self.save()
+        with self._lock:
+            if room_id not in self.room_info:
+                return False
+            for key, value in kwargs.items():
+                if hasattr(self.room_info[room_id], key):
+                    setattr(self.room_info[room_id], key, value)
+        self._persist_room(room_id)
         return True
 
     # ==================== 订阅管理 ====================
@@ -210,14 +461,17 @@ class DataManager:
         """
         from ..models.subscription import SubscriptionConfig as SubConfigClass
 
-        if room_id not in self.subscriptions:
-            self.subscriptions[room_id] = {}
-        if umo in self.subscriptions[room_id]:
-            return False
-
-        # 新订阅使用默认配置
-        self.subscriptions[room_id][umo] = SubConfigClass()
-        self.save()
+        with self._lock:
+            current = self.subscriptions.get(room_id, {})
+            if umo in current:
+                return False
+
+            # 新订阅使用默认配置
+            updated = dict(current)
+            updated[umo] = SubConfigClass()
+            self._publish(room_id, updated)
+            self._index_add(room_id, umo)
+        self._persist_subscription(room_id, umo)
         return True
 
     def unsubscribe(self, room_id: int, umo: str) -> bool:
@@ -230,19 +484,21 @@ class DataManager:
         Returns:
             是否成功（False 表示未订阅）
         """
-        if room_id not in self.subscriptions:
-            return False
-        if umo not in self.subscriptions[room_id]:
-            return False
-        del self.subscriptions[room_id][umo]
-        self.save()
+        with self._lock:
+            if room_id not in self.subscriptions:
+                return False
+            if umo not in self.subscriptions[room_id]:
+                return False
+            updated = dict(self.subscriptions[room_id])
+            del updated[umo]
+            self._publish(room_id, updated)
+            self._index_remove(room_id, umo)
+        self._persist_unsubscribe(room_id, umo)
         return True
 
     def get_subscribers(self, room_id: int) -> set[str]:
         """获取房间的订阅者列表"""
-        if room_id not in self.subscriptions:
-            return set()
-        return set(self.subscriptions[room_id].keys())
+        return set(self._snapshots.get(room_id, _EMPTY_SNAPSHOT))
 
     def get_subscription_config(self, room_id: int, umo: str) -> SubscriptionConfig | None:
         """获取指定订阅的配置
@@ -254,20 +510,21 @@ class DataManager:
         Returns:
             订阅配置，不存在返回 None
         """
-        if room_id not in self.subscriptions:
-            return None
-        return self.subscriptions[room_id].get(umo)
+        return self._snapshots.get(room_id, _EMPTY_SNAPSHOT).get(umo)
 
-    def get_all_subscription_configs(self, room_id: int) -> dict[str, SubscriptionConfig]:
+    def get_all_subscription_configs(self, room_id: int) -> Mapping[str, SubscriptionConfig]:
         """获取房间所有订阅的配置
 
+        返回的是只读快照，可在任意线程中无锁读取；订阅变化时会发布新的快照，
+        已取得的快照内容保持不变。
+
         Args:
             room_id: 房间号
 
         Returns:
-            {umo -> SubscriptionConfig} 字典
+            {umo -> SubscriptionConfig} 只读映射
         """
-        return self.subscriptions.get(room_id, {}).copy()
+        return self._snapshots.get(room_id, _EMPTY_SNAPSHOT)
 
     def update_subscription_config(self, room_id: int, umo: str, **kwargs: Any) -> bool:
         """更新指定订阅的配置
@@ -280,26 +537,25 @@ class DataManager:
         Returns:
             是否成功更新
         """
-        if room_id not in self.subscriptions:
-            return False
-        if umo not in self.subscriptions[room_id]:
-            return False
-
-        config = self.subscriptions[room_id][umo]
-        for key, value in kwargs.items():
-            if hasattr(config, key):
-                setattr(config, key, value)
-        self.save()
+        with self._lock:
+            if room_id not in self.subscriptions:
+                return False
+            if umo not in self.subscriptions[room_id]:
+                return False
+
+            config = self.subscriptions[room_id][umo]
+            changes = {key: value for key, value in kwargs.items() if hasattr(config, key)}
+            updated = dict(self.subscriptions[room_id])
+            updated[umo] = dataclasses.replace(config, **changes)
+            self._publish(room_id, updated)
+        self._persist_subscription(room_id, umo)
         return True
 
     def get_user_subscriptions(self, umo: str) -> list[int]:
-        """获取用户订阅的房间列表"""
-        return [
-            room_id
-            for room_id, sub_dict in self.subscriptions.items()
-            if umo in sub_dict
-        ]
+        """获取用户订阅的房间列表（按房间号排序）"""
+        with self._lock:
+            return sorted(self._user_rooms.get(umo, ()))
 
     def get_total_subscriptions(self) -> int:
         """获取总订阅数"""
-        return sum(len(s) for s in self.subscriptions.values())
+        return self._total_subscriptions
@@ -0,0 +1,129 @@
+"""礼物配置磁盘缓存
+
+解析后的全局与房间礼物表以紧凑的行格式 [[gift_id, name, value], ...] 保存在
+插件数据目录下的 SQLite 数据库中，并记录响应的 ETag / Last-Modified，
+重启时直接从缓存发布礼物表，再在后台以条件请求向 CDN 校验是否有更新。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import NamedTuple
+
+# 全局礼物配置在缓存中使用的键（斗鱼房间号均为正数）
+GLOBAL_GIFT_KEY = 0
+
+# 缓存格式版本，低于此版本的缓存全部丢弃后重新拉取
+# 1: 配置中缺失的名称与价值保存为 null，不再写入占位名称与价值 0
+_CACHE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gift_tables (
+    room_id INTEGER PRIMARY KEY,
+    named INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    gifts TEXT NOT NULL
+);
+"""
+
+
+class GiftCacheEntry(NamedTuple):
+    """一份缓存的礼物表"""
+
+    rows: list  # [[gift_id, name, value], ...]，缺失的名称与价值为 null
+    named: int
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class GiftConfigCache:
+    """礼物配置的 SQLite 缓存"""
+
+    def __init__(self, db_path: Path):
+        """初始化缓存
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _CACHE_VERSION:
+            self._conn.execute("DELETE FROM gift_tables")
+            self._conn.execute(f"PRAGMA user_version = {_CACHE_VERSION}")
+
+    def load_all(self) -> dict[int, GiftCacheEntry]:
+        """读取全部缓存
+
+        Returns:
+            {room_id -> GiftCacheEntry}，全局配置的键为 GLOBAL_GIFT_KEY
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT room_id, named, etag, last_modified, fetched_at, gifts FROM gift_tables"
+            ).fetchall()
+        return {
+            room_id: GiftCacheEntry(json.loads(gifts), named, etag, last_modified, fetched_at)
+            for room_id, named, etag, last_modified, fetched_at, gifts in rows
+        }
+
+    def validators(self, room_id: int) -> tuple[str | None, str | None, int] | None:
+        """获取条件请求所需的校验信息
+
+        Returns:
+            (etag, last_modified, named)，没有缓存时为 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, named FROM gift_tables WHERE room_id = ?",
+                (room_id,),
+            ).fetchone()
+        return None if row is None else (row[0], row[1], row[2])
+
+    def put(
+        self,
+        room_id: int,
+        rows: list,
+        named: int,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """写入礼物表"""
+        gifts = json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO gift_tables "
+                "(room_id, named, etag, last_modified, fetched_at, gifts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (room_id, named, etag, last_modified, time.time(), gifts),
+            )
+
+    def touch(self, room_id: int) -> None:
+        """记录一次校验成功（内容未变化）"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE gift_tables SET fetched_at = ? WHERE room_id = ?",
+                (time.time(), room_id),
+            )
+
+    def delete(self, room_id: int) -> None:
+        """删除房间的缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM gift_tables WHERE room_id = ?", (room_id,))
+
+    def close(self) -> None:
+        """关闭数据库"""
+        with self._lock:
+            self._conn.close()
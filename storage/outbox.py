@@ -0,0 +1,257 @@
+"""通知发件箱模块
+
+所有待发送的通知在发送前先写入插件数据目录下的 SQLite 数据库，
+每个 (消息, 会话) 记录独立的投递状态。插件重启或崩溃后，
+未确认投递的记录会在下次启动时重新发送（至少一次语义）。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from threading import Lock
+
+from astrbot.api import logger
+
+# 投递状态
+STATE_PENDING = 0
+STATE_DELIVERED = 1
+STATE_FAILED = 2
+
+# 投递失败的记录保留时间（秒），便于排查
+FAILED_RETENTION = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    message_id INTEGER NOT NULL,
+    umo TEXT NOT NULL,
+    at_all INTEGER NOT NULL DEFAULT 0,
+    state INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (message_id, umo)
+);
+CREATE INDEX IF NOT EXISTS idx_deliveries_state ON deliveries (state, message_id);
+"""
+
+
+class NotificationOutbox:
+    """持久化通知发件箱
+
+    写入在调用线程中同步完成（单个事务），投递结果先缓存在内存中，
+    由 flush_acks() 批量落盘，以支撑每秒数百条消息的吞吐；
+    确认结果在落盘前丢失只会导致重复发送，不会丢失通知。
+    """
+
+    def __init__(self, db_path: Path):
+        """初始化发件箱
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self._lock = Lock()
+        self._acks: list[tuple[int, float, int, str]] = []
+        self._conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(
+        self, subscriber_settings: dict[str, bool], message: str, priority: int = 0
+    ) -> int:
+        """写入一条待发送通知
+
+        Args:
+            subscriber_settings: {umo -> at_all}
+            message: 通知消息内容
+            priority: 发送优先级
+
+        Returns:
+            消息 ID
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.execute(
+                    "INSERT INTO messages (message, priority, created_at) VALUES (?, ?, ?)",
+                    (message, priority, now),
+                )
+                message_id = cur.lastrowid
+                cur.executemany(
+                    "INSERT INTO deliveries (message_id, umo, at_all, state, updated_at) "
+                    "VALUES (?, ?, ?, 0, ?)",
+                    [
+                        (message_id, umo, int(at_all), now)
+                        for umo, at_all in subscriber_settings.items()
+                    ],
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return int(message_id)
+
+    def mark(self, message_id: int, umo: str, delivered: bool) -> None:
+        """记录投递结果（线程安全，延迟落盘）"""
+        state = STATE_DELIVERED if delivered else STATE_FAILED
+        with self._lock:
+            self._acks.append((state, time.time(), message_id, umo))
+
+    def flush_acks(self) -> int:
+        """将缓存的投递结果批量写入数据库
+
+        Returns:
+            写入的记录数
+        """
+        with self._lock:
+            acks, self._acks = self._acks, []
+            if not acks:
+                return 0
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.executemany(
+                    "UPDATE deliveries SET state = ?, updated_at = ? "
+                    "WHERE message_id = ? AND umo = ?",
+                    acks,
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                self._acks[:0] = acks
+                raise
+        return len(acks)
+
+    def last_message_id(self) -> int:
+        """当前最大的消息 ID，发件箱为空时为 0"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM messages").fetchone()
+        return int(row[0] or 0)
+
+    def expire(self, max_age: Mapping[int, float], max_id: int | None = None) -> int:
+        """将超过时效仍未投递的记录标记为失败
+
+        Args:
+            max_age: {priority -> 最长时效（秒）}，未列出的优先级不过期
+            max_id: 只处理消息 ID 不大于该值的记录，为 None 时处理全部
+
+        Returns:
+            标记为失败的记录数
+        """
+        now = time.time()
+        query = (
+            "UPDATE deliveries SET state = ?, updated_at = ? "
+            "WHERE state = 0 AND message_id IN "
+            "(SELECT id FROM messages WHERE priority = ? AND created_at < ?"
+        )
+        if max_id is not None:
+            query += " AND id <= ?"
+        query += ")"
+
+        expired = 0
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                for priority, age in max_age.items():
+                    params: tuple = (STATE_FAILED, now, priority, now - age)
+                    if max_id is not None:
+                        params += (max_id,)
+                    cur.execute(query, params)
+                    expired += cur.rowcount
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return expired
+
+    def pending(self, max_id: int | None = None) -> list[tuple[int, str, int, dict[str, bool]]]:
+        """获取尚未确认投递的通知
+
+        Args:
+            max_id: 只返回消息 ID 不大于该值的通知，为 None 时返回全部
+
+        Returns:
+            [(message_id, message, priority, {umo -> at_all})]，按消息 ID 排序
+        """
+        query = (
+            "SELECT m.id, m.message, m.priority, d.umo, d.at_all "
+            "FROM deliveries d JOIN messages m ON m.id = d.message_id "
+            "WHERE d.state = 0"
+        )
+        params: tuple = ()
+        if max_id is not None:
+            query += " AND m.id <= ?"
+            params = (max_id,)
+        with self._lock:
+            acked = {(mid, umo) for _, _, mid, umo in self._acks}
+            rows = self._conn.execute(query + " ORDER BY m.id", params).fetchall()
+
+        result: dict[int, tuple[int, str, int, dict[str, bool]]] = {}
+        for message_id, message, priority, umo, at_all in rows:
+            if (message_id, umo) in acked:
+                continue
+            entry = result.get(message_id)
+            if entry is None:
+                entry = (message_id, message, priority, {})
+                result[message_id] = entry
+            entry[3][umo] = bool(at_all)
+        return list(result.values())
+
+    def pending_count(self) -> int:
+        """未确认投递的 (消息, 会话) 数量"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM deliveries WHERE state = 0"
+            ).fetchone()
+            return int(row[0]) - len(self._acks)
+
+    def compact(self) -> int:
+        """清理已投递的记录与过期的失败记录，并截断 WAL
+
+        Returns:
+            删除的投递记录数
+        """
+        self.flush_acks()
+        cutoff = time.time() - FAILED_RETENTION
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.execute(
+                    "DELETE FROM deliveries WHERE state = ? OR (state = ? AND updated_at < ?)",
+                    (STATE_DELIVERED, STATE_FAILED, cutoff),
+                )
+                removed = cur.rowcount
+                cur.execute(
+                    "DELETE FROM messages WHERE NOT EXISTS "
+                    "(SELECT 1 FROM deliveries d WHERE d.message_id = messages.id)"
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if removed:
+            logger.debug(f"通知发件箱已清理 {removed} 条记录")
+        return removed
+
+    def close(self) -> None:
+        """落盘投递结果并关闭数据库"""
+        try:
+            self.flush_acks()
+        finally:
+            with self._lock:
+                self._conn.close()
@@ -0,0 +1,156 @@
+"""SQLite 数据存储后端
+
+房间与订阅分别存放在带索引的表中，每次修改只更新受影响的行（单个事务），
+不再随订阅数增长重写整个数据文件。行内数据以 JSON 保存，
+读取时仍通过模型的 from_dict 兼容旧字段。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    room_id INTEGER NOT NULL,
+    umo TEXT NOT NULL,
+    config TEXT NOT NULL,
+    PRIMARY KEY (room_id, umo)
+);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_umo ON subscriptions (umo);
+"""
+
+
+class SqliteStore:
+    """房间与订阅的 SQLite 存储"""
+
+    def __init__(self, db_path: Path):
+        """初始化存储
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _transaction(self, statements: list[tuple[str, tuple]]) -> None:
+        """在单个事务中执行多条语句"""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                for sql, params in statements:
+                    cur.execute(sql, params)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def is_empty(self) -> bool:
+        """是否没有任何房间与订阅"""
+        with self._lock:
+            for table in ("rooms", "subscriptions"):
+                if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                    return False
+        return True
+
+    def load(self) -> tuple[dict[int, dict[str, Any]], dict[int, dict[str, dict[str, Any]]]]:
+        """读取全部数据
+
+        Returns:
+            ({room_id -> 房间字典}, {room_id -> {umo -> 订阅配置字典}})
+        """
+        with self._lock:
+            room_rows = self._conn.execute("SELECT room_id, data FROM rooms").fetchall()
+            sub_rows = self._conn.execute(
+                "SELECT room_id, umo, config FROM subscriptions"
+            ).fetchall()
+
+        rooms = {room_id: json.loads(data) for room_id, data in room_rows}
+        subscriptions: dict[int, dict[str, dict[str, Any]]] = {
+            room_id: {} for room_id in rooms
+        }
+        for room_id, umo, config in sub_rows:
+            subscriptions.setdefault(room_id, {})[umo] = json.loads(config)
+        return rooms, subscriptions
+
+    def upsert_room(self, room_id: int, data: dict[str, Any]) -> None:
+        """写入房间信息"""
+        self._transaction([
+            (
+                "INSERT OR REPLACE INTO rooms (room_id, data) VALUES (?, ?)",
+                (room_id, json.dumps(data, ensure_ascii=False)),
+            )
+        ])
+
+    def delete_room(self, room_id: int) -> None:
+        """删除房间及其所有订阅"""
+        self._transaction([
+            ("DELETE FROM subscriptions WHERE room_id = ?", (room_id,)),
+            ("DELETE FROM rooms WHERE room_id = ?", (room_id,)),
+        ])
+
+    def upsert_subscription(self, room_id: int, umo: str, config: dict[str, Any]) -> None:
+        """写入订阅配置"""
+        self._transaction([
+            (
+                "INSERT OR REPLACE INTO subscriptions (room_id, umo, config) VALUES (?, ?, ?)",
+                (room_id, umo, json.dumps(config, ensure_ascii=False)),
+            )
+        ])
+
+    def delete_subscription(self, room_id: int, umo: str) -> None:
+        """删除订阅"""
+        self._transaction([
+            ("DELETE FROM subscriptions WHERE room_id = ? AND umo = ?", (room_id, umo)),
+        ])
+
+    def replace_all(
+        self,
+        rooms: dict[int, dict[str, Any]],
+        subscriptions: dict[int, dict[str, dict[str, Any]]],
+    ) -> None:
+        """在单个事务中用给定数据替换全部内容（用于迁移与全量保存）"""
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.execute("DELETE FROM subscriptions")
+                cur.execute("DELETE FROM rooms")
+                cur.executemany(
+                    "INSERT INTO rooms (room_id, data) VALUES (?, ?)",
+                    [
+                        (room_id, json.dumps(data, ensure_ascii=False))
+                        for room_id, data in rooms.items()
+                    ],
+                )
+                cur.executemany(
+                    "INSERT INTO subscriptions (room_id, umo, config) VALUES (?, ?, ?)",
+                    [
+                        (room_id, umo, json.dumps(config, ensure_ascii=False))
+                        for room_id, sub_dict in subscriptions.items()
+                        for umo, config in sub_dict.items()
+                    ],
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        """关闭数据库"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,41 @@
+"""测试公共配置
+
+插件目录以包的形式导入（子模块使用相对导入），这里只注册包本身而不执行
+插件的 ``__init__``，避免测试存储、礼物配置等模块时加载 main.py 与整个 AstrBot 运行时。
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "astrbot_plugin_douyu_live"
+
+if PACKAGE not in sys.modules:
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE] = package
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """将插件数据目录指向临时目录"""
+    from astrbot.api.star import StarTools
+
+    monkeypatch.setattr(StarTools, "get_data_dir", lambda *args, **kwargs: tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def gift_snapshot(monkeypatch):
+    """礼物配置从内置常量构建的初始快照开始，测试结束后恢复"""
+    from astrbot_plugin_douyu_live.utils import gift_config
+
+    default = gift_config._build_default_table()
+    monkeypatch.setattr(
+        gift_config,
+        "_SNAPSHOT",
+        gift_config.GiftConfigSnapshot(0, None, 0, default, dict(default), {}),
+    )
@@ -0,0 +1,69 @@
+"""连接准入控制测试"""
+
+import asyncio
+import threading
+
+from astrbot_plugin_douyu_live.core.admission import (
+    ADMIT_IDLE,
+    ADMIT_LIVE,
+    ConnectionAdmission,
+)
+from astrbot_plugin_douyu_live.core.monitor_pool import PooledMonitor
+
+
+def test_replace_swaps_queued_start():
+    async def run():
+        admission = ConnectionAdmission(max_concurrent=1, rate=0, handshake_timeout=0.1)
+        calls = []
+        # 占住唯一的握手名额，后续提交只能排队
+        blocker = admission.submit(1, lambda: calls.append("blocker") or True, ADMIT_LIVE)
+        await blocker
+
+        first = admission.submit(2, lambda: calls.append("start") or True, ADMIT_LIVE)
+        ignored = admission.submit(2, lambda: calls.append("ignored") or True, ADMIT_IDLE)
+        restart = admission.submit(
+            2, lambda: calls.append("restart") or True, ADMIT_IDLE, replace=True
+        )
+
+        assert first is ignored is restart
+        assert await restart
+        assert calls == ["blocker", "restart"]
+        await admission.close()
+
+    asyncio.run(run())
+
+
+class _FakePool:
+    """模拟监控池：attach 后由分发线程回传连接建立事件"""
+
+    def attach(self, monitor):
+        threading.Timer(0.05, monitor.dispatch, args=("connected", None)).start()
+        return True
+
+
+def test_pooled_monitor_releases_handshake_on_connect():
+    async def run():
+        # 握手超时远大于测试时长：只有收到连接信号才能让下一个房间准入
+        admission = ConnectionAdmission(max_concurrent=1, rate=0, handshake_timeout=30.0)
+        pool = _FakePool()
+
+        def starter(room_id):
+            def start():
+                monitor = PooledMonitor(room_id, pool)
+                monitor.connected_callback = admission.connected
+                return monitor.start()
+
+            return start
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(admission.submit(room_id, starter(room_id)) for room_id in (1, 2, 3))
+            ),
+            timeout=5.0,
+        )
+        assert results == [True, True, True]
+        await asyncio.sleep(0.2)
+        assert admission.handshaking == 0
+        await admission.close()
+
+    asyncio.run(run())
@@ -0,0 +1,37 @@
+"""斗鱼 API 缓存测试"""
+
+import asyncio
+
+import httpx
+
+from astrbot_plugin_douyu_live.core.api import DouyuAPI
+
+
+def _handler(request):
+    room_id = int(str(request.url).rsplit("/", 1)[-1])
+    if room_id >= 900:
+        return httpx.Response(404)
+    return httpx.Response(200, json={"room": {"owner_name": f"主播{room_id}"}})
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(DouyuAPI, "MAX_CACHE_SIZE", 3)
+    monkeypatch.setattr(DouyuAPI, "_cache", {})
+
+    async def run():
+        DouyuAPI._client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        # 不存在的房间立即过期，写入新条目时优先被清理
+        monkeypatch.setattr(DouyuAPI, "NEGATIVE_CACHE_TTL", 0.0)
+        assert await DouyuAPI.fetch_room_info(900) is None
+        for room_id in (1, 2):
+            await DouyuAPI.fetch_room_info(room_id)
+        await DouyuAPI.fetch_room_info(3)
+        assert list(DouyuAPI._cache) == [1, 2, 3]
+
+        # 没有过期条目时淘汰最早写入的条目
+        info = await DouyuAPI.fetch_room_info(4)
+        assert info["owner_name"] == "主播4"
+        assert list(DouyuAPI._cache) == [2, 3, 4]
+        await DouyuAPI.close()
+
+    asyncio.run(run())
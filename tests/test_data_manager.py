@@ -0,0 +1,81 @@
+"""DataManager 存储后端测试"""
+
+import json
+import sqlite3
+
+from astrbot_plugin_douyu_live.models.subscription import SubscriptionConfig
+from astrbot_plugin_douyu_live.storage.data_manager import DataManager
+from astrbot_plugin_douyu_live.storage.sqlite_store import SqliteStore
+
+LEGACY_DATA = {
+    "room_info": {
+        "100": {"name": "主播A", "at_all": True, "gift_notify": True, "high_value_only": True},
+        "200": {"name": "主播B"},
+    },
+    # 旧格式：每个房间只保存订阅者 umo 列表
+    "subscriptions": {
+        "100": ["aiocqhttp:GroupMessage:1", "aiocqhttp:GroupMessage:2"],
+        "200": ["aiocqhttp:GroupMessage:1"],
+    },
+}
+
+
+def _write_legacy(data_dir):
+    path = data_dir / "douyu_live_data.json"
+    path.write_text(json.dumps(LEGACY_DATA, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def _count(db_file, table):
+    with sqlite3.connect(db_file) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_migrate_legacy_json_to_sqlite(data_dir):
+    json_file = _write_legacy(data_dir)
+
+    manager = DataManager(backend="sqlite")
+    manager.close()
+
+    assert _count(manager.db_file, "rooms") == 2
+    assert _count(manager.db_file, "subscriptions") == 3
+    assert not json_file.exists()
+    assert json_file.with_name(json_file.name + ".migrated").exists()
+
+    # 迁移后的订阅继承房间级别的设置
+    reloaded = DataManager(backend="sqlite")
+    config = reloaded.get_subscription_config(100, "aiocqhttp:GroupMessage:1")
+    assert config is not None and config.at_all and config.gift_notify
+    assert reloaded.get_total_subscriptions() == 3
+    reloaded.close()
+
+
+def test_failed_migration_keeps_json(data_dir, monkeypatch):
+    json_file = _write_legacy(data_dir)
+
+    replace_all = SqliteStore.replace_all
+
+    def fail(self, rooms, subscriptions):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(SqliteStore, "replace_all", fail)
+    manager = DataManager(backend="sqlite")
+
+    # JSON 文件保留，本次运行回退到 JSON 后端，数据仍完整
+    assert json_file.exists()
+    assert manager.backend == "json"
+    assert manager.get_total_subscriptions() == 3
+    manager.close()
+
+    monkeypatch.setattr(SqliteStore, "replace_all", replace_all)
+    migrated = DataManager(backend="sqlite")
+    assert migrated.get_total_subscriptions() == 3
+    assert not json_file.exists()
+    migrated.close()
+
+
+def test_gift_combo_is_off_by_default():
+    # 旧订阅没有 gift_combo_window 字段，加载后不应被自动开启连击合并
+    assert SubscriptionConfig().gift_combo_window == 0
+    assert SubscriptionConfig.from_dict({"gift_notify": True}).gift_combo_window == 0
+    assert SubscriptionConfig.from_dict({"gift_combo_window": 5}).gift_combo_window == 5
@@ -0,0 +1,81 @@
+"""礼物配置解析与发布测试"""
+
+import pytest
+
+from astrbot_plugin_douyu_live.utils import gift_config
+
+pytestmark = pytest.mark.usefixtures("gift_snapshot")
+
+GLOBAL_PAYLOAD = {
+    "error": 0,
+    "data": {
+        "20000": {"name": "飞机", "devote": "10000.0"},
+        "20001": {"name": "荧光棒", "devote": "0.1"},
+        "20002": {"devote": "600.0"},
+    },
+}
+
+
+def test_parse_records_only_present_fields():
+    gifts, named = gift_config.parse_gift_config(GLOBAL_PAYLOAD)
+
+    assert named == 2
+    assert gifts[20000] == ("飞机", 10000)
+    assert gifts[20002] == (None, 600)
+
+
+def test_nameless_room_entry_keeps_global_info():
+    gift_config.apply_gift_config(GLOBAL_PAYLOAD)
+    room = {"error": 0, "data": {"gift": [{"id": 20000}, {"id": 30000, "name": "房间礼物", "gx": 6}]}}
+    gift_config.apply_room_gift_config(100, room)
+
+    expected = gift_config.GiftInfo("飞机", 10000, True)
+    assert gift_config.get_gift_info(20000, 100) == expected
+    assert gift_config.get_gift_info(20000) == expected
+    assert gift_config.get_gift_info(30000, 100) == gift_config.GiftInfo("房间礼物", 6, False)
+
+
+def test_room_value_overrides_global_value():
+    gift_config.apply_gift_config(GLOBAL_PAYLOAD)
+    room = {"error": 0, "data": {"gift": [{"id": 20001, "name": "荧光棒", "gx": "20000"}]}}
+    gift_config.apply_room_gift_config(100, room)
+
+    assert gift_config.get_gift_info(20001, 100) == gift_config.GiftInfo("荧光棒", 20000, True)
+
+
+def test_rows_round_trip_keeps_missing_fields():
+    gifts, _ = gift_config.parse_gift_config(GLOBAL_PAYLOAD)
+    rows = [list(row) for row in gift_config.gift_table_to_rows(gifts)]
+
+    assert gift_config.gift_table_from_rows(rows) == gifts
+
+
+def test_room_publish_keeps_unchanged_room_tables():
+    gift_config.apply_gift_config(GLOBAL_PAYLOAD)
+    room = {"error": 0, "data": {"gift": [{"id": 30000, "name": "房间礼物", "gx": 6}]}}
+    gift_config.apply_room_gift_config(100, room)
+    gift_config.apply_room_gift_config(200, room)
+    before = gift_config.get_gift_snapshot()
+    before.lookup(30000, 100)
+    before.lookup(30000, 200)
+
+    updated = {"error": 0, "data": {"gift": [{"id": 30000, "name": "新房间礼物", "gx": 8}]}}
+    gift_config.apply_room_gift_config(200, updated)
+    after = gift_config.get_gift_snapshot()
+
+    assert after._room_infos[100] is before._room_infos[100]
+    assert 200 not in after._room_infos
+    assert after.lookup(30000, 200).name == "新房间礼物"
+    assert after.lookup(30000, 100).name == "房间礼物"
+
+
+def test_gift_from_other_room_is_unknown():
+    gift_config.apply_gift_config(GLOBAL_PAYLOAD)
+    room = {"error": 0, "data": {"gift": [{"id": 30000, "name": "房间礼物", "gx": 6}]}}
+    gift_config.apply_room_gift_config(100, room)
+
+    assert gift_config.has_gift_info(30000, 100)
+    assert gift_config.has_gift_info(20000, 200)
+    # 只在房间 100 的配置中出现过，房间 200 仍需加载自己的配置
+    assert not gift_config.has_gift_info(30000, 200)
+    assert gift_config.has_gift_info(30000)
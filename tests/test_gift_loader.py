@@ -0,0 +1,51 @@
+"""礼物配置加载器测试"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from astrbot_plugin_douyu_live.core.gift_loader import GiftConfigLoader
+from astrbot_plugin_douyu_live.storage.gift_cache import GLOBAL_GIFT_KEY, GiftConfigCache
+from astrbot_plugin_douyu_live.utils import gift_config
+
+pytestmark = pytest.mark.usefixtures("gift_snapshot")
+
+GLOBAL = "DYConfigCallback(" + json.dumps({"data": {"100": {"name": "火箭", "devote": "50000"}}}) + ");"
+ROOM = json.dumps({"error": 0, "data": {"gift": [{"id": 300, "name": "房间礼物", "gx": 9}]}})
+
+
+def test_conditional_request_only_for_published_tables(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == "v1":
+            return httpx.Response(304)
+        if "RoomApi" in str(request.url):
+            return httpx.Response(200, text=ROOM, headers={"ETag": "v1"})
+        return httpx.Response(200, text=GLOBAL, headers={"ETag": "v1"})
+
+    async def run():
+        cache = GiftConfigCache(tmp_path / "gift_cache.db")
+        cache.put(GLOBAL_GIFT_KEY, [[100, "火箭", 50000]], 1, etag="v1")
+        cache.put(5, [[300, "房间礼物", 9]], 1, etag="v1")
+        loader = GiftConfigLoader(cache=cache)
+        loader._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        # 缓存未恢复到快照中：不能发条件请求，否则 304 会让礼物表一直缺失
+        assert await loader.load_global() == 1
+        assert await loader.load_room(5) == 1
+        assert all("If-None-Match" not in r.headers for r in requests)
+        assert gift_config.get_gift_snapshot().loaded_at is not None
+        assert gift_config.get_gift_name(300, 5) == "房间礼物"
+
+        # 礼物表已发布后再校验时使用条件请求
+        requests.clear()
+        assert await loader.load_global() == 1
+        assert await loader.load_room(5) == 1
+        assert all(r.headers.get("If-None-Match") == "v1" for r in requests)
+        await loader.close()
+
+    asyncio.run(run())
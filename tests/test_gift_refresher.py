@@ -0,0 +1,28 @@
+"""礼物配置定时刷新测试"""
+
+import pytest
+
+from astrbot_plugin_douyu_live.core.gift_loader import GiftConfigLoader
+from astrbot_plugin_douyu_live.core.gift_refresher import GiftConfigRefresher
+from astrbot_plugin_douyu_live.storage.gift_cache import GLOBAL_GIFT_KEY
+from astrbot_plugin_douyu_live.utils import gift_config
+
+pytestmark = pytest.mark.usefixtures("gift_snapshot")
+
+
+def test_plan_refreshes_live_rooms_first():
+    gift_config.publish_room_gift_tables(
+        {room_id: {30000: ("房间礼物", 6)} for room_id in (1, 2, 3)}
+    )
+    live_rooms = {3}
+    refresher = GiftConfigRefresher(
+        GiftConfigLoader(),
+        get_room_ids=lambda: [1, 2, 3, 4],
+        is_live=live_rooms.__contains__,
+    )
+
+    # 全局配置最先，其次直播中的房间；未加载过配置的房间 4 不在计划中
+    assert refresher._plan() == [GLOBAL_GIFT_KEY, 3, 1, 2]
+    live_rooms.clear()
+    live_rooms.add(2)
+    assert refresher._plan() == [GLOBAL_GIFT_KEY, 2, 1, 3]
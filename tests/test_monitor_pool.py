@@ -0,0 +1,58 @@
+"""多进程监控池测试"""
+
+import pytest
+
+from astrbot_plugin_douyu_live.core import monitor_pool
+from astrbot_plugin_douyu_live.core.monitor_pool import MonitorPool, PooledMonitor
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # 由测试显式触发存活检查
+    monkeypatch.setattr(monitor_pool, "SUPERVISE_INTERVAL", 3600.0)
+    pool = MonitorPool(1)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_worker_runs_without_plugin_package(pool):
+    # 插件包在子进程中无法按包路径导入，工作进程必须绕过插件 __init__ 启动
+    process = pool._workers[0].process
+    pool.shutdown()
+    assert process.exitcode == 0
+
+
+def test_restart_reaps_dead_worker(pool):
+    worker = pool._workers[0]
+    old_process, old_conn = worker.process, worker.conn
+    old_process.kill()
+    old_process.join(5)
+
+    assert pool._restart_dead_workers() == 1
+    assert old_conn.closed
+    # 旧进程已被回收并释放资源
+    with pytest.raises(ValueError):
+        old_process.is_alive()
+    assert worker.process is not old_process and worker.alive
+
+
+def test_dispatch_tracks_live_status():
+    events = []
+    monitor = PooledMonitor(
+        1,
+        pool=None,
+        live_callback=lambda room_id, msg: events.append(("live", room_id)),
+        offline_callback=lambda room_id, duration: events.append(("offline", room_id)),
+    )
+    assert monitor.last_live_status is None
+
+    # 开播/下播事件与其他引擎一样更新监控器上的直播状态
+    monitor.dispatch("live", {"ss": "1", "ivl": "0"})
+    assert monitor.last_live_status is True
+    assert monitor.live_start_time is not None
+
+    monitor.dispatch("offline", 12.0)
+    assert monitor.last_live_status is False
+    assert monitor.live_start_time is None
+    assert events == [("live", 1), ("offline", 1)]
@@ -0,0 +1,73 @@
+"""通知发件箱测试"""
+
+import time
+
+import pytest
+
+from astrbot_plugin_douyu_live.storage.outbox import NotificationOutbox
+
+SUBSCRIBERS = {"aiocqhttp:GroupMessage:1": True, "aiocqhttp:GroupMessage:2": False}
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = NotificationOutbox(tmp_path / "outbox.db")
+    yield box
+    box.close()
+
+
+def test_pending_before_startup_boundary(outbox):
+    previous = outbox.enqueue(SUBSCRIBERS, "上次运行的通知")
+    replay_until = outbox.last_message_id()
+    outbox.enqueue(SUBSCRIBERS, "本次运行的通知")
+
+    # 补发只包含启动前已存在的消息
+    pending = outbox.pending(replay_until)
+    assert [message_id for message_id, *_ in pending] == [previous]
+    assert len(outbox.pending()) == 2
+
+
+def test_enqueue_records_each_subscriber(outbox):
+    message_id = outbox.enqueue(SUBSCRIBERS, "开播通知", priority=0)
+
+    assert outbox.pending() == [(message_id, "开播通知", 0, SUBSCRIBERS)]
+    assert outbox.pending_count() == 2
+
+
+def test_mark_hidden_until_flushed(outbox):
+    message_id = outbox.enqueue(SUBSCRIBERS, "礼物播报")
+    outbox.mark(message_id, "aiocqhttp:GroupMessage:1", True)
+
+    # 未落盘的确认结果同样不计入待发送
+    assert outbox.pending_count() == 1
+    assert outbox.pending()[0][3] == {"aiocqhttp:GroupMessage:2": False}
+
+    assert outbox.flush_acks() == 1
+    assert outbox.flush_acks() == 0
+    assert outbox.pending_count() == 1
+
+
+def test_compact_removes_delivered(outbox):
+    message_id = outbox.enqueue(SUBSCRIBERS, "下播通知")
+    for umo in SUBSCRIBERS:
+        outbox.mark(message_id, umo, True)
+    kept = outbox.enqueue(SUBSCRIBERS, "礼物播报")
+    outbox.mark(kept, "aiocqhttp:GroupMessage:1", False)
+
+    # 已投递的记录被删除，近期失败的记录保留
+    assert outbox.compact() == 2
+    assert outbox.pending_count() == 1
+    assert [message_id for message_id, *_ in outbox.pending()] == [kept]
+
+
+def test_expire_marks_stale_rows_failed(outbox, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now - 3600)
+    outbox.enqueue(SUBSCRIBERS, "礼物播报", priority=2)
+    stale_live = outbox.enqueue(SUBSCRIBERS, "开播通知", priority=0)
+    monkeypatch.setattr(time, "time", lambda: now)
+    fresh_gift = outbox.enqueue(SUBSCRIBERS, "礼物播报", priority=2)
+
+    # 一小时前的礼物播报超过时效，开播通知仍在时效内
+    assert outbox.expire({0: 7200.0, 2: 600.0}) == 2
+    assert [message_id for message_id, *_ in outbox.pending()] == [stale_live, fresh_gift]
@@ -0,0 +1,58 @@
+"""发送限流测试"""
+
+import asyncio
+
+import pytest
+
+from astrbot_plugin_douyu_live.core.rate_limiter import (
+    PRIORITY_GIFT,
+    PRIORITY_LIVE,
+    RateLimiter,
+    SendDropped,
+)
+
+UMO = "aiocqhttp:GroupMessage:1"
+
+
+def _limiter(**kwargs) -> RateLimiter:
+    # 突发 1 条、几乎不补充令牌，之后的请求全部排队
+    return RateLimiter(
+        platform_rate=0.01, platform_burst=1, umo_rate=0.01, umo_burst=1, **kwargs
+    )
+
+
+def test_gift_queue_limit_drops_only_gifts():
+    async def run():
+        limiter = _limiter(gift_queue_limit=2, gift_max_wait=0)
+        await limiter.acquire(UMO, PRIORITY_GIFT)
+        queued = [
+            asyncio.ensure_future(limiter.acquire(UMO, PRIORITY_GIFT)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(SendDropped):
+            await limiter.acquire(UMO, PRIORITY_GIFT)
+        # 开播通知不受礼物排队上限影响
+        live = asyncio.ensure_future(limiter.acquire(UMO, PRIORITY_LIVE))
+        await asyncio.sleep(0)
+
+        assert limiter.total_dropped == 1
+        assert limiter.queue_depth == 3
+        limiter.close()
+        await asyncio.gather(*queued, live, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_gift_max_wait_drops_stale_gifts():
+    async def run():
+        limiter = _limiter(gift_queue_limit=0, gift_max_wait=0.05)
+        await limiter.acquire(UMO, PRIORITY_GIFT)
+
+        with pytest.raises(SendDropped):
+            await asyncio.wait_for(limiter.acquire(UMO, PRIORITY_GIFT), timeout=1.0)
+        assert limiter.total_dropped == 1
+        assert limiter.queue_depth == 0
+        limiter.close()
+
+    asyncio.run(run())
@@ -24,6 +24,15 @@ EMOJI_COUNT = "🔢"
 # 高价值礼物默认过滤阈值
 DEFAULT_HIGH_VALUE_THRESHOLD = 10000
 
+# 礼物连击默认合并窗口（秒），0 表示不合并；默认关闭，避免已有订阅的播报被延迟
+DEFAULT_GIFT_COMBO_WINDOW = 0.0
+
+# 使用 /douyu giftcombo 开启合并且未指定秒数时的窗口（秒）
+GIFT_COMBO_ENABLE_WINDOW = 3.0
+
+# 延迟写入模式下合并数据修改的等待时间（秒）
+DEFAULT_STORAGE_FLUSH_DELAY = 1.0
+
 # 斗鱼礼物 ID 到名称的映射（常见礼物）
 # 来源：斗鱼弹幕协议 dgb 消息
 GIFT_NAMES: dict[str, str] = {
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import itertools
 import json
 import time
+from threading import Lock
+from typing import NamedTuple
 
 import httpx
 
@@ -20,16 +23,197 @@ GIFT_CONFIG_URL = (
 ROOM_GIFT_CONFIG_URL = "http://open.douyucdn.cn/api/RoomApi/room/{room_id}"
 JSONP_PREFIX = "DYConfigCallback("
 
-_GIFT_NAME_CACHE: dict[str, str] = {}
-_HIGH_VALUE_GIFT_CACHE: set[str] = set(HIGH_VALUE_GIFT_IDS)
-_GIFT_VALUE_CACHE: dict[str, int] = {}
-_ROOM_GIFT_NAME_CACHE: dict[int, dict[str, str]] = {}
-_ROOM_HIGH_VALUE_CACHE: dict[int, set[str]] = {}
-_ROOM_GIFT_VALUE_CACHE: dict[int, dict[str, int]] = {}
-_LAST_UPDATE_TS: float | None = None
 HIGH_VALUE_DEVOTE_THRESHOLD = DEFAULT_HIGH_VALUE_THRESHOLD
 
 
+class GiftInfo(NamedTuple):
+    """礼物信息（名称、价值与是否高价值一次查出）"""
+
+    name: str
+    value: int | None
+    high_value: bool
+
+
+# 礼物名称驻留表，相同名称在全局表与各房间表之间共享同一个字符串对象
+_NAMES: dict[str, str] = {}
+
+
+def _intern_name(name: str) -> str:
+    return _NAMES.setdefault(name, name)
+
+
+# 解析配置得到的原始礼物字段 (名称, 价值)，配置中缺失的字段为 None
+RawGift = tuple[str | None, int | None]
+
+
+def _make_info(name: str, value: int | None, high_value: bool | None = None) -> GiftInfo:
+    if high_value is None:
+        high_value = value is not None and value >= HIGH_VALUE_DEVOTE_THRESHOLD
+    return GiftInfo(_intern_name(name), value, high_value)
+
+
+def _build_default_table() -> dict[int, GiftInfo]:
+    """由内置常量构建兜底礼物表"""
+    table: dict[int, GiftInfo] = {}
+    for gift_id in set(GIFT_NAMES) | HIGH_VALUE_GIFT_IDS:
+        name = GIFT_NAMES.get(gift_id, f"{DEFAULT_GIFT_NAME}({gift_id})")
+        table[int(gift_id)] = _make_info(name, None, gift_id in HIGH_VALUE_GIFT_IDS)
+    return table
+
+
+def _merge_info(
+    gift_id: int, base: GiftInfo | None, name: str | None, value: int | None
+) -> GiftInfo:
+    """将配置中的字段合并到已有条目上
+
+    配置缺失的名称或价值沿用已有条目（没有已有条目时名称使用内置常量或默认名称），
+    不会用占位名称或缺失的价值覆盖已知的礼物信息。
+    """
+    if name is None:
+        if base is not None:
+            name = base.name
+        else:
+            name = GIFT_NAMES.get(str(gift_id), f"{DEFAULT_GIFT_NAME}({gift_id})")
+    if value is not None:
+        high_value = value >= HIGH_VALUE_DEVOTE_THRESHOLD
+    elif base is not None:
+        value, high_value = base.value, base.high_value
+    else:
+        high_value = False
+    return GiftInfo(name, value, high_value)
+
+
+def _merge_table(table: dict[int, GiftInfo], raw: dict[int, RawGift]) -> None:
+    """将原始礼物表逐条合并到查找表中（原地修改 table）"""
+    get = table.get
+    for gift_id, (name, value) in raw.items():
+        table[gift_id] = _merge_info(gift_id, get(gift_id), name, value)
+
+
+class GiftConfigSnapshot:
+    """礼物配置快照
+
+    刷新时在旁路构建新的快照，再以一次引用赋值发布；读取方先取得快照引用，
+    之后的所有查询都基于同一版本，不会看到清空或更新了一半的缓存。
+
+    Attributes:
+        version: 快照版本号，每次发布递增
+        loaded_at: 全局礼物配置的加载时间戳，未加载时为 None
+        loaded_count: 全局礼物配置中带名称的礼物数量
+        base_gifts: 内置常量与全局礼物配置合并得到的礼物表 gift_id -> GiftInfo
+        global_gifts: base_gifts 再合并各房间礼物得到的礼物表，用于没有房间配置时的查询
+        room_gifts: 房间原始礼物表 room_id -> {gift_id -> RawGift}，只包含房间配置中的礼物
+    """
+
+    __slots__ = (
+        "version",
+        "loaded_at",
+        "loaded_count",
+        "base_gifts",
+        "global_gifts",
+        "room_gifts",
+        "_room_infos",
+        "_overlays",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        loaded_at: float | None,
+        loaded_count: int,
+        base_gifts: dict[int, GiftInfo],
+        global_gifts: dict[int, GiftInfo],
+        room_gifts: dict[int, dict[int, RawGift]],
+        room_infos: dict[int, dict[int, GiftInfo]] | None = None,
+    ):
+        """初始化快照
+
+        Args:
+            room_infos: 沿用的房间礼物表（base_gifts 不变时可从上一个快照继承未变化的房间）
+        """
+        self.version = version
+        self.loaded_at = loaded_at
+        self.loaded_count = loaded_count
+        self.base_gifts = base_gifts
+        self.global_gifts = global_gifts
+        self.room_gifts = room_gifts
+        # 房间礼物表：房间配置中的礼物，缺失字段由 base_gifts 补齐；首次查询该房间时构建
+        self._room_infos: dict[int, dict[int, GiftInfo]] = room_infos or {}
+        # 房间查询表：房间礼物表 + 查询过的其他礼物（首次未命中时写入），每条 dgb 只需一次查找。
+        # 写入的只是本快照全局表中的条目，不改变查询结果，因此不跨快照沿用。
+        self._overlays: dict[int, dict[int, GiftInfo]] = {}
+
+    def _room_info_table(self, room_id: int) -> dict[int, GiftInfo] | None:
+        """获取房间礼物表，房间没有配置时为 None"""
+        table = self._room_infos.get(room_id)
+        if table is None:
+            raw = self.room_gifts.get(room_id)
+            if raw is None:
+                return None
+            base = self.base_gifts
+            table = {
+                gift_id: _merge_info(gift_id, base.get(gift_id), name, value)
+                for gift_id, (name, value) in raw.items()
+            }
+            table = self._room_infos.setdefault(room_id, table)
+        return table
+
+    def lookup(self, gift_id: str | int, room_id: int | None = None) -> GiftInfo:
+        """查询礼物信息（房间配置优先，其次全局配置与内置常量）"""
+        try:
+            key = int(gift_id)
+        except (TypeError, ValueError):
+            return _unknown_gift(gift_id)
+
+        if room_id is not None:
+            overlay = self._overlays.get(room_id)
+            if overlay is None:
+                table = self._room_info_table(room_id)
+                if table is not None:
+                    overlay = self._overlays.setdefault(room_id, dict(table))
+            if overlay is not None:
+                info = overlay.get(key)
+                if info is None:
+                    info = self.global_gifts.get(key)
+                    if info is None:
+                        return _unknown_gift(gift_id)
+                    overlay[key] = info
+                return info
+
+        info = self.global_gifts.get(key)
+        return info if info is not None else _unknown_gift(gift_id)
+
+    def has_gift(self, gift_id: str | int, room_id: int | None = None) -> bool:
+        """礼物是否存在于房间配置、全局配置或内置常量中
+
+        指定房间时只认该房间自己的配置与全局/内置礼物表，
+        仅出现在其他房间配置中的礼物视为未知（需要加载本房间配置）。
+        """
+        try:
+            key = int(gift_id)
+        except (TypeError, ValueError):
+            return False
+        if room_id is None:
+            return key in self.global_gifts
+        if key in self.base_gifts:
+            return True
+        raw = self.room_gifts.get(room_id)
+        return raw is not None and key in raw
+
+
+def _unknown_gift(gift_id: str | int) -> GiftInfo:
+    return GiftInfo(f"{DEFAULT_GIFT_NAME}({gift_id})", None, False)
+
+
+_VERSIONS = itertools.count(1)
+# 当前发布的快照，只通过整体赋值替换
+_SNAPSHOT = GiftConfigSnapshot(
+    0, None, 0, _build_default_table(), _build_default_table(), {}
+)
+# 串行化“读取当前快照 -> 构建 -> 发布”，避免并发刷新互相覆盖
+_PUBLISH_LOCK = Lock()
+
+
 def _strip_jsonp(payload: str) -> str:
     payload = payload.strip()
     if not payload:
@@ -49,215 +233,317 @@ def _strip_jsonp(payload: str) -> str:
     return payload
 
 
-def _parse_gift_mapping(data: dict) -> dict[str, str]:
-    mapping: dict[str, str] = {}
-    for gift_id, info in data.get("data", {}).items():
-        if not isinstance(info, dict):
-            continue
-        name = info.get("name")
+def _parse_value(raw: object) -> int | None:
+    """解析价值字段（可能是字符串形式的浮点数），无法解析时返回 None（价值未知）"""
+    try:
+        return int(float(raw))  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+class _TableBuilder:
+    """构建原始礼物表，同一价值字符串只解析一次并复用解析结果
+
+    只记录配置中实际存在的字段：缺失的名称与价值保存为 None，
+    合并时沿用已有条目，不会以占位名称或价值 0 覆盖已知礼物。
+    """
+
+    __slots__ = ("table", "named", "_values")
+
+    def __init__(self) -> None:
+        self.table: dict[int, RawGift] = {}
+        self.named = 0
+        self._values: dict[object, int | None] = {}
+
+    def add(self, gift_id: int, name: object, raw_value: object) -> None:
+        if raw_value is None:
+            value = None
+        else:
+            try:
+                value = self._values[raw_value]
+            except KeyError:
+                value = self._values[raw_value] = _parse_value(raw_value)
+            except TypeError:
+                value = None
+
         if name:
-            mapping[str(gift_id)] = str(name)
-    return mapping
+            self.named += 1
+            self.table[gift_id] = (_intern_name(str(name)), value)
+        else:
+            self.table[gift_id] = (None, value)
 
 
-def _parse_high_value_gifts(data: dict) -> set[str]:
-    high_value: set[str] = set()
-    for gift_id, info in data.get("data", {}).items():
-        if not isinstance(info, dict):
-            continue
-        devote = info.get("devote")
-        try:
-            devote_value = int(float(devote)) if devote is not None else 0
-        except (TypeError, ValueError):
-            continue
-        if devote_value >= HIGH_VALUE_DEVOTE_THRESHOLD:
-            high_value.add(str(gift_id))
-    return high_value
+def _parse_global_payload(data: dict) -> tuple[dict[int, RawGift], int]:
+    """单次遍历解析全局礼物配置（prop_gift_config）
 
+    Returns:
+        (gift_id -> RawGift, 带名称的礼物数量)
+    """
+    builder = _TableBuilder()
+    gifts = data.get("data", {})
+    if not isinstance(gifts, dict):
+        return builder.table, 0
 
-def _parse_gift_values(data: dict) -> dict[str, int]:
-    values: dict[str, int] = {}
-    for gift_id, info in data.get("data", {}).items():
+    add = builder.add
+    for gift_key, info in gifts.items():
         if not isinstance(info, dict):
             continue
-        devote = info.get("devote")
         try:
-            devote_value = int(float(devote)) if devote is not None else 0
+            gift_id = int(gift_key)
         except (TypeError, ValueError):
             continue
-        values[str(gift_id)] = devote_value
-    return values
+        add(gift_id, info.get("name"), info.get("devote"))
+    return builder.table, builder.named
+
 
+def _parse_room_payload(data: dict) -> tuple[dict[int, RawGift], int]:
+    """单次遍历解析房间礼物配置（RoomApi 的 data.gift 列表）
 
-def _parse_room_gift_mapping(data: dict) -> tuple[dict[str, str], set[str]]:
+    Returns:
+        (gift_id -> RawGift, 带名称的礼物数量)
+    """
+    builder = _TableBuilder()
     gift_list = data.get("data", {}).get("gift", [])
-    mapping: dict[str, str] = {}
-    high_value: set[str] = set()
     if not isinstance(gift_list, list):
-        return mapping, high_value
+        return builder.table, 0
 
+    add = builder.add
     for gift in gift_list:
         if not isinstance(gift, dict):
             continue
-        gift_id = gift.get("id")
-        gift_name = gift.get("name")
-        if gift_id and gift_name:
-            mapping[str(gift_id)] = str(gift_name)
-        gift_value = gift.get("gx")
         try:
-            gift_value_int = int(float(gift_value)) if gift_value is not None else 0
+            gift_id = int(gift.get("id") or 0)
         except (TypeError, ValueError):
             continue
-        if gift_value_int >= HIGH_VALUE_DEVOTE_THRESHOLD and gift_id:
-            high_value.add(str(gift_id))
-    return mapping, high_value
+        if gift_id:
+            add(gift_id, gift.get("name"), gift.get("gx"))
+    return builder.table, builder.named
 
 
-def _parse_room_gift_values(data: dict) -> dict[str, int]:
-    gift_list = data.get("data", {}).get("gift", [])
-    values: dict[str, int] = {}
-    if not isinstance(gift_list, list):
-        return values
+def gift_table_to_rows(table: dict[int, RawGift]) -> list[tuple[int, str | None, int | None]]:
+    """将原始礼物表转换为紧凑的行格式 [(gift_id, name, value)]，用于磁盘缓存"""
+    return [(gift_id, name, value) for gift_id, (name, value) in table.items()]
 
-    for gift in gift_list:
-        if not isinstance(gift, dict):
-            continue
-        gift_id = gift.get("id")
-        gift_value = gift.get("gx")
-        if not gift_id:
-            continue
-        try:
-            gift_value_int = int(float(gift_value)) if gift_value is not None else 0
-        except (TypeError, ValueError):
-            continue
-        values[str(gift_id)] = gift_value_int
-    return values
 
+def gift_table_from_rows(rows: list) -> dict[int, RawGift]:
+    """由紧凑的行格式还原原始礼物表"""
+    return {
+        int(gift_id): (_intern_name(name) if name else None, value)
+        for gift_id, name, value in rows
+    }
 
-def update_gift_config() -> int:
-    """拉取斗鱼礼物配置并刷新缓存.
 
-    Returns:
-        加载到的礼物数量（如果拉取失败则抛异常）
-    """
+def fetch_gift_config() -> dict:
+    """拉取斗鱼全局礼物配置（prop_gift_config）并解析为 JSON"""
     response = httpx.get(GIFT_CONFIG_URL, timeout=10.0)
     response.raise_for_status()
+    return decode_gift_config(response.text)
+
 
-    raw_json = _strip_jsonp(response.text)
+def decode_gift_config(text: str) -> dict:
+    """解析全局礼物配置响应（JSONP）"""
+    raw_json = _strip_jsonp(text)
     if not raw_json:
         raise ValueError("礼物配置响应为空")
 
     try:
-        data = json.loads(raw_json)
+        return json.loads(raw_json)
     except json.JSONDecodeError as exc:
         raise ValueError("礼物配置响应无法解析为 JSON") from exc
 
-    mapping = _parse_gift_mapping(data)
-    high_value = _parse_high_value_gifts(data)
-    values = _parse_gift_values(data)
-    if not mapping:
+
+def parse_gift_config(data: dict) -> tuple[dict[int, RawGift], int]:
+    """解析全局礼物配置，未包含礼物数据时抛出 ValueError
+
+    Returns:
+        (gift_id -> RawGift, 带名称的礼物数量)
+    """
+    gifts, named = _parse_global_payload(data)
+    if not named:
         raise ValueError("礼物配置响应中未包含礼物数据")
+    return gifts, named
 
-    _GIFT_NAME_CACHE.clear()
-    _GIFT_NAME_CACHE.update(mapping)
-    if values:
-        _GIFT_VALUE_CACHE.clear()
-        _GIFT_VALUE_CACHE.update(values)
-    if high_value:
-        _HIGH_VALUE_GIFT_CACHE.clear()
-        _HIGH_VALUE_GIFT_CACHE.update(high_value)
 
-    global _LAST_UPDATE_TS
-    _LAST_UPDATE_TS = time.time()
+def publish_gift_table(
+    gifts: dict[int, RawGift], named: int, loaded_at: float | None = None
+) -> None:
+    """以解析好的全局礼物表发布新的快照
 
-    return len(_GIFT_NAME_CACHE)
+    Args:
+        gifts: 全局原始礼物表
+        named: 带名称的礼物数量
+        loaded_at: 配置的获取时间戳，默认为当前时间
+    """
+    global _SNAPSHOT
+    with _PUBLISH_LOCK:
+        current = _SNAPSHOT
+        base = _build_default_table()
+        _merge_table(base, gifts)
+        # 房间配置中的礼物同样可用于其他房间
+        table = dict(base)
+        for room_table in current.room_gifts.values():
+            _merge_table(table, room_table)
+        _SNAPSHOT = GiftConfigSnapshot(
+            next(_VERSIONS),
+            time.time() if loaded_at is None else loaded_at,
+            named,
+            base,
+            table,
+            current.room_gifts,
+        )
+
+
+def apply_gift_config(data: dict) -> int:
+    """解析全局礼物配置并发布新的快照
 
+    Returns:
+        加载到的礼物数量
+    """
+    gifts, named = parse_gift_config(data)
+    publish_gift_table(gifts, named)
+    return named
 
-def update_room_gift_config(room_id: int) -> int:
-    """拉取房间/主播礼物配置并刷新缓存.
+
+def update_gift_config() -> int:
+    """拉取斗鱼礼物配置并刷新缓存.
 
     Returns:
-        加载到的房间礼物数量（如果拉取失败则抛异常）
+        加载到的礼物数量（如果拉取失败则抛异常）
     """
+    return apply_gift_config(fetch_gift_config())
+
+
+def fetch_room_gift_config(room_id: int) -> dict:
+    """拉取房间/主播礼物配置并解析为 JSON"""
     response = httpx.get(ROOM_GIFT_CONFIG_URL.format(room_id=room_id), timeout=10.0)
     response.raise_for_status()
+    return decode_room_gift_config(response.text)
 
-    if not response.text.strip():
+
+def decode_room_gift_config(text: str) -> dict:
+    """解析房间礼物配置响应，接口返回错误时抛出 ValueError"""
+    if not text.strip():
         raise ValueError("房间礼物配置响应为空")
 
     try:
-        data = response.json()
+        data = json.loads(text)
     except json.JSONDecodeError as exc:
         raise ValueError("房间礼物配置响应无法解析为 JSON") from exc
 
     if data.get("error") != 0:
         raise ValueError(f"房间礼物配置响应错误: {data.get('error')}")
+    return data
+
 
-    mapping, high_value = _parse_room_gift_mapping(data)
-    values = _parse_room_gift_values(data)
-    if not mapping:
+def parse_room_gift_config(data: dict) -> tuple[dict[int, RawGift], int]:
+    """解析房间礼物配置，未包含礼物数据时抛出 ValueError
+
+    Returns:
+        (gift_id -> RawGift, 带名称的礼物数量)
+    """
+    room_table, named = _parse_room_payload(data)
+    if not named:
         raise ValueError("房间礼物配置响应中未包含礼物数据")
+    return room_table, named
+
+
+def publish_room_gift_tables(tables: dict[int, dict[int, RawGift]]) -> None:
+    """以解析好的房间礼物表发布新的快照（多个房间合并为一次发布）
 
-    _ROOM_GIFT_NAME_CACHE[room_id] = mapping
-    if high_value:
-        _ROOM_HIGH_VALUE_CACHE[room_id] = high_value
-    if values:
-        _ROOM_GIFT_VALUE_CACHE[room_id] = values
+    Args:
+        tables: room_id -> 房间原始礼物表
+    """
+    if not tables:
+        return
+    global _SNAPSHOT
+    with _PUBLISH_LOCK:
+        current = _SNAPSHOT
+        table = dict(current.global_gifts)
+        room_gifts = dict(current.room_gifts)
+        for room_id, room_table in tables.items():
+            _merge_table(table, room_table)
+            room_gifts[room_id] = room_table
+        # 全局表未变，未更新的房间沿用已构建的房间礼物表
+        room_infos = {
+            room_id: infos
+            for room_id, infos in current._room_infos.items()
+            if room_id not in tables
+        }
+        _SNAPSHOT = GiftConfigSnapshot(
+            next(_VERSIONS),
+            current.loaded_at,
+            current.loaded_count,
+            current.base_gifts,
+            table,
+            room_gifts,
+            room_infos,
+        )
+
+
+def apply_room_gift_config(room_id: int, data: dict) -> int:
+    """解析房间礼物配置并发布新的快照
 
-    _GIFT_NAME_CACHE.update(mapping)
-    if high_value:
-        _HIGH_VALUE_GIFT_CACHE.update(high_value)
-    if values:
-        _GIFT_VALUE_CACHE.update(values)
+    Returns:
+        加载到的房间礼物数量
+    """
+    room_table, named = parse_room_gift_config(data)
+    publish_room_gift_tables({room_id: room_table})
+    return named
 
-    return len(mapping)
+
+def update_room_gift_config(room_id: int) -> int:
+    """拉取房间/主播礼物配置并刷新缓存.
+
+    Returns:
+        加载到的房间礼物数量（如果拉取失败则抛异常）
+    """
+    return apply_room_gift_config(room_id, fetch_room_gift_config(room_id))
+
+
+def get_gift_snapshot() -> GiftConfigSnapshot:
+    """获取当前发布的礼物配置快照"""
+    return _SNAPSHOT
+
+
+def get_gift_info(gift_id: str | int, room_id: int | None = None) -> GiftInfo:
+    """获取礼物信息（房间配置优先，其次全局配置与内置常量）
+
+    指定房间时只查询一次该房间的查询表；未命中的礼物从全局表取出后写入房间查询表，
+    同一房间后续的相同礼物仍只需一次查找。
+    """
+    return _SNAPSHOT.lookup(gift_id, room_id)
+
+
+def has_gift_info(gift_id: str | int, room_id: int | None = None) -> bool:
+    """礼物 ID 是否已知（未知的礼物只能显示为默认名称）"""
+    return _SNAPSHOT.has_gift(gift_id, room_id)
 
 
 def get_gift_name(gift_id: str | int, room_id: int | None = None) -> str:
     """获取礼物名称（优先使用在线配置）"""
-    gift_key = str(gift_id)
-    if room_id is not None:
-        room_mapping = _ROOM_GIFT_NAME_CACHE.get(room_id)
-        if room_mapping and gift_key in room_mapping:
-            return room_mapping[gift_key]
-    return _GIFT_NAME_CACHE.get(
-        gift_key, GIFT_NAMES.get(gift_key, f"{DEFAULT_GIFT_NAME}({gift_id})")
-    )
+    return get_gift_info(gift_id, room_id).name
 
 
 def is_high_value_gift(gift_id: str | int, room_id: int | None = None) -> bool:
     """判断是否为高价值礼物（基于配置的价值字段）"""
-    gift_value = get_gift_value(gift_id, room_id=room_id)
-    if gift_value is not None:
-        return gift_value >= HIGH_VALUE_DEVOTE_THRESHOLD
-
-    if room_id is not None:
-        room_high_value = _ROOM_HIGH_VALUE_CACHE.get(room_id)
-        if room_high_value is not None:
-            return str(gift_id) in room_high_value
-    return str(gift_id) in _HIGH_VALUE_GIFT_CACHE
+    return get_gift_info(gift_id, room_id).high_value
 
 
 def get_gift_value(gift_id: str | int, room_id: int | None = None) -> int | None:
     """获取礼物价值（优先使用房间配置）"""
-    gift_key = str(gift_id)
-    if room_id is not None:
-        room_values = _ROOM_GIFT_VALUE_CACHE.get(room_id)
-        if room_values and gift_key in room_values:
-            return room_values[gift_key]
-    return _GIFT_VALUE_CACHE.get(gift_key)
+    return get_gift_info(gift_id, room_id).value
 
 
 def get_cached_gift_count() -> int:
     """获取当前缓存的礼物数量"""
-    return len(_GIFT_NAME_CACHE)
+    return _SNAPSHOT.loaded_count
 
 
 def get_room_cached_gift_count(room_id: int) -> int:
     """获取房间缓存的礼物数量"""
-    return len(_ROOM_GIFT_NAME_CACHE.get(room_id, {}))
+    return len(_SNAPSHOT.room_gifts.get(room_id, {}))
 
 
 def get_last_update_time() -> float | None:
     """获取最近一次刷新时间戳"""
-    return _LAST_UPDATE_TS
+    return _SNAPSHOT.loaded_at